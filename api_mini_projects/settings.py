@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 import os
 from datetime import timedelta
+from importlib.util import find_spec
 from pathlib import Path
 import dotenv
 
@@ -45,6 +46,7 @@ INSTALLED_APPS = [
     'rest_framework_simplejwt',
     "drf_yasg",
 
+    "apis.core.apps.CoreConfig",
     "apis.users.apps.UsersConfig",
     "apis.blog.apps.BlogConfig",
     "apis.todo.apps.TodoConfig",
@@ -52,6 +54,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "apis.core.metrics.PerformanceMiddleware",
+    "apis.core.nplusone.NPlusOneMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -61,6 +65,22 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# PerformanceMiddleware records per-route histograms served at /metrics/. With
+# SERVER_TIMING it also reports the timings of each response to the client.
+SERVER_TIMING = DEBUG
+
+# NPlusOneMiddleware groups the SQL of each request by statement fingerprint and
+# reports statements repeated more than THRESHOLD times: "log" logs a warning,
+# "strict" fails the request. The test runner always runs in strict mode.
+N_PLUS_ONE = {
+    "MODE": "log" if DEBUG else "off",
+    "THRESHOLD": 5,
+    "EXEMPT_VIEWS": [],
+    "EXEMPT_QUERIES": [],
+}
+
+TEST_RUNNER = "apis.core.testing.NPlusOneTestRunner"
+
 ROOT_URLCONF = "api_mini_projects.urls"
 
 TEMPLATES = [
@@ -97,6 +117,60 @@ DATABASES = {
 }
 
 
+# Caches
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+#
+# GET responses of the blog and library views are cached in the "responses"
+# cache (see apis.core.caching). LocMemCache evicts the least recently used
+# entries per process; switch it to FileBasedCache or DatabaseCache to share
+# cached responses between workers.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "responses": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "responses",
+        "TIMEOUT": 300,
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
+}
+
+RESPONSE_CACHE_ALIAS = "responses"
+
+
+# Password hashing
+# https://docs.djangoproject.com/en/5.1/topics/auth/passwords/
+#
+# New passwords are hashed with scrypt using PASSWORD_SCRYPT_PARAMS; passwords
+# stored with the other hashers are rehashed on the next login. Run
+# `manage.py bench_hashers` to measure the parameters on the production hardware.
+# Hashes run in a pool of PASSWORD_HASH_WORKERS processes (inline when 0), see
+# apis.users.hashers. Every server worker process starts its own pool, so size it
+# per worker: server workers × PASSWORD_HASH_WORKERS should stay around the
+# number of CPUs, e.g. 1 or 2 with one gunicorn/uvicorn worker per CPU.
+
+PASSWORD_HASHERS = [
+    "apis.users.hashers.TunedScryptPasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+]
+
+PASSWORD_SCRYPT_PARAMS = {
+    "work_factor": 2 ** 14,
+    "block_size": 8,
+    "parallelism": 1,
+}
+
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", 2))
+
+AUTHENTICATION_BACKENDS = [
+    "apis.users.backends.PooledModelBackend",
+]
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -117,17 +191,79 @@ AUTH_PASSWORD_VALIDATORS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apis.users.authentication.StatelessJWTAuthentication',
+    ),
+    'DEFAULT_PAGINATION_CLASS': 'apis.core.pagination.KeysetPagination',
+    'PAGE_SIZE': 50,
+    # Encode and decode JSON with orjson when it is installed, see apis.core.renderers.
+    # MessagePack and CBOR are offered when msgpack and cbor2 are installed.
+    'DEFAULT_RENDERER_CLASSES': (
+        'apis.core.renderers.FastJSONRenderer',
+        *(['apis.core.renderers.MessagePackRenderer'] if find_spec('msgpack') else []),
+        *(['apis.core.renderers.CBORRenderer'] if find_spec('cbor2') else []),
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'apis.core.parsers.FastJSONParser',
+        *(['apis.core.parsers.MessagePackParser'] if find_spec('msgpack') else []),
+        *(['apis.core.parsers.CBORParser'] if find_spec('cbor2') else []),
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+    # Serializers return datetimes as datetime objects rather than strings: the
+    # JSON renderers write them in ISO 8601, while the MessagePack and CBOR
+    # renderers encode them as compact timestamps. ValuesReader output matches.
+    'DATETIME_FORMAT': None,
+    # Token buckets per client, see apis.core.throttling. Signup and login are
+    # limited per IP address, writes per user. The address is REMOTE_ADDR, or
+    # the entry NUM_PROXIES from the end of X-Forwarded-For when the app runs
+    # behind that many reverse proxies. Never leave NUM_PROXIES unset: DRF then
+    # trusts the whole X-Forwarded-For header sent by the client.
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', 0)),
+    'DEFAULT_THROTTLE_CLASSES': (
+        'apis.core.throttling.WriteRateThrottle',
     ),
+    'DEFAULT_THROTTLE_RATES': {
+        'signup': '5/min',
+        'login': '10/min',
+        'write': '120/min',
+    },
 }
 
+# Throttle buckets live in each worker process when this is None. Set it to the
+# alias of a DatabaseCache or FileBasedCache to share them between workers.
+THROTTLE_CACHE_ALIAS = None
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=1),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
+    'TOKEN_OBTAIN_SERIALIZER': 'apis.users.serializers.ClaimsTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'apis.users.serializers.BlacklistTokenRefreshSerializer',
+}
+
+# Rotated refresh tokens are revoked in apis.users.blacklist. The Bloom filter in
+# front of the table is sized for BLOOM_CAPACITY tokens (or twice the revoked
+# tokens, if more) and rebuilt every REBUILD_INTERVAL seconds. Run
+# `manage.py compact_token_blacklist` daily to delete expired tokens.
+TOKEN_BLACKLIST = {
+    'BLOOM_CAPACITY': 100_000,
+    'BLOOM_ERROR_RATE': 0.001,
+    'REBUILD_INTERVAL': 600,
 }
 
+# Deleted tasks leave a tombstone for the sync endpoint for this long. Clients
+# whose last sync is older get every task again instead of the changes. Run
+# `manage.py prune_task_tombstones` daily to delete older tombstones.
+TASK_TOMBSTONE_RETENTION = timedelta(days=30)
+
+# StatelessJWTAuthentication caches whether a user is active for this many
+# seconds, which bounds how long a deactivated user's tokens keep working on
+# workers that do not share the cache.
+USER_ACTIVE_CACHE_ALIAS = "default"
+USER_ACTIVE_CACHE_TTL = 30
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
 
@@ -22,6 +22,8 @@ from drf_yasg import openapi
 from rest_framework import permissions
 from django.http import HttpResponse
 
+from apis.core.views import metrics_view
+
 schema_view = get_schema_view(
    openapi.Info(
       title="Projects API",
@@ -45,5 +47,6 @@ urlpatterns = [
     path("api/blog/", include("apis.blog.urls")),
     path("api/todo/", include("apis.todo.urls")),
     path("api/library/", include("apis.library.urls")),
-    path("", HttpResponse("hello"), name="index")
+    path("metrics/", metrics_view, name="metrics"),
+    path("", lambda request: HttpResponse("hello"), name="index"),
 ]
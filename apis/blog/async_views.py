@@ -0,0 +1,26 @@
+from rest_framework import permissions
+from apis.core.async_views import AsyncListCreateView
+from .pagination import PostPagination
+from .views import PostList
+
+from apis.blog.models import Post
+from apis.blog.serializers import PostSerializer
+
+
+class AsyncPostList(AsyncListCreateView):
+    """
+    Async version of `PostList` for ASGI deployments.
+
+    - GET: Returns a page of posts, newest first, read with the async ORM.
+    - POST: Authenticated users can create a new post, authored by the current user.
+
+    Responses match `PostList`, without the response cache, conditional requests and streaming.
+    """
+    queryset = Post.objects.select_related('author')
+    serializer_class = PostSerializer
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = PostPagination
+    reader = PostList.reader
+
+    async def perform_create(self, serializer):
+        return await Post.objects.acreate(author_id=self.request.user.pk, **serializer.validated_data)
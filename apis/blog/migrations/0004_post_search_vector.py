@@ -0,0 +1,108 @@
+# Generated by Django 5.1 on 2026-10-18 06:39
+
+import django.contrib.postgres.search
+from django.contrib.postgres.indexes import GinIndex
+from django.db import migrations
+
+SEARCH_INDEX = GinIndex(fields=["search_vector"], name="blog_post_search_idx")
+
+POSTGRES_INSTALL = [
+    """
+    CREATE FUNCTION blog_post_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(NEW.content, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER blog_post_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, content ON blog_post
+    FOR EACH ROW EXECUTE FUNCTION blog_post_search_vector_update()
+    """,
+    "UPDATE blog_post SET title = title",
+]
+
+POSTGRES_UNINSTALL = [
+    "DROP TRIGGER IF EXISTS blog_post_search_vector_trigger ON blog_post",
+    "DROP FUNCTION IF EXISTS blog_post_search_vector_update()",
+]
+
+# SQLite has no tsvector, so the fallback keeps an external content FTS5 table
+# in sync with triggers instead. SQLite drops the triggers whenever Django
+# rebuilds blog_post for a later migration; such a migration has to run
+# SQLITE_INSTALL again, and keep SEARCH_INDEX out of the rebuilt table.
+SQLITE_INSTALL = [
+    """
+    CREATE VIRTUAL TABLE blog_post_fts USING fts5(
+        title, content, content='blog_post', content_rowid='id', tokenize='porter'
+    )
+    """,
+    """
+    CREATE TRIGGER blog_post_fts_insert AFTER INSERT ON blog_post BEGIN
+        INSERT INTO blog_post_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER blog_post_fts_delete AFTER DELETE ON blog_post BEGIN
+        INSERT INTO blog_post_fts(blog_post_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER blog_post_fts_update AFTER UPDATE OF title, content ON blog_post BEGIN
+        INSERT INTO blog_post_fts(blog_post_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO blog_post_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+    "INSERT INTO blog_post_fts(blog_post_fts) VALUES ('rebuild')",
+]
+
+SQLITE_UNINSTALL = [
+    "DROP TRIGGER IF EXISTS blog_post_fts_insert",
+    "DROP TRIGGER IF EXISTS blog_post_fts_delete",
+    "DROP TRIGGER IF EXISTS blog_post_fts_update",
+    "DROP TABLE IF EXISTS blog_post_fts",
+]
+
+
+def add_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.add_index(apps.get_model("blog", "Post"), SEARCH_INDEX)
+
+
+def remove_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.remove_index(apps.get_model("blog", "Post"), SEARCH_INDEX)
+
+
+def run(statements):
+    def operation(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0003_post_blog_post_created_id_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        # The GIN index only exists on PostgreSQL, but is part of the state everywhere.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[migrations.AddIndex(model_name="post", index=SEARCH_INDEX)],
+            database_operations=[migrations.RunPython(add_search_index, remove_search_index)],
+        ),
+        migrations.RunPython(
+            run({"postgresql": POSTGRES_INSTALL, "sqlite": SQLITE_INSTALL}),
+            run({"postgresql": POSTGRES_UNINSTALL, "sqlite": SQLITE_UNINSTALL}),
+        ),
+    ]
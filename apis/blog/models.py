@@ -2,6 +2,18 @@ from datetime import timezone
 
 from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+
+
+class PostManager(models.Manager):
+    """
+    Defers `search_vector`: only search reads it, and leaving it out of loaded
+    posts also keeps `save()` from writing it back.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().defer("search_vector")
 
 
 class Post(models.Model):
@@ -10,6 +22,17 @@ class Post(models.Model):
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Maintained by a database trigger, see apis.blog.search.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = PostManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="blog_post_created_id_idx"),
+            # Created on PostgreSQL only, see migration 0004_post_search_vector.
+            GinIndex(fields=["search_vector"], name="blog_post_search_idx"),
+        ]
 
     def __str__(self):
         return self.title
@@ -0,0 +1,5 @@
+from apis.core.pagination import KeysetPagination
+
+
+class PostPagination(KeysetPagination):
+    ordering = ("-created_at", "-id")
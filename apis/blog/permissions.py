@@ -6,4 +6,4 @@ class IsAuthorOrReadOnly(BasePermission):
         if request.method in ['GET', 'HEAD', 'OPTIONS']:
             return True
 
-        return obj.author == request.user
+        return obj.author_id == request.user.pk
@@ -0,0 +1,64 @@
+"""
+Full-text search over blog posts.
+
+On PostgreSQL `Post.search_vector` holds the weighted `tsvector` of the title
+(weight A) and content (weight B). A trigger recomputes it when either changes,
+and a GIN index (`blog_post_search_idx`) serves the matches. `Post.objects`
+defers it, so other reads don't load it. On SQLite the same search runs
+against the `blog_post_fts` FTS5 table, so it can be used locally. Both are
+created by migration `0004_post_search_vector`.
+"""
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F
+
+from .models import Post
+
+CONFIG = "english"
+START_SEL, STOP_SEL = "<mark>", "</mark>"
+
+
+def search_posts(query, limit=20):
+    """
+    Return up to `limit` `(post_id, rank, headline)` hits for `query`, best first.
+
+    `headline` is an excerpt of the content with the matched terms wrapped in
+    `<mark>` tags. A higher `rank` is a better match.
+    """
+    if connection.vendor == "sqlite":
+        return _search_sqlite(query, limit)
+    return _search_postgres(query, limit)
+
+
+def _search_postgres(query, limit):
+    search_query = SearchQuery(query, search_type="websearch", config=CONFIG)
+    hits = (
+        Post.objects
+        .filter(search_vector=search_query)
+        .annotate(
+            rank=SearchRank(F("search_vector"), search_query),
+            headline=SearchHeadline(
+                "content", search_query, config=CONFIG, start_sel=START_SEL, stop_sel=STOP_SEL, max_words=35,
+            ),
+        )
+        .order_by("-rank", "-id")
+        .values_list("id", "rank", "headline")[:limit]
+    )
+    return list(hits)
+
+
+def _search_sqlite(query, limit):
+    # FTS5 treats punctuation in MATCH as syntax, so every term is quoted and
+    # the terms are ANDed together.
+    terms = " ".join('"{}"'.format(term.replace('"', '""')) for term in query.split())
+    if not terms:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT rowid, -bm25(blog_post_fts, 10.0, 1.0), "
+            "snippet(blog_post_fts, 1, %s, %s, '…', 24) "
+            "FROM blog_post_fts WHERE blog_post_fts MATCH %s "
+            "ORDER BY bm25(blog_post_fts, 10.0, 1.0), rowid DESC LIMIT %s",
+            [START_SEL, STOP_SEL, terms, limit],
+        )
+        return cursor.fetchall()
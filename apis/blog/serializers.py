@@ -1,9 +1,10 @@
 from rest_framework import serializers
+from apis.core.serializers import SparseFieldsMixin, TimedSerializerMixin
 from .models import Post
 
 
-class PostSerializer(serializers.ModelSerializer):
-    author = serializers.CharField(source='author.username', required=False)
+class PostSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
+    author = serializers.CharField(source='author.username', read_only=True)
 
     class Meta:
         model = Post
@@ -0,0 +1,10 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apis.core.caching import response_cache
+from .models import Post
+
+
+@receiver([post_save, post_delete], sender=Post)
+def invalidate_post_responses(sender, instance, **kwargs):
+    response_cache.invalidate(Post._meta.label_lower, [instance.pk])
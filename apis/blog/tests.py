@@ -1,3 +1,323 @@
-from django.test import TestCase
+import json
+from base64 import b64encode
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apis.core import conditional
+from apis.core.caching import response_cache
+from apis.core.testing import IndexUsageAssertionsMixin, query_budget
+from .models import Post
+from .pagination import PostPagination
+
+
+class BlogTestCase(APITestCase):
+    def setUp(self):
+        response_cache.cache.clear()
+        self.user = User.objects.create_user(username='author', password='testpassword123')
+
+    def create_posts(self, count, author=None):
+        return [
+            Post.objects.create(author=author or self.user, title=f"Post {i}", content="content")
+            for i in range(count)
+        ]
+
+
+class PostPaginationTest(BlogTestCase):
+    def test_list_is_paginated_newest_first(self):
+        posts = self.create_posts(5)
+
+        response = self.client.get(reverse('post-list-create'), {'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([post["id"] for post in response.data["results"]], [posts[4].pk, posts[3].pk])
+        self.assertIsNone(response.data["previous"])
+
+        ids = []
+        url = reverse('post-list-create') + '?page_size=2'
+        while url:
+            response = self.client.get(url).json()
+            ids.extend(post["id"] for post in response["results"])
+            url = response["next"]
+        self.assertEqual(ids, [post.pk for post in reversed(posts)])
+
+    def test_cursor_is_stable_under_concurrent_inserts(self):
+        posts = self.create_posts(4)
+        first_page = self.client.get(reverse('post-list-create'), {'page_size': 2})
+
+        self.create_posts(3)
+        second_page = self.client.get(first_page.data["next"])
+
+        self.assertEqual([post["id"] for post in second_page.data["results"]], [posts[1].pk, posts[0].pk])
+        previous_page = self.client.get(second_page.data["previous"])
+        self.assertEqual(previous_page.data["results"], first_page.data["results"])
+
+    def test_invalid_cursor(self):
+        for cursor in ['not-a-cursor', b64encode(b'[0, [5, 1]]').decode()]:
+            response = self.client.get(reverse('post-list-create'), {'cursor': cursor})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class PostCacheTest(BlogTestCase):
+    def test_list_is_cached_until_a_post_changes(self):
+        post = self.create_posts(1)[0]
+        url = reverse('post-list-create')
+
+        self.assertEqual(self.client.get(url)["X-Cache"], "MISS")
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertEqual(response.json()["results"][0]["title"], "Post 0")
+
+        post.title = "Renamed"
+        post.save()
+        response = self.client.get(url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["results"][0]["title"], "Renamed")
+
+    def test_detail_is_invalidated_per_object(self):
+        first, second = self.create_posts(2)
+        self.client.force_authenticate(self.user)
+        self.client.get(reverse('post-detail', args=[first.pk]))
+        self.client.get(reverse('post-detail', args=[second.pk]))
+
+        response = self.client.patch(reverse('post-detail', args=[first.pk]), {"title": "Edited"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(reverse('post-detail', args=[first.pk]))
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["title"], "Edited")
+        self.assertEqual(self.client.get(reverse('post-detail', args=[second.pk]))["X-Cache"], "HIT")
+
+    def test_stats_report_hit_ratio(self):
+        self.create_posts(1)
+        response_cache.reset_stats()
+        for _ in range(4):
+            self.client.get(reverse('post-list-create'))
+
+        stats = response_cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (3, 1))
+        self.assertEqual(stats["hit_ratio"], 0.75)
+
+        metrics = self.client.get(reverse('metrics')).content.decode()
+        self.assertIn("response_cache_hits_total 3\n", metrics)
+        self.assertIn("response_cache_hit_ratio 0.75\n", metrics)
+
+    @override_settings(ALLOWED_HOSTS=["a.example", "b.example"])
+    def test_responses_are_cached_per_host(self):
+        self.create_posts(2)
+        url = reverse('post-list-create')
+        self.client.get(url, {"page_size": 1}, HTTP_HOST="a.example")
+
+        response = self.client.get(url, {"page_size": 1}, HTTP_HOST="b.example")
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertTrue(response.json()["next"].startswith("http://b.example/"))
+
+    def test_browsable_api_is_not_cached(self):
+        self.create_posts(1)
+        for _ in range(2):
+            response = self.client.get(reverse('post-list-create'), HTTP_ACCEPT="text/html")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn("X-Cache", response)
+
+
+class PostConditionalRequestTest(BlogTestCase):
+    def test_list_not_modified(self):
+        self.create_posts(2)
+        url = reverse('post-list-create')
+        response = self.client.get(url)
+        self.assertIn("Last-Modified", response)
+        etag = response["ETag"]
+        self.assertEqual(self.client.get(url)["ETag"], etag)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        response = self.client.get(url + '?page_size=1', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_detail_if_match(self):
+        post = self.create_posts(1)[0]
+        self.client.force_authenticate(self.user)
+        url = reverse('post-detail', args=[post.pk])
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = self.client.patch(url, {"title": "Edited"}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+        response = self.client.patch(url, {"title": "Lost update"}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+
+    def test_update_racing_a_concurrent_update_is_rejected(self):
+        post = self.create_posts(1)[0]
+        self.client.force_authenticate(self.user)
+        url = reverse('post-detail', args=[post.pk])
+        etag = self.client.get(url)["ETag"]
+        evaluate_preconditions = conditional.evaluate_preconditions
+
+        def evaluate_then_change(request, validators):
+            response = evaluate_preconditions(request, validators)
+            Post.objects.filter(pk=post.pk).update(title="Concurrent", updated_at=timezone.now() + timedelta(seconds=1))
+            return response
+
+        with mock.patch.object(conditional, 'evaluate_preconditions', evaluate_then_change), \
+                CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(url, {"title": "Mine"}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        post.refresh_from_db()
+        self.assertEqual(post.title, "Concurrent")
+        self.assertEqual(sum('FROM "blog_post"' in query['sql'] and query['sql'].startswith('SELECT')
+                             for query in queries.captured_queries), 1)
+
+
+class PostQueryBudgetTest(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        for i in range(10):
+            self.create_posts(2, author=User.objects.create(username=f'author{i}'))
+        self.post = Post.objects.select_related('author').first()
+
+    @query_budget(2)
+    def test_post_list(self):
+        response = self.client.get(reverse('post-list-create'))
+        self.assertEqual(len(response.data["results"]), 20)
+
+    @query_budget(1)
+    def test_post_stream(self):
+        response = self.client.get(reverse('post-list-create'), {'stream': 'true'})
+        self.assertEqual(len(json.loads(b"".join(response.streaming_content))), 20)
+
+    @query_budget(1)
+    def test_post_detail(self):
+        response = self.client.get(reverse('post-detail', args=[self.post.pk]))
+        self.assertEqual(response.data["author"], self.post.author.username)
+
+
+class PostSparseFieldsTest(BlogTestCase):
+    def test_list_only_reads_requested_fields(self):
+        posts = self.create_posts(3)
+        url = reverse('post-list-create')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'fields': 'id,title', 'page_size': 2})
+        self.assertEqual(response.data["results"], [{"id": posts[2].pk, "title": "Post 2"}, {"id": posts[1].pk, "title": "Post 1"}])
+        self.assertNotIn('"content"', queries[-1]["sql"])
+        self.assertNotIn('auth_user', queries[-1]["sql"])
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual(response.data["results"], [{"id": posts[0].pk, "title": "Post 0"}])
+
+    def test_detail_defers_unrequested_columns(self):
+        post = self.create_posts(1)[0]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('post-detail', args=[post.pk]), {'fields': 'title,author'})
+        self.assertEqual(response.data, {"title": "Post 0", "author": self.user.username})
+        self.assertIn("ETag", response)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('"content"', queries[0]["sql"])
+
+    def test_writes_return_every_field(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.post(reverse('post-list-create') + '?fields=id', {"title": "New", "content": "content"})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["content"], "content")
+
+
+class PostSearchTest(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.title_match = Post.objects.create(author=self.user, title="Tuning databases", content="Notes.")
+        self.content_match = Post.objects.create(
+            author=self.user, title="Weekend", content="We spent the weekend tuning our database servers."
+        )
+        Post.objects.create(author=self.user, title="Cooking", content="A recipe for soup.")
+
+    def search(self, query, **params):
+        response = self.client.get(reverse('post-search'), {'q': query, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data["results"]
+
+    def test_ranks_title_matches_first(self):
+        results = self.search("database")
+        self.assertEqual([post["id"] for post in results], [self.title_match.pk, self.content_match.pk])
+        self.assertEqual(results[1]["author"], self.user.username)
+        self.assertGreater(results[0]["rank"], results[1]["rank"])
+        self.assertIn("<mark>database</mark>", results[1]["headline"])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.content_match.content = "We spent the weekend hiking."
+        self.content_match.save()
+        self.title_match.delete()
+        self.assertEqual(self.search("database"), [])
+        self.assertEqual([post["id"] for post in self.search("hiking")], [self.content_match.pk])
+
+    def test_loaded_posts_leave_out_the_search_vector(self):
+        post = Post.objects.get(pk=self.title_match.pk)
+        self.assertEqual(post.get_deferred_fields(), {"search_vector"})
+        with CaptureQueriesContext(connection) as queries:
+            post.save()
+        self.assertNotIn("search_vector", queries[-1]["sql"])
+
+    def test_query_syntax_is_not_an_error(self):
+        self.assertEqual(self.search('soup" OR (recipe'), [])
+        self.assertEqual(len(self.search('recipe soup')), 1)
+
+    def test_query_is_required(self):
+        response = self.client.get(reverse('post-search'))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class AsyncPostListTest(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.posts = self.create_posts(3)
+        self.expected = self.client.get(reverse('post-list-create'), {'page_size': 2}).json()
+
+    async def test_list_matches_sync_view(self):
+        response = await self.async_client.get(reverse('async-post-list-create'), {'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["results"], self.expected["results"])
+        self.assertIn("cursor=", response.json()["next"])
+
+    async def test_create_sets_author_from_token(self):
+        token = AccessToken.for_user(self.user)
+        response = await self.async_client.post(
+            reverse('async-post-list-create'), {"title": "Async", "content": "content"},
+            content_type='application/json', headers={'Authorization': f'Bearer {token}'},
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()["author"], self.user.username)
+
+    async def test_create_requires_authentication(self):
+        response = await self.async_client.post(
+            reverse('async-post-list-create'), {"title": "Async", "content": "content"}, content_type='application/json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn("WWW-Authenticate", response)
+
+
+class PostIndexTest(IndexUsageAssertionsMixin, BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        Post.objects.bulk_create(Post(author=self.user, title=f"Post {i}", content="content") for i in range(200))
+
+    def test_post_list_uses_created_index(self):
+        posts = Post.objects.order_by(*PostPagination.ordering)[:51]
+        self.assertUsesIndex(posts, "blog_post_created_id_idx", seek=False)
+
+    def test_post_list_page_uses_created_index(self):
+        position = Post.objects.order_by(*PostPagination.ordering)[100]
+        paginator = PostPagination()
+        posts = Post.objects.order_by(*PostPagination.ordering).filter(
+            paginator.seek(Post, PostPagination.ordering, [position.created_at, position.pk])
+        )[:51]
+        self.assertUsesIndex(posts, "blog_post_created_id_idx")
@@ -1,7 +1,9 @@
 from django.urls import path
-from . import views
+from . import async_views, views
 
 urlpatterns = [
     path("posts/", views.PostList.as_view(), name="post-list-create"),
+    path("posts/search/", views.PostSearch.as_view(), name="post-search"),
     path("posts/<int:pk>", views.PostDetail.as_view(), name="post-detail"),
+    path("async/posts/", async_views.AsyncPostList.as_view(), name="async-post-list-create"),
 ]
\ No newline at end of file
@@ -1,45 +1,94 @@
 from rest_framework import generics, permissions
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from apis.core.caching import CachedResponseMixin
+from apis.core.conditional import ConditionalMixin
+from apis.core.readers import ValuesReader
+from apis.core.streaming import StreamingListMixin
+from apis.core.views import CompiledListMixin, SparseQuerysetMixin
+from .pagination import PostPagination
 from .permissions import IsAuthorOrReadOnly
+from .search import search_posts
 
 from apis.blog.models import Post
 from apis.blog.serializers import PostSerializer
 
 
-class PostList(generics.ListCreateAPIView):
+class PostList(StreamingListMixin, ConditionalMixin, CachedResponseMixin, CompiledListMixin, SparseQuerysetMixin,
+               generics.ListCreateAPIView):
     """
     View to list all posts or create a new post.
 
-    - GET: Returns a list of all posts (read-only).
+    - GET: Returns a page of posts, newest first (read-only). Follow the `next` and `previous` cursor links to page through.
+      Pass `?stream=true` to stream every post as one unpaginated JSON array instead.
+      Pages are served from the response cache until a post changes. Responses carry an `ETag` and
+      `Last-Modified`; send them back in `If-None-Match`/`If-Modified-Since` to get a 304 when nothing changed.
+      Pass `?fields=id,title` to only read and return some fields.
     - POST: Authenticated users can create a new post. The author of the post is automatically set to the current user.
 
     Permissions:
     - IsAuthenticatedOrReadOnly: Authenticated users can create posts, while unauthenticated users can only view them.
     - IsAuthorOrReadOnly: Ensures only the author can modify their own posts.
     """
-    queryset = Post.objects.all()
+    queryset = Post.objects.select_related('author')
     serializer_class = PostSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly]
+    pagination_class = PostPagination
+    reader = ValuesReader(PostSerializer)
 
     def perform_create(self, serializer):
         """
         Override the perform_create method to set the post's author to the current authenticated user.
         """
-        serializer.save(author=self.request.user)
+        serializer.save(author_id=self.request.user.pk)
 
 
-class PostDetail(generics.RetrieveUpdateDestroyAPIView):
+class PostDetail(ConditionalMixin, CachedResponseMixin, SparseQuerysetMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     View to retrieve, update, or delete a specific post.
 
-    - GET: Retrieve the details of a specific post by its ID.
-    - PUT/PATCH: Update the post details (only the author can do this).
+    - GET: Retrieve the details of a specific post by its ID. Served from the response cache until the post changes.
+      Supports `If-None-Match`/`If-Modified-Since` conditional requests and `?fields=`.
+    - PUT/PATCH: Update the post details (only the author can do this). Send `If-Match` with the post's
+      `ETag` to get a 412 instead of overwriting a concurrent change.
     - DELETE: Delete the post (only the author can do this).
 
     Permissions:
     - IsAuthenticatedOrReadOnly: Authenticated users can modify posts, while unauthenticated users can only view them.
     - IsAuthorOrReadOnly: Ensures only the author can update or delete their own posts.
     """
-    queryset = Post.objects.all()
+    queryset = Post.objects.select_related('author')
     serializer_class = PostSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly]
+    sparse_extra = ('updated_at',)
+
+
+class PostSearch(APIView):
+    """
+    View to search posts by title and content.
+
+    - GET: Returns the posts matching `?q=`, best match first, as `{"results": [...]}`. Each post carries
+      a `rank` (higher is better) and a `headline`, an excerpt of its content with the matched terms
+      wrapped in `<mark>` tags. Title matches rank above content matches. Returns up to `page_size`
+      posts (default 50, at most 200).
+
+    The search runs against a GIN-indexed `tsvector` column on PostgreSQL and an FTS5 table on SQLite,
+    see `apis.blog.search`.
+
+    Permissions:
+    - IsAuthenticatedOrReadOnly: Anyone can search posts.
+    """
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+
+    def get(self, request, format=None):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            raise ValidationError({"q": "This query parameter is required."})
+
+        hits = search_posts(query, limit=PostPagination().get_page_size(request))
+        rows = list(PostList.reader.values(Post.objects.filter(pk__in=[pk for pk, _, _ in hits]), request))
+        posts = {row["id"]: post for row, post in zip(rows, PostList.reader.render(rows, request))}
+        return Response({"results": [
+            {**posts[pk], "rank": rank, "headline": headline} for pk, rank, headline in hits if pk in posts
+        ]})
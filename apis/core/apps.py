@@ -0,0 +1,15 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "apis.core"
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from .metrics import install_query_timer
+        from .nplusone import install_query_detector
+
+        connection_created.connect(install_query_timer)
+        connection_created.connect(install_query_detector)
@@ -0,0 +1,132 @@
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import ObjectDoesNotExist
+from django.http import Http404, HttpResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, status
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.views import exception_handler
+
+from apis.core.pagination import KeysetPagination
+from apis.core.parsers import FastJSONParser
+from apis.core.renderers import FastJSONRenderer
+from apis.users.authentication import StatelessJWTAuthentication
+
+
+class AsyncAPIView(View):
+    """
+    Minimal async counterpart of DRF's `APIView` for ASGI deployments.
+
+    DRF runs its views synchronously, so under an ASGI server each request to
+    them is handed to a worker thread. Views built on this class are coroutines:
+    they authenticate with `StatelessJWTAuthentication.aauthenticate`, check the
+    usual DRF permission and throttle classes, parse bodies with DRF's parsers and render
+    errors with DRF's exception handler, so clients see the same bodies and
+    status codes as on the sync routes.
+    """
+    authentication_class = StatelessJWTAuthentication
+    permission_classes = []
+    throttle_classes = api_settings.DEFAULT_THROTTLE_CLASSES
+    renderer = FastJSONRenderer()
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Like `APIView.as_view`: clients authenticate with bearer tokens rather
+        # than session cookies, so there is no CSRF token to check.
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        request = Request(request, parsers=[FastJSONParser()])
+        self.request = request
+        try:
+            await self.authenticate(request)
+            self.check_permissions(request)
+            await self.check_throttles(request)
+            method = request.method.lower()
+            handler = getattr(self, method, None) if method in self.http_method_names else None
+            if handler is None:
+                raise exceptions.MethodNotAllowed(request.method)
+            return await handler(request, *args, **kwargs)
+        except (Http404, ObjectDoesNotExist):
+            return self.handle_exception(exceptions.NotFound())
+        except exceptions.APIException as exc:
+            return self.handle_exception(exc)
+
+    async def authenticate(self, request):
+        user_auth_tuple = await self.authentication_class().aauthenticate(request)
+        if user_auth_tuple is not None:
+            request.user, request.auth = user_auth_tuple
+        else:
+            request.user, request.auth = AnonymousUser(), None
+
+    def check_permissions(self, request):
+        for permission in [permission() for permission in self.permission_classes]:
+            if not permission.has_permission(request, self):
+                if request.auth is None:
+                    raise exceptions.NotAuthenticated()
+                raise exceptions.PermissionDenied(getattr(permission, "message", None))
+
+    async def check_throttles(self, request):
+        waits = []
+        for throttle in [throttle() for throttle in self.throttle_classes]:
+            if hasattr(throttle, "aallow_request"):
+                allowed = await throttle.aallow_request(request, self)
+            else:
+                allowed = throttle.allow_request(request, self)
+            if not allowed:
+                waits.append(throttle.wait())
+        if waits:
+            raise exceptions.Throttled(max((wait for wait in waits if wait is not None), default=None))
+
+    def check_object_permissions(self, request, obj):
+        for permission in [permission() for permission in self.permission_classes]:
+            if not permission.has_object_permission(request, self, obj):
+                raise exceptions.PermissionDenied(getattr(permission, "message", None))
+
+    def handle_exception(self, exc):
+        response = exception_handler(exc, {"view": self, "request": self.request})
+        rendered = self.respond(response.data, response.status_code)
+        for name, value in response.items():
+            if name != "Content-Type":
+                rendered[name] = value
+        if isinstance(exc, exceptions.NotAuthenticated):
+            rendered["WWW-Authenticate"] = self.authentication_class().authenticate_header(self.request)
+        return rendered
+
+    def respond(self, data, status=status.HTTP_200_OK):
+        content = b"" if data is None else self.renderer.render(data)
+        return HttpResponse(content, status=status, content_type=self.renderer.media_type)
+
+
+class AsyncListCreateView(AsyncAPIView):
+    """
+    Async list/create endpoint over a compiled `ValuesReader`.
+
+    GET reads the page with `.values()` and async iteration, POST validates with
+    the serializer and saves with `acreate`. The created object is read back
+    through `get_queryset()` so related fields render without lazy queries.
+    """
+    queryset = None
+    serializer_class = None
+    reader = None
+    pagination_class = KeysetPagination
+
+    def get_queryset(self):
+        return self.queryset.all()
+
+    async def get(self, request, *args, **kwargs):
+        paginator = self.pagination_class()
+        rows = self.reader.values(self.get_queryset(), request, paginator.ordering)
+        page = await paginator.apaginate_queryset(rows, request, view=self)
+        return self.respond(paginator.get_paginated_response(await self.reader.arender(page, request)).data)
+
+    async def post(self, request, *args, **kwargs):
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        instance = await self.perform_create(serializer)
+        instance = await self.get_queryset().aget(pk=instance.pk)
+        return self.respond(self.serializer_class(instance).data, status.HTTP_201_CREATED)
+
+    async def perform_create(self, serializer):
+        return await self.queryset.model.objects.acreate(**serializer.validated_data)
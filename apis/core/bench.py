@@ -0,0 +1,127 @@
+import os
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import override_settings
+from django.utils import timezone
+
+from apis.blog.models import Post
+from apis.library.models import Author, Genre, Book
+from apis.todo.models import Task
+
+
+@contextmanager
+def temporary_database(keep=False, on_disk=False):
+    """
+    Run the enclosed block against a freshly migrated test database.
+
+    Benchmarks seed large amounts of data, so they never touch the configured
+    database. With `keep=True` the configured database is used as it is.
+
+    SQLite test databases live in memory, where concurrent writers fail on
+    shared-cache table locks instead of waiting. With `on_disk=True` a temporary
+    file is used instead, for benchmarks sending requests from several threads.
+    """
+    if keep:
+        yield
+        return
+
+    test_settings = connection.settings_dict["TEST"]
+    if on_disk and connection.vendor == "sqlite" and not test_settings.get("NAME"):
+        name = os.path.join(tempfile.gettempdir(), f"bench-{os.getpid()}.sqlite3")
+        test_name = mock.patch.dict(test_settings, NAME=name)
+    else:
+        test_name = mock.patch.dict(test_settings)
+
+    with test_name:
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            yield
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def without_response_cache():
+    """
+    Return a context manager that replaces the response cache with a dummy
+    cache, so benchmarks measure the views rather than cache hits.
+    """
+    return override_settings(CACHES={**settings.CACHES, settings.RESPONSE_CACHE_ALIAS: {
+        "BACKEND": "django.core.cache.backends.dummy.DummyCache",
+    }})
+
+
+def timeit(func, repeat=5, number=1):
+    """
+    Call `func` `number` times per round for `repeat` rounds and return the
+    median seconds per call.
+    """
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        rounds.append((time.perf_counter() - start) / number)
+    return statistics.median(rounds)
+
+
+def percentile(values, percent):
+    """
+    Return the nearest-rank `percent` percentile of `values`.
+    """
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))]
+
+
+def seed(users=1, posts=0, tasks=0, books=0, authors_per_book=2, genres_per_book=2, batch_size=5000):
+    """
+    Bulk insert a synthetic dataset and return the created users.
+
+    Posts and tasks are spread over the users; books share a pool of authors and
+    genres so the many-to-many tables look like a real catalogue.
+    """
+    owners = User.objects.bulk_create(
+        User(username=f"bench-{timezone.now().timestamp()}-{i}") for i in range(users)
+    )
+
+    Post.objects.bulk_create(
+        (Post(author=owners[i % users], title=f"Post {i}", content=f"Content of post {i}. " * 20) for i in range(posts)),
+        batch_size=batch_size,
+    )
+    Task.objects.bulk_create(
+        (Task(owner=owners[i % users], title=f"Task {i}", description=f"Description of task {i}", completed=i % 3 == 0)
+         for i in range(tasks)),
+        batch_size=batch_size,
+    )
+
+    if books:
+        authors = Author.objects.bulk_create(
+            (Author(name=f"Author {i}", bio=f"Biography of author {i}. " * 10) for i in range(max(books // 5, 1))),
+            batch_size=batch_size,
+        )
+        genres = Genre.objects.bulk_create(Genre(name=f"Genre {i}") for i in range(20))
+        now = timezone.now()
+        for start in range(0, books, batch_size):
+            created = Book.objects.bulk_create(
+                Book(title=f"Book {i}", description=f"Description of book {i}", publication_date=now - timedelta(days=i))
+                for i in range(start, min(start + batch_size, books))
+            )
+            Book.authors.through.objects.bulk_create(
+                (Book.authors.through(book_id=book.pk, author_id=authors[(book.pk * 7 + j) % len(authors)].pk)
+                 for book in created for j in range(authors_per_book)),
+                ignore_conflicts=True,
+            )
+            Book.genres.through.objects.bulk_create(
+                (Book.genres.through(book_id=book.pk, genre_id=genres[(book.pk + j) % len(genres)].pk)
+                 for book in created for j in range(genres_per_book)),
+                ignore_conflicts=True,
+            )
+
+    return owners
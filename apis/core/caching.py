@@ -0,0 +1,171 @@
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+
+STORED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Vary")
+
+
+class ResponseCache:
+    """
+    Caches rendered GET responses in a Django cache and invalidates them by generation.
+
+    Every cached response is keyed by generation counters stored in the same cache:
+    list responses by the namespace's list generation and detail responses by the
+    object's generation, and both by the namespace generation. Invalidating bumps
+    the counters, so stale entries are never read again and age out of the cache
+    on their own. With a shared backend (`FileBasedCache`, `DatabaseCache`, ...)
+    the cache and its invalidations are shared by every worker.
+
+    Hits, misses and the age of the responses served from the cache are counted
+    per process, reported by `stats()` and exposed on the metrics endpoint by
+    `render_metrics()`.
+    """
+
+    def __init__(self, alias=None):
+        self.alias = alias
+        self.lock = threading.Lock()
+        self.reset_stats()
+
+    @property
+    def cache(self):
+        return caches[self.alias or getattr(settings, "RESPONSE_CACHE_ALIAS", "default")]
+
+    def generations(self, namespace, pk=None):
+        keys = [f"gen:{namespace}", f"gen:{namespace}:{'list' if pk is None else pk}"]
+        values = self.cache.get_many(keys)
+        return [values.get(key, 0) for key in keys]
+
+    def make_key(self, namespace, request, pk=None):
+        generations = ".".join(str(generation) for generation in self.generations(namespace, pk))
+        # Paginated bodies hold absolute links, so the scheme and host are part of the key.
+        digest = hashlib.md5(request.build_absolute_uri().encode(), usedforsecurity=False).hexdigest()
+        return f"response:{namespace}:{generations}:{request.accepted_media_type}:{digest}"
+
+    def get(self, key):
+        entry = self.cache.get(key)
+        with self.lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            age = time.time() - entry[0]
+            self.total_age += age
+            self.max_age = max(self.max_age, age)
+
+        stored_at, content, headers = entry
+        response = HttpResponse(content, headers=headers)
+        response["Age"] = int(age)
+        response["X-Cache"] = "HIT"
+        return response
+
+    def set(self, key, response):
+        headers = {header: response[header] for header in STORED_HEADERS if response.has_header(header)}
+        self.cache.set(key, (time.time(), response.content, headers))
+
+    def invalidate(self, namespace, pks=()):
+        """
+        Invalidate the list responses of `namespace` and the detail responses of `pks`.
+        """
+        keys = [f"gen:{namespace}:list", *(f"gen:{namespace}:{pk}" for pk in pks)]
+        self._on_commit(self._bump, keys)
+
+    def invalidate_all(self, namespace):
+        """
+        Invalidate every list and detail response of `namespace`.
+        """
+        self._on_commit(self._bump, [f"gen:{namespace}"])
+
+    def _on_commit(self, func, *args):
+        # Bump right away so this process stops serving the old data, and again
+        # on commit so responses cached from a concurrent read before the commit
+        # are dropped as well.
+        func(*args)
+        if transaction.get_connection().in_atomic_block:
+            transaction.on_commit(lambda: func(*args))
+
+    def _bump(self, keys):
+        for key in keys:
+            self.cache.add(key, 0, timeout=None)
+            try:
+                self.cache.incr(key)
+            except ValueError:
+                self.cache.set(key, 1, timeout=None)
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "mean_age": self.total_age / self.hits if self.hits else 0.0,
+                "max_age": self.max_age,
+            }
+
+    def render_metrics(self):
+        """
+        Return `stats()` in the Prometheus text exposition format.
+        """
+        stats = self.stats()
+        return "".join(
+            f"# HELP response_cache_{name} {description}\n# TYPE response_cache_{name} {kind}\n"
+            f"response_cache_{name} {stats[key]}\n"
+            for name, key, kind, description in (
+                ("hits_total", "hits", "counter", "Responses served from the response cache."),
+                ("misses_total", "misses", "counter", "Cacheable responses not found in the response cache."),
+                ("hit_ratio", "hit_ratio", "gauge", "Share of lookups served from the response cache."),
+                ("mean_age_seconds", "mean_age", "gauge", "Mean age of the responses served from the cache."),
+                ("max_age_seconds", "max_age", "gauge", "Oldest response served from the cache."),
+            )
+        )
+
+    def reset_stats(self):
+        with self.lock:
+            self.hits = self.misses = 0
+            self.total_age = self.max_age = 0.0
+
+
+response_cache = ResponseCache()
+
+
+class CachedResponseMixin:
+    """
+    Serves the GET list and retrieve actions of a generic view from `response_cache`.
+
+    Responses are cached under `cache_namespace`, which defaults to the label of
+    the view's model (`"blog.post"`), the namespace its signals invalidate. Only
+    use it on views whose responses are the same for every user, since the object
+    permission checks of `retrieve` are skipped on a cache hit. HTML responses of
+    the browsable API hold the viewer's name and CSRF token and are never cached.
+    """
+    cache_namespace = None
+
+    def get_cache_namespace(self):
+        return self.cache_namespace or self.queryset.model._meta.label_lower
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, None, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        object_pk = kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        return self.cached_response(super().retrieve, object_pk, request, *args, **kwargs)
+
+    def cached_response(self, handler, object_pk, request, *args, **kwargs):
+        if request.accepted_media_type.startswith("text/html"):
+            return handler(request, *args, **kwargs)
+
+        key = response_cache.make_key(self.get_cache_namespace(), request, object_pk)
+        response = response_cache.get(key)
+        if response is not None:
+            return response
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200 and not response.streaming:
+            response["X-Cache"] = "MISS"
+            response.add_post_render_callback(lambda rendered: response_cache.set(key, rendered))
+        return response
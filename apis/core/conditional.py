@@ -0,0 +1,181 @@
+import hashlib
+from collections import namedtuple
+
+from django.db import transaction
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.response import Response
+
+PRECONDITION_HEADERS = ("HTTP_IF_MATCH", "HTTP_IF_NONE_MATCH", "HTTP_IF_MODIFIED_SINCE", "HTTP_IF_UNMODIFIED_SINCE")
+
+
+class Validators(namedtuple("Validators", ["etag", "last_modified"])):
+    """
+    The `ETag` and `Last-Modified` validators of a representation.
+    """
+
+    @property
+    def timestamp(self):
+        return int(self.last_modified.timestamp()) if self.last_modified else None
+
+
+def make_etag(*parts):
+    return '"%s"' % hashlib.md5(":".join(str(part) for part in parts).encode(), usedforsecurity=False).hexdigest()
+
+
+def representation(request):
+    """
+    What selects the representation of a resource in `request`: the negotiated
+    media type and the `?fields=`/`?expand=` parameters. Mixed into every ETag,
+    so e.g. the JSON and MessagePack responses of an object don't share one.
+    """
+    params = request.query_params
+    return (request.accepted_media_type, params.get("fields", ""), params.get("expand", ""))
+
+
+def object_validators(obj, request):
+    """
+    Validators of a single object, derived from its `updated_at`.
+    """
+    etag = make_etag(obj._meta.label_lower, obj.pk, obj.updated_at.isoformat(), *representation(request))
+    return Validators(etag, obj.updated_at)
+
+
+def list_validators(queryset, request, *parts):
+    """
+    Validators of a list, derived from `max(updated_at)` and the row count of `queryset`.
+
+    The count catches deletions, which do not move `max(updated_at)`. `parts` are
+    mixed into the ETag to tell apart representations of the same rows, such as
+    different pages.
+    """
+    aggregate = queryset.order_by().aggregate(last_modified=Max("updated_at"), count=Count("pk"))
+    etag = make_etag(
+        queryset.model._meta.label_lower, aggregate["last_modified"], aggregate["count"],
+        *representation(request), *parts,
+    )
+    return Validators(etag, aggregate["last_modified"])
+
+
+def page_validators(model, rows, request, *parts):
+    """
+    Validators of a page of `rows` read with `.values()`, derived from the `id` and
+    `updated_at` of each row.
+
+    They cover exactly what the page shows, so unlike `list_validators` they need
+    no query besides the page's own. `parts` are mixed into the ETag like there.
+    """
+    last_modified = max((row["updated_at"] for row in rows), default=None)
+    etag = make_etag(
+        model._meta.label_lower, *((row["id"], row["updated_at"].isoformat()) for row in rows),
+        *representation(request), *parts,
+    )
+    return Validators(etag, last_modified)
+
+
+def has_preconditions(request):
+    return any(header in request.META for header in PRECONDITION_HEADERS)
+
+
+def evaluate_preconditions(request, validators):
+    """
+    Evaluate the request's conditional headers against `validators`.
+
+    Returns a 304 or 412 response when a precondition says so, otherwise `None`.
+    """
+    response = get_conditional_response(request, etag=validators.etag, last_modified=validators.timestamp)
+    return set_validators(response, validators) if response is not None else None
+
+
+def claim(instance):
+    """
+    Bump the `updated_at` of `instance`'s row if it still holds the value read into
+    `instance`, and return whether it did.
+
+    Conditional writes call it in the transaction that saves the object, after the
+    preconditions passed: the update locks the row until commit, so of two clients
+    sending the same validators only the first one writes and the other one finds
+    a changed `updated_at`.
+    """
+    rows = type(instance)._default_manager.filter(pk=instance.pk, updated_at=instance.updated_at)
+    return rows.update(updated_at=timezone.now()) == 1
+
+
+def precondition_failed():
+    return HttpResponse(status=status.HTTP_412_PRECONDITION_FAILED)
+
+
+def set_validators(response, validators):
+    patch_vary_headers(response, ["Accept"])
+    response["ETag"] = validators.etag
+    if validators.last_modified:
+        response["Last-Modified"] = http_date(validators.timestamp)
+    return response
+
+
+class ConditionalMixin:
+    """
+    Adds `ETag`/`Last-Modified` validators and conditional request handling to a generic view.
+
+    - GET list and retrieve responses carry validators, and `If-None-Match` or
+      `If-Modified-Since` requests that match get a 304 without serializing.
+    - PUT/PATCH requests with `If-Match` or `If-Unmodified-Since` are rejected with
+      412 if the object changed in the meantime, including while the request runs.
+
+    The view's model needs an `updated_at` field.
+    """
+
+    object = None
+
+    def get_object(self):
+        if self.object is None:
+            self.object = super().get_object()
+        return self.object
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        validators = None
+        if has_preconditions(request):
+            validators = list_validators(queryset, request, request.get_full_path())
+            response = evaluate_preconditions(request, validators)
+            if response is not None:
+                return response
+
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200 and not response.streaming and not response.has_header("ETag"):
+            set_validators(response, validators or list_validators(queryset, request, request.get_full_path()))
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        if has_preconditions(request):
+            instance = self.get_object()
+            validators = object_validators(instance, request)
+            response = evaluate_preconditions(request, validators)
+            if response is not None:
+                return response
+            return set_validators(Response(self.get_serializer(instance).data), validators)
+
+        response = super().retrieve(request, *args, **kwargs)
+        if response.status_code == 200 and not response.has_header("ETag"):
+            set_validators(response, object_validators(self.object, request))
+        return response
+
+    def update(self, request, *args, **kwargs):
+        if has_preconditions(request):
+            instance = self.get_object()
+            response = evaluate_preconditions(request, object_validators(instance, request))
+            if response is not None:
+                return response
+            with transaction.atomic():
+                if not claim(instance):
+                    return precondition_failed()
+                response = super().update(request, *args, **kwargs)
+        else:
+            response = super().update(request, *args, **kwargs)
+        if response.status_code == 200:
+            set_validators(response, object_validators(self.object, request))
+        return response
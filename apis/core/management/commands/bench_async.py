@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import AsyncClient, Client, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apis.core.bench import percentile, seed, temporary_database, without_response_cache
+from apis.library.models import Book
+from apis.todo.models import Task
+
+
+class Command(BaseCommand):
+    help = "Compare throughput and latency of the sync (WSGI) and async (ASGI) views on the same endpoints."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500, help="Requests per endpoint and stack (default: 500).")
+        parser.add_argument("--concurrency", type=int, default=32, help="Requests in flight (default: 32).")
+        parser.add_argument("--rows", type=int, default=200, help="Rows seeded per list (default: 200).")
+        parser.add_argument("--use-existing-db", action="store_true",
+                            help="Seed and read the configured database instead of a temporary one.")
+        parser.add_argument("--with-cache", action="store_true",
+                            help="Leave the response cache of the sync views enabled.")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        try:
+            with temporary_database(keep=options["use_existing_db"]), self.response_cache(options["with_cache"]):
+                self.run(options)
+        finally:
+            teardown_test_environment()
+
+    def response_cache(self, enabled):
+        return override_settings() if enabled else without_response_cache()
+
+    def run(self, options):
+        user, = seed(users=1, posts=options["rows"], tasks=options["rows"], books=options["rows"])
+        task = Task.objects.filter(owner=user).first()
+        book = Book.objects.first()
+        headers = {"Authorization": f"Bearer {AccessToken.for_user(user)}"}
+        endpoints = [
+            ("post list", reverse("post-list-create"), reverse("async-post-list-create")),
+            ("task list", reverse("task-list"), reverse("async-task-list")),
+            ("task detail", reverse("task-detail", args=[task.pk]), reverse("async-task-detail", args=[task.pk])),
+            ("book list", reverse("book-list"), reverse("async-book-list")),
+            ("book detail", reverse("book-detail", args=[book.pk]), reverse("async-book-detail", args=[book.pk])),
+        ]
+
+        self.stdout.write(f"{'endpoint':<14}{'stack':<7}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}")
+        for name, sync_path, async_path in endpoints:
+            for stack, elapsed, latencies in [
+                ("wsgi", *self.run_wsgi(sync_path, headers, options["requests"], options["concurrency"])),
+                ("asgi", *asyncio.run(self.run_asgi(async_path, headers, options["requests"], options["concurrency"]))),
+            ]:
+                self.stdout.write(
+                    f"{name:<14}{stack:<7}{len(latencies) / elapsed:>9.0f}"
+                    f"{percentile(latencies, 50) * 1e3:>9.1f}{percentile(latencies, 99) * 1e3:>9.1f}"
+                )
+
+    def run_wsgi(self, path, headers, requests, concurrency):
+        """
+        Serve `requests` GETs through the WSGI handler from `concurrency` threads.
+        """
+        latencies = []
+
+        def worker(count):
+            client = Client()
+            try:
+                for _ in range(count):
+                    start = time.perf_counter()
+                    response = client.get(path, headers=headers)
+                    latencies.append(time.perf_counter() - start)
+                    assert response.status_code == 200, response.content
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker, args=(count,)) for count in self.split(requests, concurrency)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - start, latencies
+
+    async def run_asgi(self, path, headers, requests, concurrency):
+        """
+        Serve `requests` GETs through the ASGI handler from `concurrency` tasks.
+        """
+        latencies = []
+
+        async def worker(count):
+            client = AsyncClient()
+            for _ in range(count):
+                start = time.perf_counter()
+                response = await client.get(path, headers=headers)
+                latencies.append(time.perf_counter() - start)
+                assert response.status_code == 200, response.content
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(count) for count in self.split(requests, concurrency)))
+        elapsed = time.perf_counter() - start
+        await sync_to_async(connections.close_all)()
+        return elapsed, latencies
+
+    def split(self, requests, workers):
+        return [requests // workers + (i < requests % workers) for i in range(min(workers, requests))]
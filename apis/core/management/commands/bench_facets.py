@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, reset_queries
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from apis.core.bench import seed, temporary_database, timeit, without_response_cache
+from apis.library.models import Author, Genre
+
+
+class Command(BaseCommand):
+    help = "Time filtered and faceted book list requests on a synthetic catalogue."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--books", type=int, default=500_000, help="Books in the catalogue (default: 500000).")
+        parser.add_argument("--repeat", type=int, default=5, help="Timed rounds per request (default: 5).")
+        parser.add_argument("--use-existing-db", action="store_true",
+                            help="Seed and read the configured database instead of a temporary one.")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        try:
+            with temporary_database(keep=options["use_existing_db"]), without_response_cache():
+                self.run(options)
+        finally:
+            teardown_test_environment()
+
+    def run(self, options):
+        seed(books=options["books"])
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        author = Author.objects.order_by("pk").first()
+        genre = Genre.objects.order_by("pk").first()
+        cases = [
+            ("unfiltered", {}),
+            ("genre", {"genre": genre.pk}),
+            ("author", {"author": author.pk}),
+            ("date range", {"published_after": "2000-01-01", "published_before": "2004-12-31"}),
+            ("title search", {"search": "book 4242"}),
+            ("combined", {"genre": genre.pk, "published_after": "1990-01-01", "search": "book 1"}),
+        ]
+
+        client = Client()
+        url = reverse("book-list")
+        self.stdout.write(f"{'filter':<14}{'ms':>9}{'queries':>9}")
+        for name, params in cases:
+            reset_queries()
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(url, params)
+            assert response.status_code == 200, response.content
+            elapsed = timeit(lambda: client.get(url, params), repeat=options["repeat"]) * 1e3
+            self.stdout.write(f"{name:<14}{elapsed:>9.1f}{len(queries):>9}")
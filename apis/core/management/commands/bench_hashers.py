@@ -0,0 +1,102 @@
+import os
+import threading
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, ScryptPasswordHasher, get_hasher
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import Client, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from apis.core.bench import temporary_database, timeit
+from apis.core.throttling import LoginRateThrottle
+from apis.users import hashers
+
+
+class Command(BaseCommand):
+    help = "Measure password hashers and login throughput, and suggest scrypt parameters for a target hashing time."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--target-ms", type=float, default=50,
+                            help="Hashing time per login to tune scrypt for (default: 50).")
+        parser.add_argument("--logins", type=int, default=200, help="Logins per run (default: 200).")
+        parser.add_argument("--concurrency", type=int, default=8, help="Logins in flight (default: 8).")
+        parser.add_argument("--repeat", type=int, default=3, help="Timed rounds per hasher (default: 3).")
+        parser.add_argument("--use-existing-db", action="store_true",
+                            help="Log in against the configured database instead of a temporary one.")
+
+    def handle(self, *args, **options):
+        self.hashers(options)
+        setup_test_environment()
+        try:
+            with temporary_database(keep=options["use_existing_db"]):
+                self.logins(options)
+        finally:
+            teardown_test_environment()
+
+    def hashers(self, options):
+        candidates = [(f"pbkdf2_sha256 {PBKDF2PasswordHasher.iterations}", PBKDF2PasswordHasher())]
+        for exponent in range(12, 18):
+            hasher = ScryptPasswordHasher()
+            hasher.work_factor = 2 ** exponent
+            hasher.maxmem = 2 * 128 * hasher.block_size * hasher.work_factor
+            candidates.append((f"scrypt 2**{exponent}", hasher))
+
+        self.stdout.write(f"{'hasher':<24}{'ms/hash':>9}{'logins/s/core':>15}")
+        suggested = None
+        for name, hasher in candidates:
+            elapsed = timeit(lambda: hasher.encode("password", hasher.salt()), repeat=options["repeat"])
+            self.stdout.write(f"{name:<24}{elapsed * 1e3:>9.1f}{1 / elapsed:>15.1f}")
+            if isinstance(hasher, ScryptPasswordHasher) and elapsed * 1e3 <= options["target_ms"]:
+                suggested = hasher.work_factor
+
+        current = get_hasher("default")
+        self.stdout.write(f"\nPreferred hasher: {current.algorithm} {getattr(current, 'work_factor', '')}")
+        if suggested is not None:
+            self.stdout.write(
+                f"Largest scrypt work factor within {options['target_ms']:.0f} ms: "
+                f"PASSWORD_SCRYPT_PARAMS = {{'work_factor': {suggested}, 'block_size': 8, 'parallelism': 1}}"
+            )
+
+    def logins(self, options):
+        User.objects.create_user(username="bench", password="bench-password")
+        rates = {**LoginRateThrottle.THROTTLE_RATES, "login": f"{options['logins'] * 10}/min"}
+        cores = os.cpu_count() or 1
+
+        self.stdout.write(f"\n{'login':<24}{'logins/s':>9}{'logins/s/core':>15}")
+        with mock.patch.object(LoginRateThrottle, "THROTTLE_RATES", rates):
+            for name, workers in [("request thread", 0), ("hashing pool", settings.PASSWORD_HASH_WORKERS)]:
+                with override_settings(PASSWORD_HASH_WORKERS=workers):
+                    hashers.make_password("warm up the pool")
+                    elapsed = self.run_logins(options["logins"], options["concurrency"])
+                busy = min(cores, workers or options["concurrency"])
+                self.stdout.write(
+                    f"{f'{name} ({workers} workers)':<24}{options['logins'] / elapsed:>9.1f}"
+                    f"{options['logins'] / elapsed / busy:>15.1f}"
+                )
+
+    def run_logins(self, logins, concurrency):
+        path = reverse("users:token_obtain_pair")
+
+        def worker(count):
+            client = Client()
+            try:
+                for _ in range(count):
+                    response = client.post(path, {"username": "bench", "password": "bench-password"},
+                                           content_type="application/json")
+                    assert response.status_code == 200, response.content
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker, args=(logins // concurrency + (i < logins % concurrency),))
+                   for i in range(concurrency)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - start
@@ -0,0 +1,50 @@
+from io import BytesIO
+
+from django.core.management.base import BaseCommand
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from apis.core.bench import seed, temporary_database, timeit
+from apis.core.parsers import FastJSONParser
+from apis.core.renderers import FastJSONRenderer, orjson
+from apis.library.models import Book
+from apis.library.serializers import BookSerializer
+from apis.todo.models import Task
+from apis.todo.serializers import TaskSerializer
+
+
+class Command(BaseCommand):
+    help = "Compare JSONRenderer/JSONParser with FastJSONRenderer/FastJSONParser on serialized task and book lists."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=2000, help="Rows per list (default: 2000).")
+        parser.add_argument("--repeat", type=int, default=5, help="Timed rounds per measurement (default: 5).")
+        parser.add_argument("--use-existing-db", action="store_true",
+                            help="Seed and read the configured database instead of a temporary one.")
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stderr.write("orjson is not installed; FastJSONRenderer falls back to JSONRenderer.")
+
+        rows = options["rows"]
+        with temporary_database(keep=options["use_existing_db"]):
+            seed(users=1, tasks=rows, books=rows)
+            payloads = [
+                ("task", TaskSerializer(Task.objects.select_related("owner").order_by("id")[:rows], many=True).data),
+                ("book", BookSerializer(Book.objects.with_related().order_by("id")[:rows], many=True).data),
+            ]
+
+        self.stdout.write(
+            f"{'payload':<9}{'KiB':>7}{'render us/row':>15}{'fast':>8}{'parse us/row':>14}{'fast':>8}  identical"
+        )
+        for name, data in payloads:
+            body = JSONRenderer().render(data)
+            identical = FastJSONRenderer().render(data) == body
+            render = timeit(lambda: JSONRenderer().render(data), repeat=options["repeat"]) / rows * 1e6
+            fast_render = timeit(lambda: FastJSONRenderer().render(data), repeat=options["repeat"]) / rows * 1e6
+            parse = timeit(lambda: JSONParser().parse(BytesIO(body)), repeat=options["repeat"]) / rows * 1e6
+            fast_parse = timeit(lambda: FastJSONParser().parse(BytesIO(body)), repeat=options["repeat"]) / rows * 1e6
+            self.stdout.write(
+                f"{name:<9}{len(body) / 1024:>7.0f}{render:>15.2f}{fast_render:>8.2f}"
+                f"{parse:>14.2f}{fast_parse:>8.2f}  {identical}"
+            )
@@ -0,0 +1,64 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apis.core.bench import seed, temporary_database, without_response_cache
+from apis.core.metrics import request_metrics
+from apis.library.models import Book
+from apis.todo.models import Task
+
+MIDDLEWARE = "apis.core.metrics.PerformanceMiddleware"
+
+
+class Command(BaseCommand):
+    help = "Measure the overhead of PerformanceMiddleware on typical endpoints."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=1000, help="Requests per endpoint and setup (default: 1000).")
+        parser.add_argument("--rows", type=int, default=200, help="Rows seeded per list (default: 200).")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        try:
+            with temporary_database(), without_response_cache():
+                self.run(options)
+        finally:
+            teardown_test_environment()
+
+    def run(self, options):
+        user, = seed(users=1, posts=options["rows"], tasks=options["rows"], books=options["rows"])
+        headers = {"Authorization": f"Bearer {AccessToken.for_user(user)}"}
+        endpoints = [
+            ("task list", reverse("task-list")),
+            ("task detail", reverse("task-detail", args=[Task.objects.filter(owner=user).first().pk])),
+            ("book list", reverse("book-list")),
+            ("book detail", reverse("book-detail", args=[Book.objects.first().pk])),
+        ]
+        without = [name for name in settings.MIDDLEWARE if name != MIDDLEWARE]
+        clients = {}
+        for setup, middleware in [("off", without), ("on", [MIDDLEWARE, *without])]:
+            # The client loads the middleware on its first request and keeps it.
+            with override_settings(MIDDLEWARE=middleware):
+                clients[setup] = Client(headers=headers)
+                clients[setup].get(endpoints[0][1])
+
+        self.stdout.write(f"{'endpoint':<14}{'off us':>10}{'on us':>10}{'overhead':>10}")
+        with override_settings(SERVER_TIMING=True):
+            for name, path in endpoints:
+                latencies = {setup: [] for setup in clients}
+                # Alternate the setups request by request, so drift in machine load
+                # affects both alike, and compare medians.
+                for _ in range(options["requests"]):
+                    for setup, client in clients.items():
+                        start = time.perf_counter()
+                        client.get(path)
+                        latencies[setup].append(time.perf_counter() - start)
+                off, on = (statistics.median(latencies[setup]) for setup in ("off", "on"))
+                self.stdout.write(f"{name:<14}{off * 1e6:>10.0f}{on * 1e6:>10.0f}{on / off - 1:>10.1%}")
+        request_metrics.reset()
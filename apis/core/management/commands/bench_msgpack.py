@@ -0,0 +1,51 @@
+from io import BytesIO
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apis.core.bench import seed, temporary_database, timeit
+from apis.core.parsers import CBORParser, FastJSONParser, MessagePackParser
+from apis.core.renderers import CBORRenderer, FastJSONRenderer, MessagePackRenderer, cbor2, msgpack
+from apis.library.models import Book
+from apis.library.serializers import BookSerializer
+from apis.todo.models import Task
+from apis.todo.serializers import TaskSerializer
+
+
+class Command(BaseCommand):
+    help = "Compare payload size and encode/decode time of JSON, MessagePack and CBOR on task and book lists."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=2000, help="Rows per list (default: 2000).")
+        parser.add_argument("--repeat", type=int, default=5, help="Timed rounds per measurement (default: 5).")
+        parser.add_argument("--use-existing-db", action="store_true",
+                            help="Seed and read the configured database instead of a temporary one.")
+
+    def handle(self, *args, **options):
+        formats = [("json", FastJSONRenderer, FastJSONParser)]
+        if msgpack is not None:
+            formats.append(("msgpack", MessagePackRenderer, MessagePackParser))
+        if cbor2 is not None:
+            formats.append(("cbor", CBORRenderer, CBORParser))
+        if len(formats) == 1:
+            raise CommandError("Neither msgpack nor cbor2 is installed.")
+
+        rows = options["rows"]
+        with temporary_database(keep=options["use_existing_db"]):
+            seed(users=1, tasks=rows, books=rows)
+            payloads = [
+                ("task", TaskSerializer(Task.objects.select_related("owner").order_by("id")[:rows], many=True).data),
+                ("book", BookSerializer(Book.objects.with_related().order_by("id")[:rows], many=True).data),
+            ]
+
+        self.stdout.write(f"{'payload':<9}{'format':<9}{'KiB':>7}{'size':>7}{'encode us/row':>15}{'decode us/row':>15}")
+        for name, data in payloads:
+            json_size = None
+            for format, renderer_class, parser_class in formats:
+                body = renderer_class().render(data)
+                json_size = json_size or len(body)
+                encode = timeit(lambda: renderer_class().render(data), repeat=options["repeat"]) / rows * 1e6
+                decode = timeit(lambda: parser_class().parse(BytesIO(body)), repeat=options["repeat"]) / rows * 1e6
+                self.stdout.write(
+                    f"{name:<9}{format:<9}{len(body) / 1024:>7.0f}{len(body) / json_size:>7.0%}"
+                    f"{encode:>15.2f}{decode:>15.2f}"
+                )
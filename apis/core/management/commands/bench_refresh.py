@@ -0,0 +1,67 @@
+import time
+import uuid
+from datetime import timedelta
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apis.core.bench import percentile, seed, temporary_database
+from apis.core.throttling import WriteRateThrottle
+from apis.users.blacklist import token_blacklist
+from apis.users.models import RevokedToken
+
+
+class Command(BaseCommand):
+    help = "Measure token refresh latency as the number of revoked refresh tokens grows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="0,10000,100000,1000000",
+                            help="Comma-separated revoked token counts to measure at (default: 0,10000,100000,1000000).")
+        parser.add_argument("--refreshes", type=int, default=200, help="Refreshes per size (default: 200).")
+        parser.add_argument("--batch-size", type=int, default=10000, help="Rows per insert when seeding.")
+
+    def handle(self, *args, **options):
+        rates = {**WriteRateThrottle.THROTTLE_RATES, "write": f"{options['refreshes'] * 100}/min"}
+        setup_test_environment()
+        try:
+            with temporary_database(), mock.patch.object(WriteRateThrottle, "THROTTLE_RATES", rates):
+                self.run(options)
+        finally:
+            teardown_test_environment()
+
+    def run(self, options):
+        user, = seed(users=1)
+        client = Client()
+        path = reverse("users:token_refresh")
+        expires_at = timezone.now() + timedelta(days=1)
+
+        self.stdout.write(f"{'revoked':>10}{'p50 ms':>9}{'p99 ms':>9}{'queries':>9}")
+        for size in map(int, options["sizes"].split(",")):
+            missing = size - RevokedToken.objects.count()
+            for start in range(0, missing, options["batch_size"]):
+                RevokedToken.objects.bulk_create(
+                    RevokedToken(jti=uuid.uuid4().hex, expires_at=expires_at, expires_on=expires_at.date())
+                    for _ in range(min(options["batch_size"], missing - start))
+                )
+            token_blacklist.rebuild()
+            client.post(path, {"refresh": str(RefreshToken.for_user(user))}, content_type="application/json")
+
+            latencies, queries = [], 0
+            for _ in range(options["refreshes"]):
+                body = {"refresh": str(RefreshToken.for_user(user))}
+                with CaptureQueriesContext(connection) as context:
+                    start = time.perf_counter()
+                    response = client.post(path, body, content_type="application/json")
+                    latencies.append(time.perf_counter() - start)
+                assert response.status_code == 200, response.content
+                queries += len(context.captured_queries)
+            self.stdout.write(
+                f"{size:>10}{percentile(latencies, 50) * 1e3:>9.2f}{percentile(latencies, 99) * 1e3:>9.2f}"
+                f"{queries / options['refreshes']:>9.1f}"
+            )
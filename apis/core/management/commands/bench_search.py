@@ -0,0 +1,67 @@
+import random
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from apis.blog.models import Post
+from apis.blog.search import search_posts
+from apis.core.bench import seed, temporary_database, timeit
+
+
+class Command(BaseCommand):
+    help = "Time full-text post search against an icontains scan on a synthetic corpus."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=1_000_000, help="Posts in the corpus (default: 1000000).")
+        parser.add_argument("--words", type=int, default=60, help="Words per post (default: 60).")
+        parser.add_argument("--repeat", type=int, default=5, help="Timed rounds per query (default: 5).")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Posts per insert (default: 5000).")
+        parser.add_argument("--use-existing-db", action="store_true",
+                            help="Seed and read the configured database instead of a temporary one.")
+
+    def handle(self, *args, **options):
+        with temporary_database(keep=options["use_existing_db"]):
+            vocabulary = self.seed_corpus(options["posts"], options["words"], options["batch_size"])
+            queries = [
+                ("common", vocabulary[0]),
+                ("medium", vocabulary[len(vocabulary) // 20]),
+                ("rare", vocabulary[-1]),
+                ("two terms", f"{vocabulary[1]} {vocabulary[len(vocabulary) // 10]}"),
+            ]
+
+            self.stdout.write(f"{'query':<12}{'hits':>7}{'search ms':>11}{'icontains ms':>14}")
+            for name, query in queries:
+                hits = len(search_posts(query))
+                search_time = timeit(lambda: search_posts(query), repeat=options["repeat"]) * 1e3
+                scan_time = timeit(lambda: self.scan(query), repeat=options["repeat"]) * 1e3
+                self.stdout.write(f"{name:<12}{hits:>7}{search_time:>11.1f}{scan_time:>14.1f}")
+
+    def seed_corpus(self, posts, words, batch_size):
+        """
+        Insert `posts` posts of Zipf-distributed words and return the vocabulary,
+        most frequent word first.
+        """
+        rng = random.Random(0)
+        syllables = ["ka", "lo", "mi", "ne", "ru", "sa", "to", "vi", "zen", "dor", "pel", "qui"]
+        vocabulary = list(dict.fromkeys(
+            "".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))) for _ in range(20000)
+        ))
+        weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+
+        author, = seed(users=1)
+        for start in range(0, posts, batch_size):
+            Post.objects.bulk_create(
+                Post(
+                    author=author,
+                    title=" ".join(rng.choices(vocabulary, weights, k=6)),
+                    content=" ".join(rng.choices(vocabulary, weights, k=words)),
+                )
+                for _ in range(start, min(start + batch_size, posts))
+            )
+        return vocabulary
+
+    def scan(self, query):
+        condition = Q()
+        for term in query.split():
+            condition &= Q(title__icontains=term) | Q(content__icontains=term)
+        return list(Post.objects.filter(condition).values_list("id", flat=True)[:20])
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from apis.blog.models import Post
+from apis.blog.serializers import PostSerializer
+from apis.core.bench import seed, temporary_database, timeit
+from apis.core.readers import ValuesReader
+from apis.library.models import Book
+from apis.library.serializers import BookSerializer
+from apis.todo.models import Task
+from apis.todo.serializers import TaskSerializer
+
+
+class Command(BaseCommand):
+    help = "Compare the per-row cost of the DRF serializers and their compiled ValuesReader read paths."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=2000, help="Rows per list (default: 2000).")
+        parser.add_argument("--repeat", type=int, default=5, help="Timed rounds per measurement (default: 5).")
+        parser.add_argument("--use-existing-db", action="store_true",
+                            help="Seed and read the configured database instead of a temporary one.")
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        with temporary_database(keep=options["use_existing_db"]):
+            seed(users=1, posts=rows, tasks=rows, books=rows)
+            cases = [
+                ("post", PostSerializer, Post.objects.select_related("author").order_by("id")[:rows]),
+                ("task", TaskSerializer, Task.objects.select_related("owner").order_by("id")[:rows]),
+                ("book", BookSerializer, Book.objects.with_related().order_by("id")[:rows]),
+            ]
+
+            self.stdout.write(f"{'serializer':<12}{'drf us/row':>12}{'compiled us/row':>17}{'speedup':>9}  identical")
+            for name, serializer_class, queryset in cases:
+                reader = ValuesReader(serializer_class)
+
+                def drf():
+                    return serializer_class(queryset.all(), many=True).data
+
+                def compiled():
+                    return reader.render(reader.values(queryset.all()))
+
+                renderer = JSONRenderer()
+                identical = renderer.render(drf()) == renderer.render(compiled())
+                drf_time = timeit(drf, repeat=options["repeat"]) / rows * 1e6
+                compiled_time = timeit(compiled, repeat=options["repeat"]) / rows * 1e6
+                self.stdout.write(
+                    f"{name:<12}{drf_time:>12.1f}{compiled_time:>17.1f}{drf_time / compiled_time:>8.1f}x  {identical}"
+                )
@@ -0,0 +1,60 @@
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework.throttling import UserRateThrottle
+
+from apis.core.bench import timeit
+from apis.core.throttling import TokenBucketThrottle, WriteRateThrottle, local_bucket_store
+
+CACHES = {
+    "locmem": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "bench-throttle"},
+}
+
+
+class Command(BaseCommand):
+    help = "Measure the cost of a throttle check with each bucket store, against DRF's UserRateThrottle."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--checks", type=int, default=10000, help="Checks per round (default: 10000).")
+        parser.add_argument("--clients", type=int, default=1000,
+                            help="Distinct users the checks are spread over (default: 1000).")
+        parser.add_argument("--repeat", type=int, default=5, help="Timed rounds per measurement (default: 5).")
+        parser.add_argument("--cache", action="append", default=[], metavar="ALIAS",
+                            help="Also measure a CacheBucketStore on this configured cache alias. Repeatable.")
+
+    def handle(self, *args, **options):
+        factory = APIRequestFactory()
+        requests = []
+        for pk in range(options["clients"]):
+            request = Request(factory.post("/"))
+            request.user = User(pk=pk + 1)
+            requests.append(request)
+        anonymous = Request(factory.post("/"))
+        anonymous.user = AnonymousUser()
+        checks = options["checks"]
+        # A rate that never throttles, so every check takes the same path.
+        rates = {"write": f"{checks * options['repeat'] * 10}/min", "user": f"{checks * options['repeat'] * 10}/min"}
+
+        stores = [("local", None), ("locmem cache", "locmem"), *((f"{alias} cache", alias) for alias in options["cache"])]
+        self.stdout.write(f"{'throttle':<28}{'us/check':>10}")
+        caches = {**settings.CACHES, **CACHES, **{alias: settings.CACHES[alias] for alias in options["cache"]}}
+        with override_settings(CACHES=caches), \
+                mock.patch.object(TokenBucketThrottle, "THROTTLE_RATES", rates), \
+                mock.patch.object(UserRateThrottle, "THROTTLE_RATES", rates):
+            for name, alias in stores:
+                local_bucket_store.clear()
+                with override_settings(THROTTLE_CACHE_ALIAS=alias):
+                    self.report(f"token bucket, {name}", WriteRateThrottle, requests, checks, options["repeat"])
+            self.report("token bucket, anonymous", WriteRateThrottle, [anonymous], checks, options["repeat"])
+            self.report("DRF UserRateThrottle, default", UserRateThrottle, requests, checks, options["repeat"])
+
+    def report(self, name, throttle_class, requests, checks, repeat):
+        def run():
+            for i in range(checks):
+                throttle_class().allow_request(requests[i % len(requests)], None)
+        self.stdout.write(f"{name:<28}{timeit(run, repeat=repeat) / checks * 1e6:>10.2f}")
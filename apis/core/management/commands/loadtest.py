@@ -0,0 +1,344 @@
+import json
+import subprocess
+import threading
+import time
+from contextlib import nullcontext
+from statistics import mean
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.models import Min
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import URLPattern, URLResolver, get_resolver, resolve, reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from apis.blog.models import Post
+from apis.core.bench import percentile, seed, temporary_database, without_response_cache
+from apis.core.throttling import TokenBucketThrottle
+from apis.library.models import Author, Book, Genre
+from apis.todo.models import Task
+
+PASSWORD = "Load-test-password-1"
+
+
+class Worker:
+    """
+    The user a load generating thread acts as, with one of their posts and tasks.
+    """
+
+    def __init__(self, number, user, post_id, task_id):
+        self.number = number
+        self.user = user
+        self.post_id = post_id
+        self.task_id = task_id
+        self.headers = {"Authorization": f"Bearer {AccessToken.for_user(user)}"}
+        self.client = Client(raise_request_exception=False)
+
+
+class Route:
+    """
+    One method of one URL pattern and how to build its requests.
+
+    `args`, `data` and `headers` are values or callables taking the worker and
+    the number of the request, for requests that need fresh data every time.
+    """
+
+    def __init__(self, name, method="get", args=(), data=None, headers=True):
+        self.name = name
+        self.method = method
+        self.args = args
+        self.data = data
+        self.headers = headers
+
+    def path(self, worker, number):
+        args = self.args(worker, number) if callable(self.args) else self.args
+        return reverse(self.name, args=args)
+
+    def build(self, worker, number):
+        def value(option):
+            return option(worker, number) if callable(option) else option
+
+        kwargs = {}
+        if self.data is not None:
+            kwargs["data"] = value(self.data)
+            if self.method != "get":
+                kwargs["content_type"] = "application/json"
+        if self.headers is True:
+            kwargs["headers"] = worker.headers
+        elif self.headers:
+            kwargs["headers"] = value(self.headers)
+        return self.path(worker, number), kwargs
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive every route of the API at a given concurrency against seeded data, report throughput, "
+        "p50/p95/p99 latency and queries per request, and save the results as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=4, help="Requests in flight (default: 4).")
+        parser.add_argument("--requests", type=int, default=200, help="Requests per route (default: 200).")
+        parser.add_argument("--routes", help="Comma-separated URL names to drive, e.g. book-list,users:signup "
+                                             "(default: all).")
+        parser.add_argument("--users", type=int, default=20, help="Users to seed (default: 20).")
+        parser.add_argument("--posts", type=int, default=2000, help="Posts to seed (default: 2000).")
+        parser.add_argument("--tasks", type=int, default=2000, help="Tasks to seed (default: 2000).")
+        parser.add_argument("--books", type=int, default=2000, help="Books to seed (default: 2000).")
+        parser.add_argument("--output", help="File to save the results to (default: loadtest-<time>.json).")
+        parser.add_argument("--compare", help="Results of an earlier run to compare with.")
+        parser.add_argument("--no-response-cache", action="store_true",
+                            help="Replace the response cache with a dummy cache.")
+        parser.add_argument("--use-existing-db", action="store_true",
+                            help="Seed and load the configured database instead of a temporary one.")
+
+    def handle(self, *args, **options):
+        started_at = timezone.now()
+        baseline = self.load(options["compare"]) if options["compare"] else None
+        # The throttles would turn most of the load into 429s.
+        rates = {scope: f"{10 ** 9}/s" for scope in TokenBucketThrottle.THROTTLE_RATES}
+        setup_test_environment()
+        try:
+            with temporary_database(keep=options["use_existing_db"], on_disk=True), \
+                    mock.patch.object(TokenBucketThrottle, "THROTTLE_RATES", rates), \
+                    without_response_cache() if options["no_response_cache"] else nullcontext():
+                vendor = connection.vendor
+                results = self.run(options, started_at.strftime("%Y%m%d%H%M%S"))
+        finally:
+            teardown_test_environment()
+
+        output = options["output"] or f"loadtest-{started_at:%Y%m%d-%H%M%S}.json"
+        with open(output, "w") as file:
+            json.dump({
+                "started_at": started_at.isoformat(),
+                "commit": self.commit(),
+                "database": vendor,
+                "options": {name: options[name] for name in (
+                    "concurrency", "requests", "users", "posts", "tasks", "books", "no_response_cache",
+                )},
+                "results": results,
+            }, file, indent=2)
+        self.stdout.write(f"\nSaved the results to {output}")
+        if baseline is not None:
+            self.compare(results, baseline)
+
+    def run(self, options, run):
+        users = seed(users=options["users"], posts=options["posts"], tasks=options["tasks"], books=options["books"])
+        User.objects.filter(pk__in=[user.pk for user in users]).update(password=make_password(PASSWORD))
+        first_posts = dict(Post.objects.values("author_id").annotate(pk=Min("pk")).values_list("author_id", "pk"))
+        first_tasks = dict(Task.objects.values("owner_id").annotate(pk=Min("pk")).values_list("owner_id", "pk"))
+        workers = [
+            Worker(number, user, first_posts.get(user.pk), first_tasks.get(user.pk))
+            for number, user in enumerate(users[i % len(users)] for i in range(options["concurrency"]))
+        ]
+
+        routes = self.routes(run)
+        missing = self.route_names() - {route.name for route in routes}
+        if missing:
+            self.stderr.write(f"Routes without a load scenario: {', '.join(sorted(missing))}")
+        if options["routes"]:
+            names = set(options["routes"].split(","))
+            if names - {route.name for route in routes}:
+                raise CommandError(f"Unknown routes: {', '.join(sorted(names - {route.name for route in routes}))}")
+            routes = [route for route in routes if route.name in names]
+
+        self.stdout.write(
+            f"{'route':<40}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}{'errors':>8}"
+        )
+        results = []
+        for route in routes:
+            result = self.drive(route, workers, options["requests"])
+            results.append(result)
+            self.stdout.write(
+                f"{result['method'] + ' ' + route.name:<40}{result['throughput']:>9.1f}{result['p50_ms']:>9.2f}"
+                f"{result['p95_ms']:>9.2f}{result['p99_ms']:>9.2f}{result['queries']:>9.1f}{result['errors']:>8}"
+            )
+        return results
+
+    def routes(self, run):
+        """
+        Return the routes to drive, covering every named route of the URLconf.
+        """
+        book_id = Book.objects.values_list("pk", flat=True).first()
+        author = Author.objects.values("pk", "name", "bio").first()
+        genre = Genre.objects.values("pk", "name").first()
+
+        def unique(worker, number):
+            return f"load-{run}-{worker.number}-{number}"
+
+        def task(worker, number):
+            return {"title": f"Task {unique(worker, number)}", "description": "Description", "completed": False}
+
+        def book(worker, number):
+            return {
+                "title": f"Book {unique(worker, number)}",
+                "description": "Description",
+                "publication_date": "2024-09-07T19:04:00Z",
+                "authors": [{"name": author["name"], "bio": author["bio"]}],
+                "genres": [{"name": genre["name"]}],
+            }
+
+        def new_user(worker, number):
+            user = User.objects.create(username=f"deactivate-{unique(worker, number)}")
+            return {"Authorization": f"Bearer {AccessToken.for_user(user)}"}
+
+        return [
+            Route("index", headers=False),
+            Route("metrics", headers=False),
+            Route("schema-swagger-ui", headers=False),
+            Route("schema-redoc", headers=False),
+            Route("admin:index", headers=False),
+
+            Route("users:signup", "post", data=lambda w, n: {"username": unique(w, n), "password": PASSWORD},
+                  headers=False),
+            Route("users:token_obtain_pair", "post", data=lambda w, n: {"username": w.user.username,
+                                                                        "password": PASSWORD}, headers=False),
+            Route("users:token_refresh", "post", data=lambda w, n: {"refresh": str(RefreshToken.for_user(w.user))},
+                  headers=False),
+            Route("users:change_password", "post", data={
+                "old_password": PASSWORD, "new_password": PASSWORD, "new_password_again": PASSWORD,
+            }),
+            # Renames the workers' users, so it runs after the routes logging in by username.
+            Route("users:user_update", "patch", data=lambda w, n: {"username": f"renamed-{unique(w, n)}"}),
+            Route("users:deactivate", "post", headers=new_user),
+
+            Route("post-list-create"),
+            Route("post-list-create", "post", data=lambda w, n: {"title": unique(w, n), "content": "Content " * 50}),
+            Route("post-search", data={"q": "content post"}),
+            Route("post-detail", args=lambda w, n: [w.post_id]),
+            Route("post-detail", "patch", args=lambda w, n: [w.post_id], data=lambda w, n: {"title": unique(w, n)}),
+            Route("async-post-list-create"),
+
+            Route("task-list"),
+            Route("task-list", "post", data=task),
+            Route("task-detail", args=lambda w, n: [w.task_id]),
+            Route("task-detail", "put", args=lambda w, n: [w.task_id], data=task),
+            Route("task-bulk", "post", data=lambda w, n: [task(w, f"{n}-{i}") for i in range(10)]),
+            Route("task-sync"),
+            Route("async-task-list"),
+            Route("async-task-detail", args=lambda w, n: [w.task_id]),
+
+            Route("author-list"),
+            Route("author-list", "post", data=lambda w, n: {"name": unique(w, n), "bio": "Biography"}),
+            Route("author-detail", args=[author["pk"]]),
+            Route("genre-list"),
+            Route("genre-list", "post", data=lambda w, n: {"name": unique(w, n)}),
+            Route("genre-detail", args=[genre["pk"]]),
+            Route("book-list"),
+            Route("book-list", "post", data=book),
+            Route("book-detail", args=[book_id]),
+            Route("book-bulk-import", "post", data=lambda w, n: [book(w, f"{n}-{i}") for i in range(10)]),
+            Route("async-author-list"),
+            Route("async-genre-list"),
+            Route("async-book-list"),
+            Route("async-book-detail", args=[book_id]),
+        ]
+
+    def route_names(self, resolver=None, namespace=""):
+        """
+        Return the names of the routes in the URLconf, except the admin's.
+        """
+        names = set()
+        for pattern in (resolver or get_resolver()).url_patterns:
+            if isinstance(pattern, URLResolver):
+                if pattern.namespace == "admin":
+                    continue
+                prefix = f"{namespace}{pattern.namespace}:" if pattern.namespace else namespace
+                names |= self.route_names(pattern, prefix)
+            elif isinstance(pattern, URLPattern) and pattern.name:
+                names.add(f"{namespace}{pattern.name}")
+        return names
+
+    def drive(self, route, workers, requests):
+        """
+        Send `requests` requests to `route` spread over the workers, one thread
+        each, and return the measurements.
+        """
+        latencies, queries, errors = [], [], []
+
+        def work(worker, numbers):
+            count = [0]
+
+            def count_query(execute, sql, params, many, context):
+                count[0] += 1
+                return execute(sql, params, many, context)
+
+            try:
+                with connection.execute_wrapper(count_query):
+                    for number in numbers:
+                        path, kwargs = route.build(worker, number)
+                        before = count[0]
+                        start = time.perf_counter()
+                        response = getattr(worker.client, route.method)(path, **kwargs)
+                        if response.streaming:
+                            b"".join(response.streaming_content)
+                        latencies.append(time.perf_counter() - start)
+                        queries.append(count[0] - before)
+                        if response.status_code >= 400:
+                            errors.append(response.status_code)
+            finally:
+                connections.close_all()
+
+        def run_threads(assignments):
+            threads = [threading.Thread(target=work, args=assignment) for assignment in assignments]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        # One untimed request fills the caches and compiles the query plans.
+        run_threads([(workers[0], [-1])])
+        latencies.clear(), queries.clear(), errors.clear()
+
+        start = time.perf_counter()
+        run_threads((worker, range(number, requests, len(workers))) for number, worker in enumerate(workers))
+        elapsed = time.perf_counter() - start
+        if not latencies:
+            raise CommandError(f"No request to {route.name} completed.")
+
+        return {
+            "name": route.name,
+            "route": resolve(route.path(workers[0], -1)).route,
+            "method": route.method.upper(),
+            "requests": len(latencies),
+            "errors": len(errors),
+            "throughput": len(latencies) / elapsed,
+            "p50_ms": percentile(latencies, 50) * 1e3,
+            "p95_ms": percentile(latencies, 95) * 1e3,
+            "p99_ms": percentile(latencies, 99) * 1e3,
+            "queries": mean(queries),
+        }
+
+    def commit(self):
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR, capture_output=True, text=True,
+            ).stdout.strip() or None
+        except OSError:
+            return None
+
+    def load(self, path):
+        try:
+            with open(path) as file:
+                return json.load(file)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Cannot read {path}: {e}")
+
+    def compare(self, results, baseline):
+        earlier = {(result["name"], result["method"]): result for result in baseline["results"]}
+        self.stdout.write(f"\nCompared with {baseline['started_at']} ({baseline.get('commit') or 'unknown commit'}):")
+        self.stdout.write(f"{'route':<40}{'req/s':>9}{'p95 ms':>9}{'queries':>9}")
+        for result in results:
+            before = earlier.get((result["name"], result["method"]))
+            if before is None:
+                continue
+            self.stdout.write(
+                f"{result['method'] + ' ' + result['name']:<40}{result['throughput'] / before['throughput'] - 1:>+9.1%}"
+                f"{result['p95_ms'] / before['p95_ms'] - 1:>+9.1%}{result['queries'] - before['queries']:>+9.1f}"
+            )
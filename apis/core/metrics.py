@@ -0,0 +1,224 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.views import View
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# name: (help, buckets)
+HISTOGRAMS = {
+    "http_request_duration_seconds": ("Wall time of the request in the application.", LATENCY_BUCKETS),
+    "http_request_db_queries": ("SQL queries per request.", QUERY_BUCKETS),
+    "http_request_db_duration_seconds": ("Time spent in SQL queries per request.", LATENCY_BUCKETS),
+    "http_request_serializer_duration_seconds": ("Time spent serializing per request.", LATENCY_BUCKETS),
+    "http_response_size_bytes": ("Size of non-streaming response bodies.", SIZE_BUCKETS),
+}
+
+
+class Histogram:
+    """
+    Cumulative histogram in the shape Prometheus exposes.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts):
+            total += count
+            yield bound, total
+
+
+class RequestMetrics:
+    """
+    Aggregates the measurements of `PerformanceMiddleware` per route and method.
+
+    The histograms live in this process; every worker exposes its own on the
+    metrics endpoint and Prometheus sums them.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.series = {}
+
+    def observe(self, route, method, values):
+        with self.lock:
+            histograms = self.series.get((route, method))
+            if histograms is None:
+                histograms = self.series[(route, method)] = {
+                    name: Histogram(buckets) for name, (_, buckets) in HISTOGRAMS.items()
+                }
+            for name, value in values.items():
+                if value is not None:
+                    histograms[name].observe(value)
+
+    def render(self):
+        """
+        Return the histograms in the Prometheus text exposition format.
+        """
+        with self.lock:
+            series = sorted(self.series.items())
+            lines = []
+            for name, (description, _) in HISTOGRAMS.items():
+                lines += [f"# HELP {name} {description}", f"# TYPE {name} histogram"]
+                for (route, method), histograms in series:
+                    histogram = histograms[name]
+                    labels = f'route="{escape(route)}",method="{escape(method)}"'
+                    for bound, count in histogram.cumulative():
+                        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+                    lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+                    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self.lock:
+            self.series.clear()
+
+
+def escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+request_metrics = RequestMetrics()
+
+
+class RequestTimings:
+    """
+    What one request spent in SQL and serialization, filled in as it runs.
+    """
+    __slots__ = ("queries", "db_time", "serializer_time", "serializing")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializing = False
+
+
+current_timings = ContextVar("current_timings", default=None)
+
+
+def time_query(execute, sql, params, many, context):
+    """
+    Execute wrapper adding each query to the timings of the current request.
+
+    It is installed on every connection rather than per request, because the
+    async ORM runs queries in a worker thread with its own connection. The
+    context variable holding the timings follows the request into that thread.
+    """
+    timings = current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db_time += time.perf_counter() - start
+        timings.queries += 1
+
+
+def install_query_timer(sender, connection, **kwargs):
+    # Connected to `connection_created`, which fires again on reconnects.
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+class SerializerTiming:
+    """
+    Adds the time spent in the block to the serializer time of the current request.
+
+    Nested blocks, such as nested serializers, are only counted once. Queries run
+    in the block, such as lazy loads of related objects, count as both.
+    """
+    __slots__ = ("timings", "start")
+
+    def __enter__(self):
+        self.timings = current_timings.get()
+        if self.timings is not None and not self.timings.serializing:
+            self.timings.serializing = True
+            self.start = time.perf_counter()
+        else:
+            self.timings = None
+
+    def __exit__(self, *exc_info):
+        if self.timings is not None:
+            self.timings.serializer_time += time.perf_counter() - self.start
+            self.timings.serializing = False
+
+
+def method_label(method):
+    """
+    Return `method` for the methods views handle and "OTHER" for anything else, so
+    arbitrary client-supplied methods can't add series to `request_metrics`.
+    """
+    return method if method.lower() in View.http_method_names else "OTHER"
+
+
+class PerformanceMiddleware:
+    """
+    Measures each request and records it in `request_metrics`.
+
+    Records the wall time, the number and time of SQL queries, the time spent in
+    serializers and `ValuesReader`s and the response size, per route pattern and
+    method. With `SERVER_TIMING` enabled the same numbers are sent to the client
+    in a `Server-Timing` header, e.g.
+    `app;dur=12.1, db;dur=3.4;desc="2 queries", serializer;dur=1.2`.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings, start = RequestTimings(), time.perf_counter()
+        token = current_timings.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        return self.finish(request, response, timings, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        timings, start = RequestTimings(), time.perf_counter()
+        token = current_timings.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        return self.finish(request, response, timings, time.perf_counter() - start)
+
+    def finish(self, request, response, timings, elapsed):
+        match = getattr(request, "resolver_match", None)
+        request_metrics.observe(match.route if match is not None else "unmatched", method_label(request.method), {
+            "http_request_duration_seconds": elapsed,
+            "http_request_db_queries": timings.queries,
+            "http_request_db_duration_seconds": timings.db_time,
+            "http_request_serializer_duration_seconds": timings.serializer_time,
+            "http_response_size_bytes": None if response.streaming else len(response.content),
+        })
+        if getattr(settings, "SERVER_TIMING", False):
+            response["Server-Timing"] = (
+                f"app;dur={elapsed * 1e3:.1f}, db;dur={timings.db_time * 1e3:.1f};desc=\"{timings.queries} queries\", "
+                f"serializer;dur={timings.serializer_time * 1e3:.1f}"
+            )
+        return response
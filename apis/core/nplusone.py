@@ -0,0 +1,295 @@
+import logging
+import re
+import sys
+import traceback
+from contextlib import ContextDecorator
+from contextvars import ContextVar
+from functools import lru_cache
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from rest_framework.serializers import Serializer
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "MODE": "off",
+    "THRESHOLD": 5,
+    "EXEMPT_VIEWS": (),
+    "EXEMPT_QUERIES": (),
+    "STACK_DEPTH": 5,
+}
+MODES = ("off", "log", "strict")
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%s|\?")
+_SPACE = re.compile(r"\s+")
+_IN_LIST = re.compile(r"\bIN \(\?(?:, \?)*\)", re.IGNORECASE)
+_VALUES_LIST = re.compile(r"\bVALUES \(\?(?:, \?)*\)(?:, \(\?(?:, \?)*\))*", re.IGNORECASE)
+_TRANSACTION = re.compile(r"^\s*(?:SAVEPOINT|RELEASE|ROLLBACK|BEGIN|COMMIT)\b", re.IGNORECASE)
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(sql):
+    """
+    Return `sql` with literals and parameters replaced by `?`, so statements that
+    only differ in their values compare equal.
+
+    `IN` lists and multi-row `VALUES` collapse to `(...)`, as their length depends
+    on the data too.
+    """
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _SPACE.sub(" ", sql).strip()
+    sql = _IN_LIST.sub("IN (...)", sql)
+    return _VALUES_LIST.sub("VALUES (...)", sql)
+
+
+def get_options():
+    return {**DEFAULTS, **getattr(settings, "N_PLUS_ONE", {})}
+
+
+class Finding:
+    """
+    A statement repeated more often than the threshold within one request.
+
+    `field` and `stack` describe where it crossed the threshold: the serializer
+    field being rendered, if any, and the innermost frames of project code.
+    """
+    __slots__ = ("fingerprint", "count", "field", "stack")
+
+    def __init__(self, fingerprint, count, field, stack):
+        self.fingerprint = fingerprint
+        self.count = count
+        self.field = field
+        self.stack = stack
+
+    def __str__(self):
+        source = f" from {self.field}" if self.field else ""
+        lines = [f"{self.count} x {self.fingerprint}{source}"]
+        lines += (f"  {frame}" for frame in self.stack)
+        return "\n".join(lines)
+
+
+class NPlusOneError(AssertionError):
+    """
+    Raised by `NPlusOneMiddleware` in strict mode, so the request fails the test
+    that made it.
+    """
+
+    def __init__(self, view, findings):
+        self.view = view
+        self.findings = findings
+        super().__init__(f"Repeated queries in {view}:\n" + "\n".join(map(str, findings)))
+
+
+class QueryDetector:
+    """
+    Counts the statements of one request by fingerprint.
+    """
+
+    def __init__(self, threshold, stack_depth=DEFAULTS["STACK_DEPTH"]):
+        self.threshold = threshold
+        self.stack_depth = stack_depth
+        self.counts = {}
+        self.findings = {}
+
+    def record(self, sql):
+        if _TRANSACTION.match(sql):
+            return
+        key = fingerprint(sql)
+        count = self.counts[key] = self.counts.get(key, 0) + 1
+        if count == self.threshold + 1:
+            # Only the query crossing the threshold pays for inspecting the stack.
+            frame = sys._getframe(1)
+            self.findings[key] = Finding(key, count, serializer_field(frame), project_stack(frame, self.stack_depth))
+
+    def report(self, exempt_queries=()):
+        findings = []
+        for key, finding in self.findings.items():
+            if not any(re.search(pattern, key) for pattern in exempt_queries):
+                finding.count = self.counts[key]
+                findings.append(finding)
+        return findings
+
+
+def serializer_field(frame):
+    """
+    Return `Serializer.field` for the innermost serializer field being rendered at
+    `frame`, or None outside of serializers.
+    """
+    while frame is not None:
+        if frame.f_code.co_name == "to_representation":
+            serializer, field = frame.f_locals.get("self"), frame.f_locals.get("field")
+            if isinstance(serializer, Serializer) and field is not None:
+                return f"{type(serializer).__name__}.{field.field_name}"
+        frame = frame.f_back
+    return None
+
+
+def project_stack(frame, depth):
+    """
+    Return the innermost `depth` frames at `frame` that belong to the project, as
+    `path:line in function`. The query instrumentation itself is left out.
+    """
+    root = f"{settings.BASE_DIR}/"
+    instrumentation = {__file__, metrics.__file__}
+    lines = []
+    for summary in traceback.StackSummary.extract(traceback.walk_stack(frame), lookup_lines=False):
+        filename = summary.filename
+        if filename.startswith(root) and "site-packages" not in filename and filename not in instrumentation:
+            lines.append(f"{filename[len(root):]}:{summary.lineno} in {summary.name}")
+            if len(lines) == depth:
+                break
+    return lines
+
+
+current_detector = ContextVar("current_detector", default=None)
+repeated_queries_allowed = ContextVar("repeated_queries_allowed", default=False)
+
+
+def detect_query(execute, sql, params, many, context):
+    """
+    Execute wrapper counting each query towards the detector of the current request.
+
+    Installed on every connection like `metrics.time_query`, for the same reason.
+    """
+    detector = current_detector.get()
+    if detector is not None and not repeated_queries_allowed.get():
+        detector.record(sql)
+    return execute(sql, params, many, context)
+
+
+def install_query_detector(sender, connection, **kwargs):
+    if detect_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(detect_query)
+
+
+class allow_repeated_queries(ContextDecorator):
+    """
+    Exempt the queries of the decorated function, or the enclosed block, from N+1
+    detection, for code that repeats a statement on purpose::
+
+        with allow_repeated_queries():
+            for chunk in chunks:
+                import_chunk(chunk)
+    """
+
+    def __enter__(self):
+        self.token = repeated_queries_allowed.set(True)
+
+    def __exit__(self, *exc_info):
+        repeated_queries_allowed.reset(self.token)
+
+
+def view_path(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return None
+    view = getattr(match.func, "view_class", match.func)
+    return f"{view.__module__}.{view.__name__}"
+
+
+class NPlusOneMiddleware:
+    """
+    Reports statements a request repeats more than `N_PLUS_ONE["THRESHOLD"]` times,
+    the usual sign of a relation loaded once per row instead of prefetched.
+
+    `N_PLUS_ONE["MODE"]` is "off", "log" to log a warning per request, or
+    "strict" to raise `NPlusOneError`. Views are exempted by dotted path or URL
+    name in `EXEMPT_VIEWS`, statements by regular expressions matched against
+    the fingerprint in `EXEMPT_QUERIES`.
+
+    For streaming responses detection continues while the body is consumed, and
+    the report is made once it is exhausted.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        options = get_options()
+        if options["MODE"] == "off":
+            return self.get_response(request)
+        detector = QueryDetector(options["THRESHOLD"], options["STACK_DEPTH"])
+        token = current_detector.set(detector)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_detector.reset(token)
+        return self.finish_response(request, response, detector, options)
+
+    async def __acall__(self, request):
+        options = get_options()
+        if options["MODE"] == "off":
+            return await self.get_response(request)
+        detector = QueryDetector(options["THRESHOLD"], options["STACK_DEPTH"])
+        token = current_detector.set(detector)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_detector.reset(token)
+        return self.finish_response(request, response, detector, options)
+
+    def finish_response(self, request, response, detector, options):
+        if not response.streaming:
+            self.finish(request, detector, options)
+        elif response.is_async:
+            response.streaming_content = self.astream(response.streaming_content, request, detector, options)
+        else:
+            response.streaming_content = self.stream(response.streaming_content, request, detector, options)
+        return response
+
+    def stream(self, content, request, detector, options):
+        # The server iterates the body outside of the request's context, so the
+        # detector is set around each chunk rather than across the yields.
+        content = iter(content)
+        while True:
+            token = current_detector.set(detector)
+            try:
+                chunk = next(content, None)
+            finally:
+                current_detector.reset(token)
+            if chunk is None:
+                break
+            yield chunk
+        self.finish(request, detector, options)
+
+    async def astream(self, content, request, detector, options):
+        content = aiter(content)
+        while True:
+            token = current_detector.set(detector)
+            try:
+                chunk = await anext(content, None)
+            finally:
+                current_detector.reset(token)
+            if chunk is None:
+                break
+            yield chunk
+        self.finish(request, detector, options)
+
+    def finish(self, request, detector, options):
+        if not detector.findings:
+            return
+        view = view_path(request)
+        match = getattr(request, "resolver_match", None)
+        exempt = options["EXEMPT_VIEWS"]
+        if view in exempt or (match is not None and match.view_name in exempt):
+            return
+        findings = detector.report(options["EXEMPT_QUERIES"])
+        if not findings:
+            return
+        error = NPlusOneError(view or request.path, findings)
+        if options["MODE"] == "strict":
+            raise error
+        logger.warning("%s", error)
@@ -0,0 +1,149 @@
+import json
+from base64 import b64decode, b64encode
+from collections import namedtuple
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import replace_query_param
+
+KeysetCursor = namedtuple("KeysetCursor", ["reverse", "position"])
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination that seeks on every column of `ordering`.
+
+    DRF's `CursorPagination` seeks on the first ordering column only and falls back
+    to an offset for rows that share a value. Here the cursor holds the values of
+    all ordering columns of the boundary row, and `ordering` must end with a unique
+    column, so each page is a single range scan on a matching composite index:
+    deep pages cost the same as the first page and rows inserted concurrently
+    never shift or repeat the rows of later pages.
+    """
+    ordering = ("id",)
+    page_size_query_param = "page_size"
+    max_page_size = 200
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Async variant of `paginate_queryset` for views running on the async ORM.
+        """
+        queryset = self.get_page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page([obj async for obj in queryset])
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """
+        Return the unevaluated queryset of the requested page plus one row.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        self.reverse, self.current_position = self.cursor or (False, None)
+
+        ordering = _reverse_ordering(self.ordering) if self.reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if self.current_position is not None:
+            queryset = queryset.filter(self.seek(queryset.model, ordering, self.current_position))
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, results):
+        self.page = results[:self.page_size]
+        has_more = len(results) > self.page_size
+        has_position = self.current_position is not None
+        if self.reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = has_position, has_more
+        else:
+            self.has_next, self.has_previous = has_more, has_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def seek(self, model, ordering, position):
+        """
+        Return a filter that keeps the rows that sort after `position` in `ordering`.
+
+        For an ordering of `(a, -b, c)` this builds
+        `a >= x AND (a > x OR (a = x AND b < y) OR (a = x AND b = y AND c > z))`.
+        The leading `a >= x` is implied by the rest, but lets the database seek into
+        the index at `x` instead of scanning it from the start.
+        """
+        condition = Q()
+        equal = {}
+        for order, value in zip(ordering, position):
+            field_name = order.lstrip("-")
+            try:
+                value = model._meta.get_field(field_name).to_python(value)
+            except (ValidationError, TypeError):
+                raise NotFound(self.invalid_cursor_message)
+            lookup = "lt" if order.startswith("-") else "gt"
+            condition |= Q(**equal, **{f"{field_name}__{lookup}": value})
+            if not equal:
+                bound = Q(**{f"{field_name}__{lookup}e": value})
+            equal[field_name] = value
+        return bound & condition
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if self.page:
+            position = self._get_position_from_instance(self.page[-1], self.ordering)
+        else:
+            position = self.current_position
+        return self.encode_cursor(KeysetCursor(reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.page:
+            position = self._get_position_from_instance(self.page[0], self.ordering)
+        else:
+            position = self.current_position
+        return self.encode_cursor(KeysetCursor(reverse=True, position=position))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            reverse, position = json.loads(b64decode(encoded.encode("ascii"), validate=True))
+            if not isinstance(position, list) or len(position) != len(self.ordering):
+                raise ValueError
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return KeysetCursor(reverse=bool(reverse), position=position)
+
+    def encode_cursor(self, cursor):
+        encoded = b64encode(json.dumps([int(cursor.reverse), cursor.position]).encode("ascii")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def _get_position_from_instance(self, instance, ordering):
+        position = []
+        for order in ordering:
+            field_name = order.lstrip("-")
+            value = instance[field_name] if isinstance(instance, dict) else getattr(instance, field_name)
+            position.append(value.isoformat() if hasattr(value, "isoformat") else value)
+        return position
+
+
+def _reverse_ordering(ordering):
+    return tuple(order[1:] if order.startswith("-") else f"-{order}" for order in ordering)
@@ -0,0 +1,74 @@
+import codecs
+from io import BytesIO
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError, UnsupportedMediaType
+from rest_framework.parsers import BaseParser, JSONParser
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:  # pragma: no cover
+    cbor2 = None
+
+
+class FastJSONParser(JSONParser):
+    """
+    `JSONParser` that decodes UTF-8 bodies with orjson when it is installed.
+
+    Bodies orjson rejects are parsed again by `JSONParser`, so invalid JSON gets
+    the same error message and integers wider than 64 bits still parse. Bodies
+    in another charset, or without orjson, are parsed by `JSONParser` directly.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or codecs.lookup(encoding).name != "utf-8":
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return super().parse(BytesIO(body), media_type, parser_context)
+
+
+class MessagePackParser(BaseParser):
+    """
+    Parses MessagePack request bodies. Timestamps are decoded to aware datetimes.
+
+    Malformed bodies, including maps keyed by values Python can't hash such as
+    arrays, are rejected with a `ParseError`.
+    """
+    media_type = "application/msgpack"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if msgpack is None:
+            raise UnsupportedMediaType(media_type)
+        try:
+            return msgpack.unpackb(stream.read(), timestamp=3, strict_map_key=False)
+        except (ValueError, TypeError) as exc:
+            raise ParseError(f"MessagePack parse error - {exc}")
+
+
+class CBORParser(BaseParser):
+    """
+    Parses CBOR request bodies. Timestamps are decoded to aware datetimes.
+    """
+    media_type = "application/cbor"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if cbor2 is None:
+            raise UnsupportedMediaType(media_type)
+        try:
+            return cbor2.loads(stream.read())
+        except (cbor2.CBORError, ValueError, TypeError) as exc:
+            raise ParseError(f"CBOR parse error - {exc}")
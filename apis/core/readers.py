@@ -0,0 +1,217 @@
+from collections import defaultdict
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Prefetch
+from django.utils.functional import cached_property
+from rest_framework import fields, relations, serializers
+
+from apis.core.metrics import SerializerTiming
+from apis.core.serializers import requested_fieldset
+
+# Fields whose `to_representation` returns database values unchanged.
+PASSTHROUGH_FIELDS = {
+    fields.BooleanField,
+    fields.CharField,
+    fields.IntegerField,
+    fields.ReadOnlyField,
+}
+
+
+class ValuesReader:
+    """
+    Compiled read-only path for a `ModelSerializer`.
+
+    The serializer's readable fields are compiled once into a plan of `.values()`
+    columns and per-field converters. Rows are then fetched as plain dicts,
+    including related columns such as `author__username`, and mapped to the
+    serialized representation without building model instances or dispatching
+    through every field. Nested `many=True` serializers of many-to-many fields
+    are loaded with one query on the through table.
+
+    The output is identical to the serializer's `.data`. When the serializer uses
+    `SparseFieldsMixin`, pass the request to compile the plan of its `?fields=`
+    and `?expand=`; such plans are cached per fieldset.
+    """
+    max_plans = 64
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        self.plans = {}
+
+    @cached_property
+    def plan(self):
+        return compile_plan(self.serializer_class(), self.serializer_class.Meta.model)
+
+    def get_plan(self, request=None):
+        fields, expand = requested_fieldset(request)
+        if fields is None and expand is None:
+            return self.plan
+
+        key = (request.query_params.get("fields"), request.query_params.get("expand"))
+        plan = self.plans.get(key)
+        if plan is None:
+            if len(self.plans) >= self.max_plans:
+                self.plans.clear()
+            serializer = self.serializer_class(context={"request": request})
+            plan = self.plans[key] = compile_plan(serializer, self.serializer_class.Meta.model)
+        return plan
+
+    def values(self, queryset, request=None, extra=()):
+        """
+        Return `queryset` as a values queryset with the columns needed by `render`.
+
+        `extra` columns, such as the paginator's ordering, are fetched as well.
+        """
+        columns = self.get_plan(request).columns
+        extra = [column.lstrip("-") for column in extra if column.lstrip("-") not in columns]
+        return queryset.prefetch_related(None).values(*columns, *extra)
+
+    def render(self, rows, request=None):
+        """
+        Map the values `rows` to their serialized representation.
+        """
+        with SerializerTiming():
+            return self.get_plan(request).render(list(rows))
+
+    async def arender(self, rows, request=None):
+        """
+        Async variant of `render` that loads nested relations with the async ORM.
+        """
+        with SerializerTiming():
+            return await self.get_plan(request).arender(list(rows))
+
+
+class Plan:
+    def __init__(self, columns, fields, nested):
+        self.columns = columns
+        self.fields = fields
+        self.nested = nested
+
+    def render_row(self, row):
+        data = {}
+        for name, column, convert in self.fields:
+            value = row[column]
+            data[name] = convert(value) if convert is not None and value is not None else value
+        return data
+
+    def render(self, rows):
+        data = [self.render_row(row) for row in rows]
+        if self.nested and rows:
+            ids = [row["id"] for row in rows]
+            for name, nested in self.nested:
+                self.attach(data, rows, name, nested.fetch(ids))
+        return data
+
+    async def arender(self, rows):
+        data = [self.render_row(row) for row in rows]
+        if self.nested and rows:
+            ids = [row["id"] for row in rows]
+            for name, nested in self.nested:
+                self.attach(data, rows, name, await nested.afetch(ids))
+        return data
+
+    def attach(self, data, rows, name, related):
+        for item, row in zip(data, rows):
+            item[name] = related.get(row["id"], [])
+
+    def apply(self, queryset, extra=()):
+        """
+        Restrict a model `queryset` to what this plan renders.
+
+        Unused columns are deferred with `only()`, unused relations are neither
+        joined nor prefetched, and relations rendered as IDs prefetch only the
+        primary keys.
+        """
+        related = {column.rsplit("__", 1)[0] for column in self.columns if "__" in column}
+        queryset = queryset.select_related(None).prefetch_related(None).only(*self.columns, *extra)
+        if related:
+            queryset = queryset.select_related(*related)
+        return queryset.prefetch_related(*(
+            Prefetch(
+                nested.model_field.name,
+                queryset=nested.model_field.related_model.objects.order_by("pk").only(
+                    *(nested.plan.columns if nested.plan is not None else ["pk"])
+                ),
+            )
+            for _, nested in self.nested
+        ))
+
+
+class NestedPlan:
+    """
+    Loads a many-to-many relation for a page of rows from the through table.
+
+    Without a `plan` the relation is rendered as a list of primary keys, read
+    from the through table alone.
+    """
+
+    def __init__(self, model_field, plan):
+        self.model_field = model_field
+        self.plan = plan
+
+    @cached_property
+    def source(self):
+        return self.model_field.m2m_field_name()
+
+    @cached_property
+    def target(self):
+        return self.model_field.m2m_reverse_field_name()
+
+    def query(self, ids):
+        rows = (
+            self.model_field.remote_field.through.objects
+            .filter(**{f"{self.source}_id__in": ids})
+            .order_by(f"{self.target}_id")
+        )
+        if self.plan is None:
+            return rows.values_list(f"{self.source}_id", f"{self.target}_id")
+        return rows.values(f"{self.source}_id", *(f"{self.target}__{column}" for column in self.plan.columns))
+
+    def fetch(self, ids):
+        return self.group(self.query(ids))
+
+    async def afetch(self, ids):
+        return self.group([row async for row in self.query(ids)])
+
+    def group(self, rows):
+        related = defaultdict(list)
+        if self.plan is None:
+            for source_id, target_id in rows:
+                related[source_id].append(target_id)
+            return related
+
+        prefix = f"{self.target}__"
+        for row in rows:
+            values = {key[len(prefix):]: value for key, value in row.items() if key.startswith(prefix)}
+            related[row[f"{self.source}_id"]].append(self.plan.render_row(values))
+        return related
+
+
+def compile_plan(serializer, model):
+    columns, plan_fields, nested = ["id"], [], []
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+
+        is_nested = isinstance(field, serializers.ListSerializer) and isinstance(field.child, serializers.ModelSerializer)
+        is_pk_list = isinstance(field, relations.ManyRelatedField) and isinstance(
+            field.child_relation, relations.PrimaryKeyRelatedField
+        )
+        if is_nested or is_pk_list:
+            model_field = model._meta.get_field(field.source)
+            if not model_field.many_to_many or model_field.auto_created:
+                raise ImproperlyConfigured(f"Cannot compile nested field '{name}' of {type(serializer).__name__}.")
+            plan = compile_plan(field.child, model_field.related_model) if is_nested else None
+            nested.append((name, NestedPlan(model_field, plan)))
+            continue
+
+        if isinstance(field, serializers.BaseSerializer) or field.source == "*":
+            raise ImproperlyConfigured(f"Cannot compile field '{name}' of {type(serializer).__name__}.")
+
+        column = "__".join(field.source_attrs)
+        if column not in columns:
+            columns.append(column)
+        convert = None if type(field) in PASSTHROUGH_FIELDS else field.to_representation
+        plan_fields.append((name, column, convert))
+
+    return Plan(columns, plan_fields, nested)
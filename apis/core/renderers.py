@@ -0,0 +1,93 @@
+from datetime import timezone
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:  # pragma: no cover
+    cbor2 = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    `JSONRenderer` that encodes with orjson when it is installed.
+
+    The output matches `JSONRenderer`'s compact UTF-8 output, except that floats
+    in exponent notation are written as `1e16` rather than `1e+16`, which JSON
+    parsers read the same. Datetimes, dates, times and UUIDs are encoded natively
+    in the same ISO formats (UTC as `Z`), U+2028/U+2029 are escaped, and whatever
+    orjson cannot encode itself, such as Decimals and lazy translation strings,
+    is handed to DRF's `JSONEncoder`. Indented output, as requested by the
+    browsable API or `; indent=` in the Accept header, and payloads orjson
+    rejects, such as integers wider than 64 bits, fall back to `JSONRenderer`.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            content = orjson.dumps(
+                data, default=self.encoder_class().default, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if b"\xe2\x80\xa8" in content or b"\xe2\x80\xa9" in content:
+            content = content.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return content
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Renders MessagePack, for clients that send `Accept: application/msgpack`.
+
+    Aware datetimes, such as the `created_at`/`updated_at` of posts and tasks,
+    are encoded with the 12-byte Timestamp extension type instead of a
+    27-character string. Values MessagePack has no type for, such as Decimals
+    and UUIDs, are converted like `JSONRenderer` converts them. Requires the
+    `msgpack` package.
+    """
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=JSONEncoder().default, datetime=True)
+
+
+class CBORRenderer(BaseRenderer):
+    """
+    Renders CBOR, for clients that send `Accept: application/cbor`.
+
+    Datetimes are encoded as epoch timestamps (tag 1). Requires the `cbor2`
+    package.
+    """
+    media_type = "application/cbor"
+    format = "cbor"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return cbor2.dumps(data, default=cbor_default, datetime_as_timestamp=True, timezone=timezone.utc)
+
+
+def cbor_default(encoder, value):
+    encoder.encode(JSONEncoder().default(value))
@@ -0,0 +1,97 @@
+import time
+
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+from apis.core.metrics import current_timings
+
+
+def parse_fields(value):
+    """
+    Parse `?fields=id,title,authors.name` into `{"id": {}, "title": {}, "authors": {"name": {}}}`.
+    """
+    fields = {}
+    for path in value.split(","):
+        node = fields
+        for name in filter(None, path.strip().split(".")):
+            node = node.setdefault(name, {})
+    return fields
+
+
+def requested_fieldset(request):
+    """
+    Return the `(fields, expand)` requested with `?fields=` and `?expand=`.
+
+    Either is None when its parameter is absent: every field, and every nested
+    relation expanded, as without the parameters.
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return None, None
+    fields = request.query_params.get("fields")
+    expand = request.query_params.get("expand")
+    return (
+        parse_fields(fields) if fields is not None else None,
+        set(filter(None, expand.split(","))) if expand is not None else None,
+    )
+
+
+def restrict_fields(serializer, fields, expand):
+    """
+    Drop the fields of `serializer` that are not in `fields` and collapse the
+    nested relations that are not in `expand` to lists of primary keys.
+
+    A relation named with nested fields, such as `authors.name`, is expanded.
+    """
+    for name, field in list(serializer.fields.items()):
+        if fields is not None and name not in fields:
+            serializer.fields.pop(name)
+            continue
+        if not (isinstance(field, serializers.ListSerializer) and isinstance(field.child, serializers.Serializer)):
+            continue
+
+        nested = fields.get(name) if fields is not None else None
+        if nested:
+            restrict_fields(field.child, nested, None)
+        elif expand is not None and name not in expand:
+            source = {} if field.source == name else {"source": field.source}
+            serializer.fields[name] = serializers.PrimaryKeyRelatedField(many=True, read_only=True, **source)
+
+
+class SparseFieldsMixin:
+    """
+    Lets clients pick the fields of GET responses with `?fields=` and `?expand=`.
+
+    - fields: Comma-separated fields to return, e.g. `?fields=id,title`. Fields of a
+      nested relation are selected with dots, e.g. `?fields=title,authors.name`.
+    - expand: Comma-separated nested relations to embed as objects, e.g.
+      `?expand=authors`. The other nested relations are returned as lists of IDs.
+
+    Without the parameters every field is returned and every relation embedded.
+    Writes always respond with the full representation.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields, expand = requested_fieldset(self.context.get("request"))
+        if fields is not None or expand is not None:
+            restrict_fields(self, fields, expand)
+
+
+class TimedSerializerMixin:
+    """
+    Counts the time spent in `to_representation` towards the serializer time
+    reported by `PerformanceMiddleware`.
+    """
+
+    def to_representation(self, instance):
+        # Same as `SerializerTiming`, inlined as it runs once per object.
+        timings = current_timings.get()
+        if timings is None or timings.serializing:
+            return super().to_representation(instance)
+        timings.serializing = True
+        start = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            timings.serializer_time += time.perf_counter() - start
+            timings.serializing = False
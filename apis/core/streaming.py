@@ -0,0 +1,58 @@
+from django.http import StreamingHttpResponse
+
+from apis.core.renderers import FastJSONRenderer
+
+
+def wants_stream(request):
+    """
+    Return whether the client opted into a streamed list with `?stream=true`.
+    """
+    return request.query_params.get("stream", "").lower() in ("true", "1")
+
+
+def iter_json_array(queryset, serializer, renderer=None, chunk_size=1000):
+    """
+    Serialize `queryset` row by row and yield it as a JSON array in byte chunks.
+
+    Rows are fetched with `.iterator(chunk_size=...)` and passed one at a time to
+    `serializer.to_representation`, so only one chunk of model instances and one
+    chunk of encoded rows are held in memory at any time.
+    """
+    renderer = renderer or FastJSONRenderer()
+    buffer = [b"["]
+    for position, obj in enumerate(queryset.iterator(chunk_size=chunk_size)):
+        if position:
+            buffer.append(b",")
+        buffer.append(renderer.render(serializer.to_representation(obj)))
+        if len(buffer) >= 2 * chunk_size:
+            yield b"".join(buffer)
+            buffer.clear()
+    buffer.append(b"]")
+    yield b"".join(buffer)
+
+
+def stream_list_response(queryset, serializer, chunk_size=1000):
+    return StreamingHttpResponse(
+        iter_json_array(queryset, serializer, chunk_size=chunk_size),
+        content_type="application/json",
+    )
+
+
+class StreamingListMixin:
+    """
+    Lets clients of a list view opt into a streamed, unpaginated response with `?stream=true`.
+
+    The whole filtered queryset is streamed in the order used by the view's
+    paginator, so a client can export a large list without paging through it.
+    """
+    stream_chunk_size = 1000
+
+    def list(self, request, *args, **kwargs):
+        if not wants_stream(request):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        ordering = getattr(self.paginator, "ordering", None)
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        return stream_list_response(queryset, self.get_serializer(), chunk_size=self.stream_chunk_size)
@@ -0,0 +1,161 @@
+import re
+from contextlib import ContextDecorator
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test.runner import DiscoverRunner
+from django.test.utils import CaptureQueriesContext, iter_test_cases, override_settings
+
+from .nplusone import MODES
+from .throttling import local_bucket_store
+
+
+class QueryCountAssertionsMixin:
+    """
+    Test case mixin with assertions about the number of SQL queries a request issues.
+    """
+
+    def count_queries(self, func, *args, **kwargs):
+        """
+        Call `func` and return the number of queries it ran together with its result.
+        """
+        with CaptureQueriesContext(connection) as context:
+            result = func(*args, **kwargs)
+        return len(context.captured_queries), result
+
+    def assertQueryCountStable(self, fetch, grow, rounds=2):
+        """
+        Assert that `fetch` issues the same number of queries as `grow` adds rows.
+
+        `fetch` is called once before and once after each call to `grow`, so an
+        endpoint with an N+1 problem fails as soon as the result set changes size.
+        """
+        counts = []
+        for _ in range(rounds):
+            counts.append(self.count_queries(fetch)[0])
+            grow()
+        counts.append(self.count_queries(fetch)[0])
+        self.assertEqual(
+            len(set(counts)), 1,
+            f"Query count grows with result size: {counts}",
+        )
+
+
+def explain(queryset):
+    """
+    Return the database's query plan for `queryset` as text.
+
+    On PostgreSQL sequential scans are disabled while planning, so the plan shows
+    whether an index *can* serve the query even on a small test dataset where a
+    sequential scan would be cheaper.
+    """
+    if connection.vendor != "postgresql":
+        return queryset.explain()
+
+    with connection.cursor() as cursor:
+        cursor.execute("SET enable_seqscan = off")
+        try:
+            return queryset.explain()
+        finally:
+            cursor.execute("RESET enable_seqscan")
+
+
+class IndexUsageAssertionsMixin:
+    """
+    Test case mixin with assertions about the query plans of querysets.
+    """
+
+    def assertUsesIndex(self, queryset, index_name, seek=True):
+        """
+        Assert that the database plans `queryset` as a range access on the index
+        `index_name`: a `SEARCH` on SQLite, an index scan with an `Index Cond` on
+        PostgreSQL. With `seek=False` a full scan of the index in its order passes
+        too, for queries without a condition on its leading column.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        plan = explain(queryset)
+        name = re.escape(index_name)
+        if not seek:
+            pattern = rf"\b{name}\b"
+        elif connection.vendor == "postgresql":
+            pattern = rf"\b(?:using|on) {name}\b.*\n\s*Index Cond:"
+        else:
+            pattern = rf"\bSEARCH \S+ USING (?:COVERING )?INDEX {name}\b"
+        self.assertRegex(plan, pattern, f"{index_name} is not {'searched' if seek else 'used'} by the query plan")
+
+
+class query_budget(ContextDecorator):
+    """
+    Fail if the decorated test, or the enclosed block, issues more than `max_queries` queries.
+
+    Unlike `assertNumQueries`, the budget is an upper bound, and the failure message
+    lists every query so a regression such as an N+1 is easy to spot::
+
+        @query_budget(2)
+        def test_post_list(self):
+            self.client.get(reverse('post-list-create'))
+    """
+
+    def __init__(self, max_queries, using=DEFAULT_DB_ALIAS):
+        self.max_queries = max_queries
+        self.using = using
+
+    def __enter__(self):
+        self.context = CaptureQueriesContext(connections[self.using])
+        self.context.__enter__()
+        return self.context
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.context.__exit__(exc_type, exc_value, traceback)
+        if exc_type is not None or len(self.context) <= self.max_queries:
+            return
+        queries = "\n".join(
+            f"{position}. {query['sql']}" for position, query in enumerate(self.context.captured_queries, start=1)
+        )
+        raise AssertionError(f"{len(self.context)} queries executed, the budget is {self.max_queries}:\n{queries}")
+
+
+def reset_throttle_buckets():
+    local_bucket_store.clear()
+
+
+class NPlusOneTestRunner(DiscoverRunner):
+    """
+    Test runner failing every test whose requests repeat a statement more often
+    than `N_PLUS_ONE["THRESHOLD"]`, see `apis.core.nplusone`.
+
+    Pass `--n-plus-one=log` or `--n-plus-one=off` to only report or ignore them.
+
+    The in-process throttle buckets are emptied after every test, so tests don't
+    get throttled by the requests of the tests that ran before them.
+    """
+
+    def __init__(self, n_plus_one="strict", **kwargs):
+        super().__init__(**kwargs)
+        self.n_plus_one = n_plus_one
+
+    @classmethod
+    def add_arguments(cls, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--n-plus-one", choices=MODES, default="strict",
+            help="How to handle repeated queries in requests (default: strict).",
+        )
+
+    def build_suite(self, *args, **kwargs):
+        suite = super().build_suite(*args, **kwargs)
+        for test in iter_test_cases(suite):
+            test.addCleanup(reset_throttle_buckets)
+        return suite
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.n_plus_one_settings = override_settings(
+            N_PLUS_ONE={**getattr(settings, "N_PLUS_ONE", {}), "MODE": self.n_plus_one},
+        )
+        self.n_plus_one_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.n_plus_one_settings.disable()
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,249 @@
+import uuid
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock, skipIf
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apis.blog.models import Post
+from apis.blog.serializers import PostSerializer
+from apis.library.models import Author, Genre, Book
+from apis.library.serializers import BookSerializer
+from apis.todo.models import Task
+from apis.todo.serializers import TaskSerializer
+from . import parsers, renderers
+from .metrics import Histogram, request_metrics
+from .nplusone import NPlusOneError, NPlusOneMiddleware, allow_repeated_queries, fingerprint
+from .readers import ValuesReader
+
+
+class ValuesReaderTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='reader')
+        for i in range(3):
+            Post.objects.create(author=cls.user, title=f"Post {i}", content="content   ünïcode")
+            Task.objects.create(owner=cls.user, title=f"Task {i}", description="description", completed=i % 2 == 0)
+
+        authors = [Author.objects.create(name=f"Author {i}", bio="bio") for i in range(3)]
+        genres = [Genre.objects.create(name=f"Genre {i}") for i in range(2)]
+        for i in range(3):
+            book = Book.objects.create(title=f"Book {i}", description="description", publication_date=timezone.now())
+            book.authors.set(authors[i:])
+            book.genres.set(genres[:i])
+
+    def assertRendersIdentically(self, serializer_class, queryset):
+        reader = ValuesReader(serializer_class)
+        renderer = JSONRenderer()
+        with self.assertNumQueries(1 + len(reader.plan.nested)):
+            compiled = renderer.render(reader.render(reader.values(queryset)))
+        self.assertEqual(compiled, renderer.render(serializer_class(queryset, many=True).data))
+
+    def test_post_serializer(self):
+        self.assertRendersIdentically(PostSerializer, Post.objects.order_by("id"))
+
+    def test_task_serializer(self):
+        self.assertRendersIdentically(TaskSerializer, Task.objects.order_by("id"))
+
+    def test_book_serializer(self):
+        self.assertRendersIdentically(BookSerializer, Book.objects.with_related().order_by("id"))
+
+
+class FastJSONTest(SimpleTestCase):
+    payload = {
+        "id": 1,
+        "big": 2 ** 70,
+        "title": "ünïcode \u2028 line separator",
+        "created_at": datetime(2024, 1, 2, 3, 4, 5, 678, tzinfo=dt_timezone.utc),
+        "offset": datetime(2024, 1, 2, 3, 4, 5, tzinfo=dt_timezone(timedelta(hours=3, minutes=30))),
+        "day": date(2024, 1, 2),
+        "price": Decimal("9.99"),
+        "uuid": uuid.UUID(int=1),
+        "label": gettext_lazy("Title"),
+        "items": [{"nested": None, "flag": True, "ratio": 0.25}],
+        1: "int key",
+    }
+
+    def test_renders_like_json_renderer(self):
+        for payload in (self.payload, {key: value for key, value in self.payload.items() if key != "big"}, []):
+            self.assertEqual(renderers.FastJSONRenderer().render(payload), JSONRenderer().render(payload))
+
+    def test_indent_and_missing_orjson_fall_back(self):
+        renderer = renderers.FastJSONRenderer()
+        media_type = "application/json; indent=2"
+        self.assertEqual(renderer.render({"a": 1}, media_type), JSONRenderer().render({"a": 1}, media_type))
+        with mock.patch.object(renderers, "orjson", None):
+            self.assertEqual(renderer.render(self.payload), JSONRenderer().render(self.payload))
+
+    def test_parses_like_json_parser(self):
+        body = JSONRenderer().render(self.payload)
+        self.assertEqual(parsers.FastJSONParser().parse(BytesIO(body)), JSONParser().parse(BytesIO(body)))
+        with self.assertRaisesMessage(ParseError, "JSON parse error"):
+            parsers.FastJSONParser().parse(BytesIO(b'{"a": NaN}'))
+
+
+@skipIf(renderers.msgpack is None or renderers.cbor2 is None, "msgpack and cbor2 are not installed")
+class BinaryRenderersTest(SimpleTestCase):
+    payload = {
+        "id": 1,
+        "title": "ünïcode",
+        "created_at": datetime(2024, 1, 2, 3, 4, 5, 678, tzinfo=dt_timezone.utc),
+        "items": [{"nested": None, "flag": True}],
+    }
+
+    def test_message_pack_round_trip(self):
+        body = renderers.MessagePackRenderer().render(self.payload)
+        self.assertEqual(parsers.MessagePackParser().parse(BytesIO(body)), self.payload)
+        self.assertLess(len(body), len(renderers.FastJSONRenderer().render(self.payload)))
+        body = renderers.MessagePackRenderer().render({"price": Decimal("9.99")})
+        self.assertEqual(parsers.MessagePackParser().parse(BytesIO(body)), {"price": 9.99})
+        for body in (b"\xc1", b"\x81\x91\x01\x01"):
+            with self.subTest(body=body), self.assertRaisesMessage(ParseError, "MessagePack parse error"):
+                parsers.MessagePackParser().parse(BytesIO(body))
+
+    def test_cbor_round_trip(self):
+        body = renderers.CBORRenderer().render(self.payload)
+        self.assertEqual(parsers.CBORParser().parse(BytesIO(body)), self.payload)
+        with self.assertRaisesMessage(ParseError, "CBOR parse error"):
+            parsers.CBORParser().parse(BytesIO(b"\xff"))
+
+
+@override_settings(SERVER_TIMING=True)
+class PerformanceMiddlewareTest(APITestCase):
+    def setUp(self):
+        request_metrics.reset()
+        self.user = User.objects.create_user(username='owner', password='testpassword123')
+        Task.objects.create(owner=self.user, title="Task", description="description")
+        self.headers = {"Authorization": f"Bearer {AccessToken.for_user(self.user)}"}
+
+    def histogram(self, route, method, name):
+        return request_metrics.series[(route, method)][name]
+
+    def test_records_route_timings(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('task-list'), headers=self.headers)
+        self.assertRegex(
+            response["Server-Timing"], rf'^app;dur=[\d.]+, db;dur=[\d.]+;desc="{len(queries)} queries", serializer;dur=[\d.]+$',
+        )
+
+        route = "api/todo/task-list/"
+        self.assertEqual(self.histogram(route, "GET", "http_request_db_queries").sum, len(queries))
+        self.assertGreater(self.histogram(route, "GET", "http_request_serializer_duration_seconds").sum, 0)
+        self.assertEqual(self.histogram(route, "GET", "http_response_size_bytes").sum, len(response.content))
+
+        metrics = self.client.get(reverse('metrics')).content.decode()
+        self.assertIn(f'http_request_duration_seconds_count{{route="{route}",method="GET"}} 1', metrics)
+        self.assertIn(f'http_request_db_queries_bucket{{route="{route}",method="GET",le="+Inf"}} 1', metrics)
+
+    async def test_records_async_routes(self):
+        response = await self.async_client.get(reverse('async-task-list'), headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        queries = self.histogram("api/todo/async/task-list/", "GET", "http_request_db_queries")
+        self.assertEqual(queries.count, 1)
+        self.assertGreater(queries.sum, 0)
+
+    def test_unknown_methods_share_one_series(self):
+        for method in ("BREW", "PROPFIND"):
+            self.client.generic(method, reverse('task-list'), headers=self.headers)
+        self.assertEqual(self.histogram("api/todo/task-list/", "OTHER", "http_request_duration_seconds").count, 2)
+        self.assertEqual([method for route, method in request_metrics.series], ["OTHER"])
+
+    def test_histogram_buckets(self):
+        histogram = Histogram((1, 5))
+        for value in (0, 1, 3, 10):
+            histogram.observe(value)
+        self.assertEqual(list(histogram.cumulative()), [(1, 2), (5, 3), ("+Inf", 4)])
+
+
+@override_settings(N_PLUS_ONE={"MODE": "strict", "THRESHOLD": 5})
+class NPlusOneMiddlewareTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(6):
+            user = User.objects.create(username=f"author{i}")
+            Post.objects.create(author=user, title=f"Post {i}", content="content")
+
+    def render_posts(self, queryset):
+        def view(request):
+            return HttpResponse(str(PostSerializer(queryset, many=True).data))
+
+        request = RequestFactory().get(reverse('post-list-create'))
+        request.resolver_match = resolve(request.path)
+        return NPlusOneMiddleware(view)(request)
+
+    def stream_authors(self, view):
+        request = RequestFactory().get(reverse('post-list-create'))
+        request.resolver_match = resolve(request.path)
+        return NPlusOneMiddleware(view)(request)
+
+    def test_streamed_body_is_checked_when_consumed(self):
+        def view(request):
+            return StreamingHttpResponse(post.author.username for post in Post.objects.all())
+
+        response = self.stream_authors(view)
+        with self.assertRaises(NPlusOneError) as context:
+            b"".join(response.streaming_content)
+        self.assertEqual(context.exception.findings[0].count, 6)
+
+    async def test_async_streamed_body_is_checked_when_consumed(self):
+        async def authors():
+            async for post in Post.objects.all():
+                yield (await User.objects.aget(pk=post.author_id)).username
+
+        async def view(request):
+            return StreamingHttpResponse(authors())
+
+        response = await self.stream_authors(view)
+        with self.assertRaises(NPlusOneError):
+            async for chunk in response.streaming_content:
+                pass
+
+    def test_fingerprint(self):
+        self.assertEqual(
+            fingerprint('SELECT "a"."id" FROM "a" WHERE "a"."id" IN (%s, %s, %s) AND "a"."name" = \'x\'  LIMIT 21'),
+            'SELECT "a"."id" FROM "a" WHERE "a"."id" IN (...) AND "a"."name" = ? LIMIT ?',
+        )
+        self.assertEqual(fingerprint("INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s)"), "INSERT INTO t (a, b) VALUES (...)")
+
+    def test_strict_mode_reports_serializer_field(self):
+        with self.assertRaises(NPlusOneError) as context:
+            self.render_posts(Post.objects.all())
+        finding, = context.exception.findings
+        self.assertEqual(finding.count, 6)
+        self.assertEqual(finding.field, "PostSerializer.author")
+        self.assertIn('FROM "auth_user"', finding.fingerprint)
+        self.assertTrue(any(frame.startswith("apis/core/tests.py:") for frame in finding.stack), finding.stack)
+        self.assertIn("apis.blog.views.PostList", str(context.exception))
+
+    def test_prefetched_relations_pass(self):
+        self.assertEqual(self.render_posts(Post.objects.select_related('author')).status_code, 200)
+
+    @override_settings(N_PLUS_ONE={"MODE": "strict", "THRESHOLD": 6})
+    def test_repeats_up_to_threshold_pass(self):
+        self.assertEqual(self.render_posts(Post.objects.all()).status_code, 200)
+
+    @override_settings(N_PLUS_ONE={"MODE": "log", "THRESHOLD": 5})
+    def test_log_mode(self):
+        with self.assertLogs("apis.core.nplusone", "WARNING") as logs:
+            self.assertEqual(self.render_posts(Post.objects.all()).status_code, 200)
+        self.assertIn("PostSerializer.author", logs.output[0])
+
+    def test_exemptions(self):
+        with allow_repeated_queries():
+            self.render_posts(Post.objects.all())
+        for exempt in [{"EXEMPT_VIEWS": ["post-list-create"]}, {"EXEMPT_QUERIES": [r'FROM "auth_user"']}]:
+            with self.subTest(**exempt), override_settings(N_PLUS_ONE={"MODE": "strict", "THRESHOLD": 5, **exempt}):
+                self.render_posts(Post.objects.all())
@@ -0,0 +1,182 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class LocalBucketStore:
+    """
+    Keeps token buckets in a dict of this process.
+
+    Each worker process counts its own requests, so with N workers a client can
+    make up to N times the configured rate. The buckets are kept in least
+    recently used order, and the least recently used one is dropped once the
+    store holds more than `max_entries`, so only clients that have been idle the
+    longest can start over with a full bucket.
+    """
+
+    def __init__(self, max_entries=100_000):
+        self.max_entries = max_entries
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def take(self, key, capacity, rate, now):
+        """
+        Take a token from the bucket `key` and return how long to wait before
+        retrying, or None when the token was taken.
+        """
+        with self.lock:
+            tokens, updated_at = self.buckets.pop(key, (capacity, now))
+            tokens, wait = take_token(tokens, updated_at, capacity, rate, now)
+            self.buckets[key] = (tokens, now)
+            if len(self.buckets) > self.max_entries:
+                self.buckets.popitem(last=False)
+            return wait
+
+    async def atake(self, key, capacity, rate, now):
+        return self.take(key, capacity, rate, now)
+
+    def clear(self):
+        with self.lock:
+            self.buckets.clear()
+
+
+class CacheBucketStore:
+    """
+    Keeps token buckets in a Django cache, shared by every worker using it.
+
+    Use a `DatabaseCache` or `FileBasedCache` alias to share the buckets between
+    the workers of a host or of every host. A bucket is read and written without
+    a lock, so concurrent requests of one client can let a few extra requests
+    through. Buckets expire from the cache once they would have refilled.
+    """
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def take(self, key, capacity, rate, now):
+        tokens, updated_at = self.cache.get(key) or (capacity, now)
+        tokens, wait = take_token(tokens, updated_at, capacity, rate, now)
+        self.cache.set(key, (tokens, now), timeout=math.ceil((capacity - tokens) / rate) or 1)
+        return wait
+
+    async def atake(self, key, capacity, rate, now):
+        tokens, updated_at = await self.cache.aget(key) or (capacity, now)
+        tokens, wait = take_token(tokens, updated_at, capacity, rate, now)
+        await self.cache.aset(key, (tokens, now), timeout=math.ceil((capacity - tokens) / rate) or 1)
+        return wait
+
+
+def take_token(tokens, updated_at, capacity, rate, now):
+    """
+    Refill a bucket holding `tokens` at `updated_at` by `rate` tokens per second
+    and take one token from it. Return the tokens left and the seconds until the
+    next token when the bucket was empty, otherwise None.
+    """
+    tokens = min(capacity, tokens + (now - updated_at) * rate)
+    if tokens >= 1:
+        return tokens - 1, None
+    return tokens, (1 - tokens) / rate
+
+
+local_bucket_store = LocalBucketStore()
+
+
+def get_bucket_store():
+    """
+    Return the store configured by `THROTTLE_CACHE_ALIAS`: the in-process store
+    when it is None, otherwise a store on that cache.
+    """
+    alias = getattr(settings, "THROTTLE_CACHE_ALIAS", None)
+    return local_bucket_store if alias is None else CacheBucketStore(alias)
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Throttles with a token bucket per client instead of DRF's request history.
+
+    The rate `"10/min"` of the throttle's `scope` in `DEFAULT_THROTTLE_RATES`
+    is a bucket of 10 tokens refilled at 10 tokens a minute: a client can make
+    a burst of 10 requests and then one request every 6 seconds. A bucket is a
+    `(tokens, updated_at)` pair, so checking a request costs one lookup in the
+    store instead of DRF's list of timestamps per client. Throttled requests
+    get a 429 response with a `Retry-After` header.
+    """
+    timer = time.time
+
+    def __init__(self):
+        super().__init__()
+        self.store = get_bucket_store()
+        if self.rate is not None:
+            self.capacity = self.num_requests
+            self.refill_rate = self.num_requests / self.duration
+        self.wait_time = None
+
+    def allow_request(self, request, view):
+        key = self.get_bucket_key(request, view)
+        if key is None:
+            return True
+        self.wait_time = self.store.take(key, self.capacity, self.refill_rate, self.timer())
+        return self.wait_time is None
+
+    async def aallow_request(self, request, view):
+        key = self.get_bucket_key(request, view)
+        if key is None:
+            return True
+        self.wait_time = await self.store.atake(key, self.capacity, self.refill_rate, self.timer())
+        return self.wait_time is None
+
+    def get_bucket_key(self, request, view):
+        if self.rate is None:
+            return None
+        return self.get_cache_key(request, view)
+
+    def wait(self):
+        return self.wait_time
+
+
+class SignupRateThrottle(TokenBucketThrottle):
+    """
+    Limits account creation per client IP address.
+
+    The address is taken from `X-Forwarded-For` only behind the number of proxies
+    set in `REST_FRAMEWORK["NUM_PROXIES"]`, so clients can't reset their bucket
+    by sending a different header with each request.
+    """
+    scope = "signup"
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {"scope": self.scope, "ident": self.get_ident(request)}
+
+
+class LoginRateThrottle(SignupRateThrottle):
+    """
+    Limits token requests per client IP address.
+    """
+    scope = "login"
+
+
+class WriteRateThrottle(TokenBucketThrottle):
+    """
+    Limits POST, PUT, PATCH and DELETE requests per user, or per IP address for
+    anonymous requests. Reads are not throttled.
+    """
+    scope = "write"
+
+    def get_cache_key(self, request, view):
+        if request.method in SAFE_METHODS:
+            return None
+        if request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {"scope": self.scope, "ident": ident}
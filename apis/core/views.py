@@ -0,0 +1,67 @@
+from django.http import HttpResponse
+from rest_framework.response import Response
+
+from apis.core.caching import response_cache
+from apis.core.metrics import request_metrics
+
+from apis.core.readers import compile_plan
+from apis.core.serializers import requested_fieldset
+
+
+def sparse_queryset(queryset, serializer, extra=()):
+    """
+    Restrict `queryset` to the fields `serializer` renders for its request's
+    `?fields=` and `?expand=`, see `Plan.apply`. `extra` columns are loaded too.
+    """
+    fields, expand = requested_fieldset(serializer.context.get("request"))
+    if fields is None and expand is None:
+        return queryset
+    return compile_plan(serializer, queryset.model).apply(queryset, extra)
+
+
+class SparseQuerysetMixin:
+    """
+    Defers what the `?fields=`/`?expand=` of a request leave out of the response.
+
+    For generic views whose serializer uses `SparseFieldsMixin`. `sparse_extra`
+    lists columns the view needs besides the rendered ones.
+    """
+    sparse_extra = ()
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields, expand = requested_fieldset(self.request)
+        if fields is None and expand is None:
+            return queryset
+        return sparse_queryset(queryset, self.get_serializer(), self.sparse_extra)
+
+
+class CompiledListMixin:
+    """
+    Serves the GET list of a generic view through a compiled `ValuesReader`.
+
+    Views set `reader = ValuesReader(serializer_class)`. The output is identical to
+    the serializer's, but the rows are read with `.values()` and mapped through the
+    reader's precomputed field plan.
+    """
+    reader = None
+
+    def list(self, request, *args, **kwargs):
+        ordering = getattr(self.paginator, "ordering", ())
+        rows = self.reader.values(self.filter_queryset(self.get_queryset()), request, ordering)
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(self.reader.render(page, request))
+        return Response(self.reader.render(rows, request))
+
+
+def metrics_view(request):
+    """
+    Expose the request histograms and response cache statistics of this process
+    in the Prometheus text format.
+
+    Not authenticated, so that Prometheus can scrape it; keep it off the public
+    internet at the proxy.
+    """
+    return HttpResponse(request_metrics.render() + response_cache.render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class LibraryConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apis.library"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,71 @@
+from asgiref.sync import sync_to_async
+from rest_framework import permissions
+from rest_framework.exceptions import NotFound
+from apis.core.async_views import AsyncAPIView, AsyncListCreateView
+from apis.core.readers import ValuesReader
+from .models import Author, Genre, Book
+from .serializers import AuthorSerializer, GenreSerializer, BookSerializer
+from .views import BookListCreateView
+
+
+class AsyncAuthorListCreateView(AsyncListCreateView):
+    queryset = Author.objects.all()
+    serializer_class = AuthorSerializer
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    reader = ValuesReader(AuthorSerializer)
+
+
+class AsyncGenreListCreateView(AsyncListCreateView):
+    queryset = Genre.objects.all()
+    serializer_class = GenreSerializer
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    reader = ValuesReader(GenreSerializer)
+
+
+class AsyncBookListCreateView(AsyncListCreateView):
+    """
+    Async version of `BookListCreateView`.
+
+    Authors and genres of the page are read with one async query each. Creating a
+    book resolves its authors and genres in a transaction, which the async ORM
+    cannot run, so `BookSerializer.save` runs in a worker thread.
+    """
+    queryset = Book.objects.with_related()
+    serializer_class = BookSerializer
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    reader = BookListCreateView.reader
+
+    async def perform_create(self, serializer):
+        return await sync_to_async(serializer.save)()
+
+
+class AsyncBookDetailView(AsyncAPIView):
+    """
+    Async version of `BookDetailView`.
+
+    - GET: Returns a book with its authors and genres.
+    - PUT/PATCH: Updates the book, in a worker thread like `AsyncBookListCreateView.post`.
+    """
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    reader = BookListCreateView.reader
+
+    async def get(self, request, pk):
+        rows = [row async for row in self.reader.values(Book.objects.filter(pk=pk), request)]
+        if not rows:
+            raise NotFound()
+        data, = await self.reader.arender(rows, request)
+        return self.respond(data)
+
+    async def put(self, request, pk, partial=False):
+        try:
+            book = await Book.objects.with_related().aget(pk=pk)
+        except Book.DoesNotExist:
+            raise NotFound()
+        serializer = BookSerializer(book, data=request.data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        book = await sync_to_async(serializer.save)()
+        book = await Book.objects.with_related().aget(pk=book.pk)
+        return self.respond(BookSerializer(book).data)
+
+    async def patch(self, request, pk):
+        return await self.put(request, pk, partial=True)
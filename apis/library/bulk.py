@@ -0,0 +1,73 @@
+from apis.core.caching import response_cache
+
+
+def get_or_create_many(model, rows, lookup="name", resolved=None):
+    """
+    Batched equivalent of calling `model.objects.get_or_create(**row)` for every row.
+
+    Existing objects are fetched with a single query filtered on `lookup` and the
+    missing ones are inserted with a single `bulk_create`. Returns the objects in
+    the order of `rows`; identical rows resolve to the same object.
+
+    Passing the same `resolved` dict to several calls reuses the objects resolved
+    by earlier calls instead of looking them up again.
+    """
+    if not rows:
+        return []
+
+    fields = sorted(rows[0])
+
+    def key(values):
+        return tuple(values[field] for field in fields)
+
+    def key_of(obj):
+        return tuple(getattr(obj, field) for field in fields)
+
+    if resolved is None:
+        resolved = {}
+    unresolved = [row for row in rows if key(row) not in resolved]
+    if unresolved:
+        existing = model.objects.filter(**{f"{lookup}__in": {row[lookup] for row in unresolved}}).order_by("pk")
+        for obj in existing:
+            resolved.setdefault(key_of(obj), obj)
+
+    missing = {}
+    for row in unresolved:
+        if key(row) not in resolved:
+            missing.setdefault(key(row), model(**row))
+    if missing:
+        model.objects.bulk_create(missing.values())
+        resolved.update(missing)
+        # bulk_create sends no post_save signals.
+        response_cache.invalidate(model._meta.label_lower)
+
+    return [resolved[key(row)] for row in rows]
+
+
+def set_related(instance, field_name, objs, created=False):
+    """
+    Point the many-to-many `field_name` of `instance` at exactly `objs`.
+
+    The current through rows are diffed against `objs` so only the rows that
+    change are deleted or inserted. A freshly `created` instance has no through
+    rows yet and skips the lookup.
+    """
+    manager = getattr(instance, field_name)
+    target_ids = {obj.pk for obj in objs}
+
+    if created:
+        current_ids = set()
+    else:
+        field = instance._meta.get_field(field_name)
+        current_ids = set(
+            field.remote_field.through.objects
+            .filter(**{field.m2m_field_name(): instance.pk})
+            .values_list(field.m2m_reverse_name(), flat=True)
+        )
+
+    stale_ids = current_ids - target_ids
+    if stale_ids:
+        manager.remove(*stale_ids)
+    new_ids = target_ids - current_ids
+    if new_ids:
+        manager.add(*new_ids)
@@ -0,0 +1,102 @@
+import logging
+from itertools import islice
+
+from django.db import DatabaseError, transaction
+from rest_framework.exceptions import ParseError
+
+from apis.core.caching import response_cache
+from .bulk import get_or_create_many
+from .models import Author, Genre, Book
+from .serializers import BookSerializer
+
+logger = logging.getLogger(__name__)
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class BookImporter:
+    """
+    Imports an iterable of book payloads in chunks of `chunk_size` items.
+
+    Every chunk is validated with `BookSerializer` and written in one transaction
+    with a `bulk_create` for the books, one lookup and `bulk_create` per nested
+    model and one batch insert per through table. Authors and genres are
+    deduplicated across the whole import, so memory use depends on the chunk size
+    and the number of distinct authors and genres rather than on the payload.
+    """
+
+    def __init__(self, chunk_size=500):
+        self.chunk_size = chunk_size
+        self.authors = {}
+        self.genres = {}
+
+    def run(self, items):
+        """
+        Import `items` and yield one result per item, in order.
+
+        A result is either `{"index": i, "id": pk}` for an imported book or
+        `{"index": i, "errors": ...}` for an item that failed validation or whose
+        chunk could not be written. A database error only rolls back its chunk,
+        as earlier results may already have been sent to the client.
+        """
+        for chunk in chunked(enumerate(items), self.chunk_size):
+            yield from self.import_chunk(chunk)
+
+    def import_chunk(self, chunk):
+        results = {}
+        valid = []
+        for index, item in chunk:
+            if isinstance(item, ParseError):
+                results[index] = {"index": index, "errors": {"non_field_errors": [item.detail]}}
+                continue
+            serializer = BookSerializer(data=item)
+            if serializer.is_valid():
+                valid.append((index, serializer.validated_data))
+            else:
+                results[index] = {"index": index, "errors": serializer.errors}
+
+        if valid:
+            sizes = len(self.authors), len(self.genres)
+            try:
+                with transaction.atomic():
+                    books = self.write(data for index, data in valid)
+            except DatabaseError:
+                logger.exception("Importing a chunk of %d books failed.", len(valid))
+                # Forget the authors and genres the rolled back transaction resolved.
+                # `get_or_create_many` only ever adds keys, so they are the last ones.
+                for resolved, size in zip((self.authors, self.genres), sizes):
+                    while len(resolved) > size:
+                        resolved.popitem()
+                for index, data in valid:
+                    results[index] = {"index": index, "errors": {"non_field_errors": ["The book could not be saved."]}}
+            else:
+                for (index, data), book in zip(valid, books):
+                    results[index] = {"index": index, "id": book.pk}
+
+        return [results[index] for index, item in chunk]
+
+    def write(self, validated):
+        books, authors, genres = [], [], []
+        for data in validated:
+            data = dict(data)
+            authors.append(data.pop("authors"))
+            genres.append(data.pop("genres"))
+            books.append(Book(**data))
+        Book.objects.bulk_create(books)
+        response_cache.invalidate(Book._meta.label_lower)
+
+        self.link(books, authors, Author, Book.authors.through, "author_id", self.authors)
+        self.link(books, genres, Genre, Book.genres.through, "genre_id", self.genres)
+        return books
+
+    def link(self, books, rows_per_book, model, through, target_field, resolved):
+        objs = iter(get_or_create_many(model, [row for rows in rows_per_book for row in rows], resolved=resolved))
+        links = []
+        for book, rows in zip(books, rows_per_book):
+            target_ids = dict.fromkeys(next(objs).pk for row in rows)
+            links.extend(through(book_id=book.pk, **{target_field: target_id}) for target_id in target_ids)
+        through.objects.bulk_create(links)
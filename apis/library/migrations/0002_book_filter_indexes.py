@@ -0,0 +1,38 @@
+# Generated by Django 5.1 on 2026-10-18 06:41
+
+from django.db import migrations, models
+
+# `title__icontains` compiles to UPPER("title"::text) LIKE UPPER(...), which a
+# trigram index on the same expression serves. SQLite has no equivalent and
+# scans the table instead.
+POSTGRES_INSTALL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX library_book_title_trgm_idx ON library_book USING gin (UPPER(title::text) gin_trgm_ops)",
+]
+
+POSTGRES_UNINSTALL = [
+    "DROP INDEX IF EXISTS library_book_title_trgm_idx",
+]
+
+
+def run(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor == "postgresql":
+            for statement in statements:
+                schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("library", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(fields=["publication_date", "id"], name="library_book_pubdate_idx"),
+        ),
+        migrations.RunPython(run(POSTGRES_INSTALL), run(POSTGRES_UNINSTALL)),
+    ]
@@ -16,6 +16,20 @@ class Genre(models.Model):
         return self.name
 
 
+class BookQuerySet(models.QuerySet):
+    def with_related(self):
+        """
+        Prefetch the nested authors and genres rendered by `BookSerializer`.
+
+        Loads a page of books in three queries regardless of its size. Authors and
+        genres are ordered by primary key, like the compiled read path.
+        """
+        return self.prefetch_related(
+            models.Prefetch("authors", queryset=Author.objects.order_by("pk")),
+            models.Prefetch("genres", queryset=Genre.objects.order_by("pk")),
+        )
+
+
 class Book(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField()
@@ -23,5 +37,13 @@ class Book(models.Model):
     authors = models.ManyToManyField(Author, related_name='books')
     genres = models.ManyToManyField(Genre, related_name='books')
 
+    objects = BookQuerySet.as_manager()
+
+    class Meta:
+        # Title search uses a trigram index on PostgreSQL, created by migration 0002.
+        indexes = [
+            models.Index(fields=["publication_date", "id"], name="library_book_pubdate_idx"),
+        ]
+
     def __str__(self):
         return self.title
@@ -1,20 +1,23 @@
+from django.db import transaction
 from rest_framework import serializers
+from apis.core.serializers import SparseFieldsMixin, TimedSerializerMixin
+from .bulk import get_or_create_many, set_related
 from .models import Author, Genre, Book
 
 
-class AuthorSerializer(serializers.ModelSerializer):
+class AuthorSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Author
         fields = ["id", "name", "bio"]
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Genre
         fields = ["id", "name"]
 
 
-class BookSerializer(serializers.ModelSerializer):
+class BookSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     authors = AuthorSerializer(many=True)
     genres = GenreSerializer(many=True)
 
@@ -22,21 +25,18 @@ class BookSerializer(serializers.ModelSerializer):
         model = Book
         fields = ["id", "title", "description", "publication_date", "authors", "genres"]
 
+    @transaction.atomic
     def create(self, validated_data):
         authors_data = validated_data.pop("authors")
         genres_data = validated_data.pop("genres")
         book = Book.objects.create(**validated_data)
 
-        for author_data in authors_data:
-            author, created = Author.objects.get_or_create(**author_data)
-            book.authors.add(author)
-
-        for genre_data in genres_data:
-            genre, created = Genre.objects.get_or_create(**genre_data)
-            book.genres.add(genre)
+        set_related(book, "authors", get_or_create_many(Author, authors_data), created=True)
+        set_related(book, "genres", get_or_create_many(Genre, genres_data), created=True)
 
         return book
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         authors_data = validated_data.pop('authors', None)
         genres_data = validated_data.pop('genres', None)
@@ -47,15 +47,9 @@ class BookSerializer(serializers.ModelSerializer):
         instance.save()
 
         if authors_data is not None:
-            instance.authors.clear()
-            for author_data in authors_data:
-                author, created = Author.objects.get_or_create(**author_data)
-                instance.authors.add(author)
+            set_related(instance, "authors", get_or_create_many(Author, authors_data))
 
         if genres_data is not None:
-            instance.genres.clear()
-            for genre_data in genres_data:
-                genre, created = Genre.objects.get_or_create(**genre_data)
-                instance.genres.add(genre)
+            set_related(instance, "genres", get_or_create_many(Genre, genres_data))
 
         return instance
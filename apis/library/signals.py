@@ -0,0 +1,33 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from apis.core.caching import response_cache
+from .models import Author, Genre, Book
+
+
+@receiver([post_save, post_delete], sender=Book)
+def invalidate_book_responses(sender, instance, **kwargs):
+    response_cache.invalidate(Book._meta.label_lower, [instance.pk])
+
+
+@receiver(m2m_changed, sender=Book.authors.through)
+@receiver(m2m_changed, sender=Book.genres.through)
+def invalidate_book_relation_responses(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith("post_"):
+        return
+    if not reverse:
+        response_cache.invalidate(Book._meta.label_lower, [instance.pk])
+    elif pk_set is not None:
+        response_cache.invalidate(Book._meta.label_lower, pk_set)
+    else:
+        response_cache.invalidate_all(Book._meta.label_lower)
+
+
+@receiver([post_save, post_delete], sender=Author)
+@receiver([post_save, post_delete], sender=Genre)
+def invalidate_nested_responses(sender, instance, **kwargs):
+    """
+    Authors and genres are nested in every book that references them.
+    """
+    response_cache.invalidate(sender._meta.label_lower, [instance.pk])
+    response_cache.invalidate_all(Book._meta.label_lower)
@@ -1,3 +1,380 @@
-from django.test import TestCase
+import json
+from datetime import datetime, timezone as dt_timezone
+from io import BytesIO
+from unittest import mock, skipIf
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apis.core import renderers
+from apis.core.caching import response_cache
+from apis.core.testing import QueryCountAssertionsMixin
+from .importer import BookImporter
+from .models import Author, Genre, Book
+from .views import BookBulkImportView
+
+
+class LibraryTestCase(APITestCase):
+    def setUp(self):
+        response_cache.cache.clear()
+
+    def create_book(self, title="Book", authors=2, genres=2):
+        book = Book.objects.create(title=title, description="description", publication_date=timezone.now())
+        book.authors.set(Author.objects.create(name=f"{title} author {i}", bio="bio") for i in range(authors))
+        book.genres.set(Genre.objects.create(name=f"{title} genre {i}") for i in range(genres))
+        return book
+
+
+class BookQueryCountTest(QueryCountAssertionsMixin, LibraryTestCase):
+    def test_book_list_query_count_is_constant(self):
+        url = reverse('book-list')
+        self.create_book()
+
+        def fetch():
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        def grow():
+            for i in range(5):
+                self.create_book(title=f"Book {Book.objects.count()}")
+
+        self.assertQueryCountStable(fetch, grow)
+
+    def test_book_detail_loads_relations_in_bulk(self):
+        book = self.create_book(authors=5, genres=5)
+        url = reverse('book-detail', args=[book.pk])
+
+        num_queries, response = self.count_queries(self.client.get, url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["authors"]), 5)
+        self.assertEqual(len(response.data["genres"]), 5)
+        self.assertEqual(num_queries, 3)
+
+    def test_book_stream_query_count_is_constant(self):
+        url = reverse('book-list')
+        self.create_book()
+
+        def fetch():
+            response = self.client.get(url, {'stream': 'true'})
+            self.assertEqual(len(json.loads(b"".join(response.streaming_content))), Book.objects.count())
+
+        def grow():
+            for i in range(5):
+                self.create_book(title=f"Book {Book.objects.count()}")
+
+        self.assertQueryCountStable(fetch, grow)
+
+
+class BookFilterTest(LibraryTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tolkien = Author.objects.create(name="Tolkien", bio="bio")
+        self.lewis = Author.objects.create(name="Lewis", bio="bio")
+        self.fantasy = Genre.objects.create(name="Fantasy")
+        self.essays = Genre.objects.create(name="Essays")
+        self.hobbit = self.add_book("The Hobbit", "1937-09-21", [self.tolkien], [self.fantasy])
+        self.narnia = self.add_book("Narnia", "1950-10-16", [self.lewis], [self.fantasy])
+        self.essays_book = self.add_book("Essays Presented", "1947-01-01", [self.tolkien, self.lewis], [self.essays])
+
+    def add_book(self, title, published, authors, genres):
+        book = Book.objects.create(
+            title=title, description="description", publication_date=f"{published}T12:00:00Z",
+        )
+        book.authors.set(authors)
+        book.genres.set(genres)
+        return book
+
+    def ids(self, **params):
+        response = self.client.get(reverse('book-list'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [book["id"] for book in response.data["results"]]
+
+    def test_filter_by_author_and_genre(self):
+        self.assertEqual(self.ids(author=self.tolkien.pk), [self.hobbit.pk, self.essays_book.pk])
+        self.assertEqual(
+            self.ids(author=f"{self.tolkien.pk},{self.lewis.pk}"),
+            [self.hobbit.pk, self.narnia.pk, self.essays_book.pk],
+        )
+        self.assertEqual(self.ids(author=self.tolkien.pk, genre=self.fantasy.pk), [self.hobbit.pk])
+
+    def test_filter_by_publication_date_and_title(self):
+        self.assertEqual(self.ids(published_after="1940-01-01", published_before="1947-01-01"), [self.essays_book.pk])
+        self.assertEqual(self.ids(published_before="1947-01-01T00:00:00Z"), [self.hobbit.pk])
+        self.assertEqual(
+            self.ids(published_before="9999-12-31"), [self.hobbit.pk, self.narnia.pk, self.essays_book.pk],
+        )
+        self.assertEqual(self.ids(search="hobb"), [self.hobbit.pk])
+
+    def test_facets_ignore_their_own_filter(self):
+        response = self.client.get(reverse('book-list'), {'genre': self.fantasy.pk})
+        facets = response.data["facets"]
+        self.assertEqual(
+            [(genre["name"], genre["count"]) for genre in facets["genres"]], [("Fantasy", 2), ("Essays", 1)]
+        )
+        self.assertEqual(
+            [(author["name"], author["count"]) for author in facets["authors"]], [("Tolkien", 1), ("Lewis", 1)]
+        )
+
+    def test_query_count_is_fixed(self):
+        with self.assertNumQueries(5):
+            self.client.get(reverse('book-list'), {
+                'author': self.tolkien.pk, 'genre': self.fantasy.pk, 'published_after': '1900-01-01', 'search': 'the',
+            })
+
+    def test_invalid_filters(self):
+        for params in ({'author': 'tolkien'}, {'published_after': 'last year'}):
+            response = self.client.get(reverse('book-list'), params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class BookSparseFieldsTest(LibraryTestCase):
+    def setUp(self):
+        super().setUp()
+        self.book = self.create_book()
+        self.author_ids = list(self.book.authors.order_by("pk").values_list("pk", flat=True))
+
+    def test_relations_not_expanded_are_primary_keys(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('book-list'), {'fields': 'title,authors', 'expand': ''})
+        self.assertEqual(response.data["results"], [{"title": "Book", "authors": self.author_ids}])
+        page, authors = queries[0]["sql"], queries[1]["sql"]
+        self.assertNotIn('"description"', page)
+        self.assertIn('library_book_authors', authors)
+        self.assertNotIn('"library_author"', authors)
+        self.assertEqual(len(queries), 4)
+
+    def test_nested_fields(self):
+        response = self.client.get(reverse('book-list'), {'fields': 'id,authors.name'})
+        self.assertEqual(response.data["results"], [{
+            "id": self.book.pk, "authors": [{"name": "Book author 0"}, {"name": "Book author 1"}],
+        }])
+
+    def test_expand_alone_keeps_every_field(self):
+        response = self.client.get(reverse('book-detail', args=[self.book.pk]), {'expand': 'genres'})
+        self.assertEqual(response.data["authors"], self.author_ids)
+        self.assertEqual(response.data["genres"][0]["name"], "Book genre 0")
+        self.assertEqual(response.data["description"], "description")
+
+    def test_detail_skips_unrequested_relations(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('book-detail', args=[self.book.pk]), {'fields': 'title'})
+        self.assertEqual(response.data, {"title": "Book"})
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('"description"', queries[0]["sql"])
+
+
+class BookCacheTest(LibraryTestCase):
+    def test_author_change_invalidates_books(self):
+        book = self.create_book(authors=1)
+        url = reverse('book-detail', args=[book.pk])
+        self.client.get(url)
+        self.assertEqual(self.client.get(url)["X-Cache"], "HIT")
+
+        author = book.authors.get()
+        author.name = "Renamed"
+        author.save()
+
+        response = self.client.get(url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["authors"][0]["name"], "Renamed")
+
+    def test_relation_change_invalidates_book_list(self):
+        book = self.create_book(genres=1)
+        url = reverse('book-list')
+        self.client.get(url)
+
+        book.genres.add(Genre.objects.create(name="Added"))
+
+        response = self.client.get(url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(len(response.data["results"][0]["genres"]), 2)
+
+
+class BookWriteTest(QueryCountAssertionsMixin, LibraryTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='librarian', password='testpassword123')
+        self.client.force_authenticate(self.user)
+
+    def book_payload(self, authors, genres):
+        return {
+            "title": "Imported",
+            "description": "description",
+            "publication_date": "2024-09-07T19:04:00Z",
+            "authors": [{"name": name, "bio": "bio"} for name in authors],
+            "genres": [{"name": name} for name in genres],
+        }
+
+    def test_create_book_resolves_nested_items_in_batches(self):
+        existing = Author.objects.create(name="Author 0", bio="bio")
+        payload = self.book_payload([f"Author {i}" for i in range(10)] + ["Author 1"], [f"Genre {i}" for i in range(5)])
+
+        num_queries, response = self.count_queries(self.client.post, reverse('book-list'), payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertLessEqual(num_queries, 13)
+
+        book = Book.objects.get(pk=response.data["id"])
+        self.assertEqual(book.authors.count(), 10)
+        self.assertEqual(book.genres.count(), 5)
+        self.assertEqual(Author.objects.count(), 10)
+        self.assertIn(existing, book.authors.all())
+
+    def test_update_book_only_writes_changed_relations(self):
+        book = self.create_book(authors=0, genres=0)
+        book.authors.set([Author.objects.create(name="Kept", bio="bio"), Author.objects.create(name="Dropped", bio="bio")])
+        kept_row = Book.authors.through.objects.get(book=book, author__name="Kept")
+
+        payload = self.book_payload(["Kept", "Added"], ["Genre"])
+        response = self.client.put(reverse('book-detail', args=[book.pk]), payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(sorted(book.authors.values_list("name", flat=True)), ["Added", "Kept"])
+        self.assertTrue(Book.authors.through.objects.filter(pk=kept_row.pk).exists())
+        self.assertEqual(sorted(author["name"] for author in response.data["authors"]), ["Added", "Kept"])
+
+
+class AsyncBookViewsTest(LibraryTestCase):
+    def setUp(self):
+        super().setUp()
+        self.books = [self.create_book(f"Book {i}") for i in range(3)]
+        self.expected = self.client.get(reverse('book-list')).json()
+
+    async def test_list_matches_sync_view(self):
+        response = await self.async_client.get(reverse('async-book-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["results"], self.expected["results"])
+
+    async def test_detail(self):
+        response = await self.async_client.get(reverse('async-book-detail', args=[self.books[1].pk]))
+        self.assertEqual(response.json(), self.expected["results"][1])
+        response = await self.async_client.get(reverse('async-book-detail', args=[0]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_create_book(self):
+        user = await User.objects.acreate(username='librarian')
+        response = await self.async_client.post(reverse('async-book-list'), {
+            "title": "Async", "description": "description", "publication_date": "2024-01-01T00:00:00Z",
+            "authors": [{"name": "Author", "bio": "bio"}], "genres": [{"name": "Genre"}],
+        }, content_type='application/json', headers={'Authorization': f'Bearer {AccessToken.for_user(user)}'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()["authors"][0]["name"], "Author")
+
+
+class BookBulkImportTest(QueryCountAssertionsMixin, LibraryTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='librarian', password='testpassword123')
+        self.client.force_authenticate(self.user)
+        self.url = reverse('book-bulk-import')
+
+    def book_payload(self, title, authors=("Shared author",), genres=("Shared genre",)):
+        return {
+            "title": title,
+            "description": "description",
+            "publication_date": "2024-09-07T19:04:00Z",
+            "authors": [{"name": name, "bio": "bio"} for name in authors],
+            "genres": [{"name": name} for name in genres],
+        }
+
+    def results(self, response):
+        return json.loads(b"".join(response.streaming_content))
+
+    def test_import_json_array(self):
+        payload = [self.book_payload(f"Book {i}", authors=["Shared author", f"Author {i}"]) for i in range(5)]
+        payload.insert(2, {"title": "Missing fields"})
+
+        response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = self.results(response)
+
+        self.assertEqual([result["index"] for result in results], list(range(6)))
+        self.assertIn("errors", results[2])
+        self.assertEqual(Book.objects.count(), 5)
+        self.assertEqual(Author.objects.count(), 6)
+        self.assertEqual(Genre.objects.count(), 1)
+        book = Book.objects.get(pk=results[3]["id"])
+        self.assertEqual(book.title, "Book 2")
+        self.assertEqual(sorted(book.authors.values_list("name", flat=True)), ["Author 2", "Shared author"])
+
+    def test_import_ndjson_in_chunks(self):
+        lines = [json.dumps(self.book_payload(f"Book {i}")) for i in range(7)]
+        lines.insert(3, "{not json")
+        body = "\n".join(lines) + "\n"
+
+        chunk_size = BookBulkImportView.chunk_size
+        BookBulkImportView.chunk_size = 3
+        self.addCleanup(setattr, BookBulkImportView, "chunk_size", chunk_size)
+
+        response = self.client.post(self.url, body, content_type="application/x-ndjson")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        results = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+
+        self.assertEqual(len(results), 8)
+        self.assertIn("errors", results[3])
+        self.assertEqual(Book.objects.count(), 7)
+        self.assertEqual(Author.objects.count(), 1)
+        self.assertEqual(Book.authors.through.objects.count(), 7)
+
+    def test_json_array_is_imported_before_responding(self):
+        response = self.client.post(self.url, [self.book_payload(f"Book {i}") for i in range(3)], format='json')
+        self.assertEqual(Book.objects.count(), 3)
+        self.assertEqual(len(self.results(response)), 3)
+
+    def test_failed_chunk_is_reported_per_item(self):
+        authors = [("Shared author",)] * 2 + [("New author",)] * 4
+        lines = [json.dumps(self.book_payload(f"Book {i}", authors=names)) for i, names in enumerate(authors)]
+        chunk_size = BookBulkImportView.chunk_size
+        BookBulkImportView.chunk_size = 2
+        self.addCleanup(setattr, BookBulkImportView, "chunk_size", chunk_size)
+        write = BookImporter.write
+        calls = []
+
+        def fail_second_chunk(importer, validated):
+            books = write(importer, validated)
+            calls.append(books)
+            if len(calls) == 2:
+                raise IntegrityError("duplicate key")
+            return books
+
+        with mock.patch.object(BookImporter, "write", fail_second_chunk), self.assertLogs("apis.library.importer"):
+            response = self.client.post(self.url, "\n".join(lines), content_type="application/x-ndjson")
+            results = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+
+        self.assertEqual([result["index"] for result in results], list(range(6)))
+        self.assertEqual([("errors" in result) for result in results], [False, False, True, True, False, False])
+        self.assertEqual(Book.objects.count(), 4)
+        # The author created by the rolled back chunk is created again.
+        self.assertEqual(list(Book.objects.get(pk=results[5]["id"]).authors.values_list("name", flat=True)),
+                         ["New author"])
+
+    @skipIf(renderers.msgpack is None, "msgpack is not installed")
+    def test_import_message_pack(self):
+        published = datetime(2024, 9, 7, 19, 4, tzinfo=dt_timezone.utc)
+        payload = [{**self.book_payload(f"Book {i}"), "publication_date": published} for i in range(2)]
+        body = renderers.msgpack.packb(payload, datetime=True)
+
+        response = self.client.post(
+            self.url, body, content_type="application/msgpack", HTTP_ACCEPT="application/msgpack",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/msgpack")
+        results = list(renderers.msgpack.Unpacker(BytesIO(b"".join(response.streaming_content))))
+
+        self.assertEqual([result["index"] for result in results], [0, 1])
+        self.assertEqual(Book.objects.get(pk=results[1]["id"]).publication_date, published)
+
+    def test_import_rejects_single_object(self):
+        response = self.client.post(self.url, self.book_payload("Book"), format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_import_requires_authentication(self):
+        self.client.force_authenticate(None)
+        response = self.client.post(self.url, [], format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
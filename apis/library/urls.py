@@ -1,5 +1,6 @@
 from django.urls import path
-from .views import AuthorListCreateView, AuthorDetailView, GenreListCreateView, GenreDetailView, BookListCreateView, BookDetailView
+from .views import AuthorListCreateView, AuthorDetailView, GenreListCreateView, GenreDetailView, BookListCreateView, BookDetailView, BookBulkImportView
+from .async_views import AsyncAuthorListCreateView, AsyncGenreListCreateView, AsyncBookListCreateView, AsyncBookDetailView
 
 urlpatterns = [
     path('authors/', AuthorListCreateView.as_view(), name='author-list'),
@@ -8,4 +9,9 @@ urlpatterns = [
     path('genres/<int:pk>/', GenreDetailView.as_view(), name='genre-detail'),
     path('books/', BookListCreateView.as_view(), name='book-list'),
     path('books/<int:pk>/', BookDetailView.as_view(), name='book-detail'),
+    path('books/bulk/', BookBulkImportView.as_view(), name='book-bulk-import'),
+    path('async/authors/', AsyncAuthorListCreateView.as_view(), name='async-author-list'),
+    path('async/genres/', AsyncGenreListCreateView.as_view(), name='async-genre-list'),
+    path('async/books/', AsyncBookListCreateView.as_view(), name='async-book-list'),
+    path('async/books/<int:pk>/', AsyncBookDetailView.as_view(), name='async-book-detail'),
 ]
\ No newline at end of file
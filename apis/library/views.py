@@ -1,39 +1,131 @@
+from types import GeneratorType
+
+from django.http import StreamingHttpResponse
 from rest_framework import generics, permissions
+from rest_framework.exceptions import ParseError
+from rest_framework.views import APIView
+from apis.core.caching import CachedResponseMixin
+from apis.core.parsers import CBORParser, FastJSONParser, MessagePackParser
+from apis.core.readers import ValuesReader
+from apis.core.renderers import CBORRenderer, FastJSONRenderer, MessagePackRenderer
+from apis.core.streaming import StreamingListMixin
+from apis.core.views import CompiledListMixin, SparseQuerysetMixin
+from .filters import BookFilterBackend
+from .importer import BookImporter
 from .models import Author, Genre, Book
+from .parsers import NDJSONParser
 from .serializers import AuthorSerializer, GenreSerializer, BookSerializer
 
 
-class AuthorListCreateView(generics.ListCreateAPIView):
+class AuthorListCreateView(CachedResponseMixin, SparseQuerysetMixin, generics.ListCreateAPIView):
     queryset = Author.objects.all()
     serializer_class = AuthorSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
 
-class AuthorDetailView(generics.RetrieveUpdateAPIView):
+class AuthorDetailView(CachedResponseMixin, SparseQuerysetMixin, generics.RetrieveUpdateAPIView):
     queryset = Author.objects.all()
     serializer_class = AuthorSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
 
-class GenreListCreateView(generics.ListCreateAPIView):
+class GenreListCreateView(CachedResponseMixin, SparseQuerysetMixin, generics.ListCreateAPIView):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
 
-class GenreDetailView(generics.RetrieveUpdateAPIView):
+class GenreDetailView(CachedResponseMixin, SparseQuerysetMixin, generics.RetrieveUpdateAPIView):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
 
-class BookListCreateView(generics.ListCreateAPIView):
-    queryset = Book.objects.all()
+class BookListCreateView(StreamingListMixin, CachedResponseMixin, CompiledListMixin, SparseQuerysetMixin,
+                         generics.ListCreateAPIView):
+    """
+    View to list and filter books or create a new book.
+
+    - GET: Returns a page of books filtered by `author`, `genre`, `published_after`,
+      `published_before` and `search` (see `BookFilterBackend`). The page carries
+      `facets` with the number of matching books per author and per genre.
+      `?fields=` and `?expand=` select the returned fields, e.g. `?fields=title&expand=`
+      or `?fields=title,authors.name`.
+    - POST: Authenticated users can create a book with its authors and genres.
+    """
+    queryset = Book.objects.with_related()
     serializer_class = BookSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    filter_backends = [BookFilterBackend]
+    reader = ValuesReader(BookSerializer)
 
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        response.data["facets"] = BookFilterBackend().facets(self.request, self.get_queryset())
+        return response
 
-class BookDetailView(generics.RetrieveUpdateAPIView):
-    queryset = Book.objects.all()
+
+class BookDetailView(CachedResponseMixin, SparseQuerysetMixin, generics.RetrieveUpdateAPIView):
+    queryset = Book.objects.with_related()
     serializer_class = BookSerializer
-    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
\ No newline at end of file
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+
+
+class BookBulkImportView(APIView):
+    """
+    View to import many books in a single request.
+
+    - POST: Accepts a JSON array of books, one book per line as NDJSON
+      (`application/x-ndjson`), or a MessagePack or CBOR array, in the format used
+      by `BookSerializer`.
+
+    Items are validated and written in chunks of `chunk_size` books; NDJSON bodies
+    as the response streams, array bodies before it starts. The response streams
+    one result per item, in order: a JSON array for JSON requests and NDJSON for
+    NDJSON requests. Clients that accept
+    `application/msgpack` or `application/cbor` receive the results as a sequence
+    of concatenated MessagePack or CBOR items instead. A result is either
+    `{"index": 0, "id": 1}` or `{"index": 0, "errors": {...}}`.
+
+    Permissions:
+    - IsAuthenticated: Only authenticated users can import books.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [FastJSONParser, NDJSONParser, MessagePackParser, CBORParser]
+    binary_renderers = {"msgpack": MessagePackRenderer, "cbor": CBORRenderer}
+    chunk_size = 500
+
+    def post(self, request, format=None):
+        items = request.data
+        if not isinstance(items, (list, GeneratorType)):
+            raise ParseError("Expected a list of books.")
+
+        results = BookImporter(chunk_size=self.chunk_size).run(items)
+        if isinstance(items, list):
+            # The body is already in memory, so import it before responding: errors
+            # then reach the exception handler instead of cutting the stream short.
+            results = list(results)
+        renderer = self.binary_renderers.get(request.accepted_renderer.format)
+        if renderer is not None:
+            return StreamingHttpResponse(self.render_sequence(results, renderer()), content_type=renderer.media_type)
+        if request.content_type.startswith(NDJSONParser.media_type):
+            return StreamingHttpResponse(self.render_ndjson(results), content_type=NDJSONParser.media_type)
+        return StreamingHttpResponse(self.render_json(results), content_type="application/json")
+
+    def render_json(self, results):
+        renderer = FastJSONRenderer()
+        yield b"["
+        for position, result in enumerate(results):
+            if position:
+                yield b","
+            yield renderer.render(result)
+        yield b"]"
+
+    def render_ndjson(self, results):
+        renderer = FastJSONRenderer()
+        for result in results:
+            yield renderer.render(result) + b"\n"
+
+    def render_sequence(self, results, renderer):
+        for result in results:
+            yield renderer.render(result)
@@ -0,0 +1,83 @@
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from rest_framework import status
+from rest_framework.exceptions import NotFound
+from rest_framework.permissions import IsAuthenticated
+from apis.core.async_views import AsyncAPIView, AsyncListCreateView
+from .models import Task, TaskTombstone
+from .pagination import TaskPagination
+from .serializers import TaskSerializer
+from .views import task_reader
+
+
+class AsyncTaskListView(AsyncListCreateView):
+    """
+    Async version of `TaskListView` for ASGI deployments.
+
+    - GET: Returns a page of the authenticated user's tasks, read with the async ORM.
+      Accepts the same `completed` filter.
+    - POST: Creates a new task owned by the authenticated user.
+    """
+    queryset = Task.objects.select_related('owner')
+    serializer_class = TaskSerializer
+    permission_classes = (IsAuthenticated,)
+    pagination_class = TaskPagination
+    reader = task_reader
+
+    def get_queryset(self):
+        tasks = self.queryset.filter(owner_id=self.request.user.pk)
+        completed = self.request.query_params.get('completed')
+        if completed is not None:
+            tasks = tasks.filter(completed=completed.lower() in ('true', '1'))
+        return tasks
+
+    async def perform_create(self, serializer):
+        return await Task.objects.acreate(owner_id=self.request.user.pk, **serializer.validated_data)
+
+
+class AsyncTaskDetailView(AsyncAPIView):
+    """
+    Async version of `TaskDetailView` for ASGI deployments.
+
+    - GET: Returns details of a task that belongs to the authenticated user.
+    - PUT: Partially updates the task.
+    - DELETE: Deletes the task.
+    """
+    permission_classes = (IsAuthenticated,)
+
+    async def get_object(self, pk, user):
+        """
+        Retrieve a task by its primary key and owner.
+
+        Raises:
+        - NotFound: If the task does not exist or does not belong to the user.
+        """
+        try:
+            return await Task.objects.select_related('owner').aget(pk=pk, owner_id=user.pk)
+        except Task.DoesNotExist:
+            raise NotFound()
+
+    async def get(self, request, pk):
+        task = await self.get_object(pk, request.user)
+        return self.respond(TaskSerializer(task, context={'request': request}).data)
+
+    async def put(self, request, pk):
+        task = await self.get_object(pk, request.user)
+        ser_data = TaskSerializer(task, data=request.data, partial=True)
+        ser_data.is_valid(raise_exception=True)
+        for attr, value in ser_data.validated_data.items():
+            setattr(task, attr, value)
+        await task.asave()
+        return self.respond(TaskSerializer(task).data)
+
+    async def delete(self, request, pk):
+        task = await self.get_object(pk, request.user)
+        await sync_to_async(self.delete_task)(task)
+        return self.respond({"detail": f"{task.title} has been deleted"}, status.HTTP_204_NO_CONTENT)
+
+    def delete_task(self, task):
+        # The async ORM cannot run transactions, so the delete and its
+        # tombstone are written together in a worker thread.
+        with transaction.atomic():
+            TaskTombstone.objects.create(owner_id=task.owner_id, task_id=task.pk)
+            task.delete()
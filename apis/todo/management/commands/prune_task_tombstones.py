@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apis.todo.models import TaskTombstone
+
+
+class Command(BaseCommand):
+    help = "Delete task tombstones older than TASK_TOMBSTONE_RETENTION. Run it daily, e.g. from cron."
+
+    def handle(self, *args, **options):
+        deleted = TaskTombstone.prune()
+        self.stdout.write(f"Deleted {deleted} expired task tombstones.")
@@ -0,0 +1,23 @@
+# Generated by Django 5.1 on 2026-10-18 06:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("todo", "0002_task_todo_task_owner_updated_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(("completed", False)),
+                fields=["owner", "updated_at", "id"],
+                name="todo_task_open_owner_idx",
+            ),
+        ),
+    ]
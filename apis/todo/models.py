@@ -1,5 +1,7 @@
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 
 class Task(models.Model):
@@ -10,7 +12,51 @@ class Task(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["owner", "updated_at", "id"], name="todo_task_owner_updated_idx"),
+            models.Index(
+                fields=["owner", "updated_at", "id"],
+                condition=models.Q(completed=False),
+                name="todo_task_open_owner_idx",
+            ),
+        ]
+
     def __str__(self):
         return self.title
 
 
+class TaskTombstone(models.Model):
+    """
+    Records a deleted task so that syncing clients learn to drop it.
+
+    Tombstones are kept for `TASK_TOMBSTONE_RETENTION`; `prune` deletes older ones.
+    """
+    owner = models.ForeignKey(User, on_delete=models.CASCADE)
+    task_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["owner", "deleted_at"], name="todo_tombstone_owner_idx"),
+            models.Index(fields=["deleted_at"], name="todo_tombstone_deleted_idx"),
+        ]
+
+    def __str__(self):
+        return f"Task {self.task_id} deleted at {self.deleted_at}"
+
+    @classmethod
+    def horizon(cls, now=None):
+        """
+        Return the oldest deletion time still recorded: tombstones before it may
+        have been pruned.
+        """
+        return (now or timezone.now()) - settings.TASK_TOMBSTONE_RETENTION
+
+    @classmethod
+    def prune(cls, now=None):
+        """
+        Delete the tombstones older than the retention window and return how many.
+        """
+        deleted, _ = cls.objects.filter(deleted_at__lt=cls.horizon(now)).delete()
+        return deleted
@@ -0,0 +1,5 @@
+from apis.core.pagination import KeysetPagination
+
+
+class TaskPagination(KeysetPagination):
+    ordering = ("updated_at", "id")
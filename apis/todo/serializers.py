@@ -1,10 +1,29 @@
 from rest_framework import serializers
+from apis.core.serializers import SparseFieldsMixin, TimedSerializerMixin
 from .models import Task
 
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     owner = serializers.ReadOnlyField(source='owner.username')
 
     class Meta:
         model = Task
-        fields = ["id", "title", "description", "completed", "owner", 'created_at', 'updated_at']
\ No newline at end of file
+        fields = ["id", "title", "description", "completed", "owner", 'created_at', 'updated_at']
+
+
+class TaskBulkIdsSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=500)
+
+
+class TaskBulkUpdateSerializer(TaskBulkIdsSerializer):
+    changes = serializers.DictField()
+
+    def validate_changes(self, value):
+        task = TaskSerializer(data=value, partial=True)
+        unknown = sorted(set(value) - {name for name, field in task.fields.items() if not field.read_only})
+        if unknown:
+            raise serializers.ValidationError(f"Unknown or read-only fields: {', '.join(unknown)}.")
+        task.is_valid(raise_exception=True)
+        if not task.validated_data:
+            raise serializers.ValidationError("No changes given.")
+        return task.validated_data
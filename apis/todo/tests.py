@@ -1,3 +1,395 @@
-from django.test import TestCase
+import json
+from datetime import timedelta
+from io import StringIO
+from unittest import mock, skipIf
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apis.core import conditional, renderers
+from apis.core.testing import IndexUsageAssertionsMixin, query_budget
+from .models import Task, TaskTombstone
+from .pagination import TaskPagination
+
+
+class TodoTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='owner', password='testpassword123')
+        self.client.force_authenticate(self.user)
+
+    def create_tasks(self, count, owner=None):
+        return [
+            Task.objects.create(owner=owner or self.user, title=f"Task {i}", description="description")
+            for i in range(count)
+        ]
+
+
+class TaskPaginationTest(TodoTestCase):
+    def test_pages_through_own_tasks_with_tied_timestamps(self):
+        tasks = self.create_tasks(5)
+        self.create_tasks(2, owner=User.objects.create_user(username='other', password='testpassword123'))
+        Task.objects.filter(owner=self.user).update(updated_at=timezone.now())
+
+        ids = []
+        url = reverse('task-list') + '?page_size=2'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(task["id"] for task in response.data["results"])
+            url = response.data["next"]
+        self.assertEqual(ids, [task.pk for task in tasks])
+
+    def test_filter_by_completed(self):
+        tasks = self.create_tasks(3)
+        Task.objects.filter(pk=tasks[1].pk).update(completed=True)
+
+        response = self.client.get(reverse('task-list'), {'completed': 'false'})
+        self.assertEqual([task["id"] for task in response.data["results"]], [tasks[0].pk, tasks[2].pk])
+
+
+class TaskStreamTest(TodoTestCase):
+    def test_stream_returns_every_task_unpaginated(self):
+        tasks = self.create_tasks(60)
+
+        response = self.client.get(reverse('task-list'), {'stream': 'true'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        streamed = json.loads(b"".join(response.streaming_content))
+
+        self.assertEqual([task["id"] for task in streamed], [task.pk for task in tasks])
+        page = self.client.get(reverse('task-list'))
+        self.assertEqual(streamed[:50], page.json()["results"])
+
+    def test_stream_empty_list(self):
+        response = self.client.get(reverse('task-list'), {'stream': 'true'})
+        self.assertEqual(json.loads(b"".join(response.streaming_content)), [])
+
+
+class TaskConditionalRequestTest(TodoTestCase):
+    def test_detail_not_modified(self):
+        task = self.create_tasks(1)[0]
+        url = reverse('task-detail', args=[task.pk])
+        etag = self.client.get(url)["ETag"]
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+
+        self.client.put(url, {"completed": True}, format='json')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_update_with_stale_if_match_is_rejected(self):
+        task = self.create_tasks(1)[0]
+        url = reverse('task-detail', args=[task.pk])
+        etag = self.client.get(url)["ETag"]
+
+        response = self.client.put(url, {"title": "First"}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.put(url, {"title": "Second"}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+
+        task.refresh_from_db()
+        self.assertEqual(task.title, "First")
+
+    def test_update_racing_a_concurrent_update_is_rejected(self):
+        task = self.create_tasks(1)[0]
+        url = reverse('task-detail', args=[task.pk])
+        etag = self.client.get(url)["ETag"]
+
+        def evaluate_then_change(request, validators):
+            response = conditional.evaluate_preconditions(request, validators)
+            Task.objects.filter(pk=task.pk).update(title="Concurrent", updated_at=timezone.now() + timedelta(seconds=1))
+            return response
+
+        with mock.patch('apis.todo.views.evaluate_preconditions', evaluate_then_change):
+            response = self.client.put(url, {"title": "Mine"}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        task.refresh_from_db()
+        self.assertEqual(task.title, "Concurrent")
+
+    def test_list_not_modified_until_a_task_is_deleted(self):
+        tasks = self.create_tasks(3)
+        url = reverse('task-list')
+        etag = self.client.get(url)["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        tasks[0].delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+
+class TaskQueryBudgetTest(TodoTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tasks = self.create_tasks(20)
+
+    @query_budget(1)
+    def test_task_list(self):
+        response = self.client.get(reverse('task-list'))
+        self.assertEqual(len(response.data["results"]), 20)
+
+    @query_budget(1)
+    def test_task_stream(self):
+        response = self.client.get(reverse('task-list'), {'stream': 'true'})
+        self.assertEqual(len(json.loads(b"".join(response.streaming_content))), 20)
+
+    @query_budget(1)
+    def test_task_detail(self):
+        response = self.client.get(reverse('task-detail', args=[self.tasks[0].pk]))
+        self.assertEqual(response.data["owner"], self.user.username)
+
+
+class TaskSparseFieldsTest(TodoTestCase):
+    def test_list_and_detail_return_requested_fields(self):
+        tasks = self.create_tasks(2)
+        response = self.client.get(reverse('task-list'), {'fields': 'id,completed'})
+        self.assertEqual(response.data["results"], [{"id": task.pk, "completed": False} for task in tasks])
+
+        response = self.client.get(reverse('task-detail', args=[tasks[0].pk]), {'fields': 'title'})
+        self.assertEqual(response.data, {"title": "Task 0"})
+        self.assertIn("ETag", response)
+
+    def test_etag_depends_on_requested_fields(self):
+        tasks = self.create_tasks(1)
+        for url in (reverse('task-list'), reverse('task-detail', args=[tasks[0].pk])):
+            with self.subTest(url=url):
+                etag = self.client.get(url, {'fields': 'id'})["ETag"]
+                response = self.client.get(url, {'fields': 'id'}, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+                response = self.client.get(url, {'fields': 'title'}, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_stream_returns_requested_fields(self):
+        tasks = self.create_tasks(2)
+        response = self.client.get(reverse('task-list'), {'stream': 'true', 'fields': 'id'})
+        self.assertEqual(json.loads(b"".join(response.streaming_content)), [{"id": task.pk} for task in tasks])
+
+
+class TaskBulkTest(TodoTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tasks = self.create_tasks(3)
+        self.other_task = self.create_tasks(1, owner=User.objects.create(username='other'))[0]
+
+    def test_bulk_create(self):
+        items = [{"title": f"New {i}", "description": "description"} for i in range(3)]
+        items.insert(1, {"description": "missing title"})
+
+        with self.assertNumQueries(1):
+            response = self.client.post(reverse('task-bulk'), items, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([result["index"] for result in response.data], [0, 1, 2, 3])
+        self.assertIn("title", response.data[1]["errors"])
+        created = Task.objects.filter(pk__in=[result["id"] for result in response.data if "id" in result])
+        self.assertEqual(sorted(task.title for task in created), ["New 0", "New 1", "New 2"])
+        self.assertTrue(all(task.owner_id == self.user.pk for task in created))
+
+    def test_bulk_complete(self):
+        ids = [self.tasks[0].pk, self.tasks[2].pk, self.other_task.pk]
+        with query_budget(4):
+            response = self.client.patch(
+                reverse('task-bulk'), {"ids": ids, "changes": {"completed": True}}, format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([result["status"] for result in response.data], ["updated", "updated", "not_found"])
+        self.assertEqual(
+            list(Task.objects.filter(completed=True).values_list("pk", flat=True)), [self.tasks[0].pk, self.tasks[2].pk]
+        )
+        self.tasks[0].refresh_from_db()
+        self.assertGreater(self.tasks[0].updated_at, self.tasks[1].updated_at)
+
+    def test_bulk_update_validates_changes(self):
+        response = self.client.patch(
+            reverse('task-bulk'), {"ids": [self.tasks[0].pk], "changes": {"title": ""}}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("title", response.data["changes"])
+
+    def test_bulk_update_rejects_unknown_or_empty_changes(self):
+        updated_at = Task.objects.get(pk=self.tasks[0].pk).updated_at
+        for changes in [{}, {"bogus": 1}, {"owner": "other"}]:
+            with self.subTest(changes=changes):
+                response = self.client.patch(
+                    reverse('task-bulk'), {"ids": [self.tasks[0].pk], "changes": changes}, format='json'
+                )
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Task.objects.get(pk=self.tasks[0].pk).updated_at, updated_at)
+
+    def test_bulk_delete(self):
+        ids = [self.tasks[0].pk, self.other_task.pk]
+        response = self.client.delete(reverse('task-bulk'), {"ids": ids}, format='json')
+        self.assertEqual([result["status"] for result in response.data], ["deleted", "not_found"])
+        self.assertFalse(Task.objects.filter(pk=self.tasks[0].pk).exists())
+        self.assertTrue(Task.objects.filter(pk=self.other_task.pk).exists())
+
+    def test_batch_size_is_limited(self):
+        response = self.client.delete(reverse('task-bulk'), {"ids": list(range(1, 502))}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@skipIf(renderers.msgpack is None, "msgpack is not installed")
+class TaskMessagePackTest(TodoTestCase):
+    def test_list_in_message_pack(self):
+        task = self.create_tasks(1)[0]
+        response = self.client.get(reverse('task-list'), HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        data = renderers.msgpack.unpackb(response.content, timestamp=3)
+        self.assertEqual(data['results'][0]['id'], task.pk)
+        self.assertEqual(data['results'][0]['updated_at'], task.updated_at)
+
+    def test_etag_depends_on_media_type(self):
+        task = self.create_tasks(1)[0]
+        for url in (reverse('task-list'), reverse('task-detail', args=[task.pk])):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertIn("Accept", response["Vary"])
+                response = self.client.get(url, HTTP_ACCEPT='application/msgpack', HTTP_IF_NONE_MATCH=response["ETag"])
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(response['Content-Type'], 'application/msgpack')
+
+    def test_bulk_create_from_message_pack(self):
+        body = renderers.msgpack.packb([{"title": "Packed", "description": "description"}])
+        response = self.client.post(
+            reverse('task-bulk'), body, content_type='application/msgpack', HTTP_ACCEPT='application/msgpack',
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        [result] = renderers.msgpack.unpackb(response.content)
+        self.assertEqual(Task.objects.get(pk=result["id"]).title, "Packed")
+
+
+class TaskSyncTest(TodoTestCase):
+    def sync(self, since=None):
+        response = self.client.get(reverse('task-sync'), {} if since is None else {'since': since})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+    def test_first_sync_returns_every_task(self):
+        tasks = self.create_tasks(3)
+        self.create_tasks(1, owner=User.objects.create(username='other'))
+
+        data = self.sync()
+        self.assertEqual([task["id"] for task in data["tasks"]], [task.pk for task in tasks])
+        self.assertEqual(data["deleted"], [])
+        self.assertTrue(data["watermark"])
+
+    def test_sync_returns_changes_and_deletions_since_watermark(self):
+        tasks = self.create_tasks(4)
+        Task.objects.update(updated_at=timezone.now() - timedelta(minutes=1))
+        watermark = self.sync()["watermark"]
+
+        self.client.put(reverse('task-detail', args=[tasks[0].pk]), {"completed": True}, format='json')
+        self.client.delete(reverse('task-detail', args=[tasks[1].pk]))
+        self.client.delete(reverse('task-bulk'), {"ids": [tasks[2].pk]}, format='json')
+        new_task = self.create_tasks(1)[0]
+
+        with self.assertNumQueries(2):
+            data = self.sync(watermark)
+        self.assertEqual([task["id"] for task in data["tasks"]], [tasks[0].pk, new_task.pk])
+        self.assertTrue(data["tasks"][0]["completed"])
+        self.assertEqual(data["deleted"], [tasks[1].pk, tasks[2].pk])
+
+    def test_deletions_of_other_users_are_not_reported(self):
+        other = User.objects.create(username='other')
+        TaskTombstone.objects.create(owner=other, task_id=1)
+        self.assertEqual(self.sync(self.user.date_joined.isoformat())["deleted"], [])
+
+    def test_sync_older_than_tombstone_retention_returns_every_task(self):
+        tasks = self.create_tasks(2)
+        since = timezone.now() - settings.TASK_TOMBSTONE_RETENTION - timedelta(minutes=1)
+        TaskTombstone.objects.create(owner=self.user, task_id=99, deleted_at=since)
+
+        data = self.sync(since.isoformat())
+        self.assertTrue(data["full"])
+        self.assertEqual([task["id"] for task in data["tasks"]], [task.pk for task in tasks])
+        self.assertEqual(data["deleted"], [])
+        self.assertFalse(self.sync(data["watermark"])["full"])
+
+    def test_prune_deletes_tombstones_past_retention(self):
+        expired = timezone.now() - settings.TASK_TOMBSTONE_RETENTION - timedelta(minutes=1)
+        TaskTombstone.objects.create(owner=self.user, task_id=1, deleted_at=expired)
+        kept = TaskTombstone.objects.create(owner=self.user, task_id=2)
+
+        out = StringIO()
+        call_command('prune_task_tombstones', stdout=out)
+        self.assertIn("Deleted 1 expired task tombstones.", out.getvalue())
+        self.assertQuerySetEqual(TaskTombstone.objects.all(), [kept])
+
+    def test_invalid_watermark(self):
+        response = self.client.get(reverse('task-sync'), {'since': 'yesterday'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class AsyncTaskViewsTest(TodoTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tasks = self.create_tasks(3)
+        self.headers = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+
+    async def test_list_only_returns_own_tasks(self):
+        other = await User.objects.acreate(username='other')
+        await Task.objects.acreate(owner=other, title="Not mine")
+
+        response = await self.async_client.get(reverse('async-task-list'), headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([task["id"] for task in response.json()["results"]], [task.pk for task in self.tasks])
+        self.assertEqual(response.json()["results"][0]["owner"], self.user.username)
+
+    async def test_detail_update_and_delete(self):
+        url = reverse('async-task-detail', args=[self.tasks[0].pk])
+        response = await self.async_client.put(
+            url, {"completed": True}, content_type='application/json', headers=self.headers,
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.json()["completed"])
+
+        response = await self.async_client.delete(url, headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertTrue(await TaskTombstone.objects.filter(task_id=self.tasks[0].pk).aexists())
+        response = await self.async_client.get(url, headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_writes_with_bearer_token_skip_csrf_checks(self):
+        client = APIClient(enforce_csrf_checks=True, headers=self.headers)
+        response = client.post(reverse('async-task-list'), {"title": "Task", "description": "description"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response = client.put(reverse('async-task-detail', args=[self.tasks[0].pk]), {"completed": True}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    async def test_anonymous_requests_are_rejected(self):
+        response = await self.async_client.get(reverse('async-task-list'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_invalid_update(self):
+        url = reverse('async-task-detail', args=[self.tasks[0].pk])
+        response = await self.async_client.put(url, {"title": ""}, content_type='application/json', headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("title", response.json())
+
+
+class TaskIndexTest(IndexUsageAssertionsMixin, TodoTestCase):
+    def setUp(self):
+        super().setUp()
+        for i in range(20):
+            owner = User.objects.create(username=f'user{i}')
+            Task.objects.bulk_create(
+                Task(owner=owner, title=f"Task {j}", description="description", completed=j % 4 == 0)
+                for j in range(20)
+            )
+
+    def test_task_list_uses_owner_index(self):
+        tasks = Task.objects.filter(owner=self.user).order_by(*TaskPagination.ordering)[:51]
+        self.assertUsesIndex(tasks, "todo_task_owner_updated_idx")
+
+    def test_open_task_list_uses_partial_index(self):
+        tasks = Task.objects.filter(owner=self.user, completed=False).order_by(*TaskPagination.ordering)[:51]
+        self.assertUsesIndex(tasks, "todo_task_open_owner_idx")
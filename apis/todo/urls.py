@@ -1,7 +1,11 @@
 from django.urls import path
-from . import views
+from . import async_views, views
 
 urlpatterns = [
     path("task-list/", views.TaskListView.as_view(), name="task-list"),
     path("task-list/<int:pk>/", views.TaskDetailView.as_view(), name="task-detail"),
+    path("task-list/bulk/", views.TaskBulkView.as_view(), name="task-bulk"),
+    path("task-list/sync/", views.TaskSyncView.as_view(), name="task-sync"),
+    path("async/task-list/", async_views.AsyncTaskListView.as_view(), name="async-task-list"),
+    path("async/task-list/<int:pk>/", async_views.AsyncTaskDetailView.as_view(), name="async-task-detail"),
 ]
@@ -1,16 +1,32 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from rest_framework import status
+from rest_framework.exceptions import ParseError, ValidationError
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
-from .models import Task
-from .serializers import TaskSerializer
+from apis.core.conditional import (
+    claim, evaluate_preconditions, has_preconditions, object_validators, page_validators, precondition_failed,
+    set_validators,
+)
+from apis.core.readers import ValuesReader
+from apis.core.streaming import stream_list_response, wants_stream
+from apis.core.views import sparse_queryset
+from .models import Task, TaskTombstone
+from .pagination import TaskPagination
+from .serializers import TaskBulkIdsSerializer, TaskBulkUpdateSerializer, TaskSerializer
+
+task_reader = ValuesReader(TaskSerializer)
 
 
 class TaskListView(APIView):
     """
     View to list all tasks for the authenticated user and create a new task.
 
-    - GET: Returns a list of tasks that belong to the authenticated user.
+    - GET: Returns a page of tasks that belong to the authenticated user.
     - POST: Allows the authenticated user to create a new task.
 
     Permissions:
@@ -20,16 +36,42 @@ class TaskListView(APIView):
 
     def get(self, request, format=None):
         """
-        Retrieve all tasks belonging to the authenticated user.
+        Retrieve the tasks belonging to the authenticated user.
+
+        Returns a page of tasks ordered by the 'updated_at' field, with `next` and
+        `previous` cursor links to the neighbouring pages.
 
-        Returns a list of tasks ordered by the 'updated_at' field.
+        Query parameters:
+        - completed: Optional. `true` or `false` to only return completed or open tasks.
+        - stream: Optional. `true` to stream every task as one unpaginated JSON array.
+        - fields: Optional. Comma-separated fields to return, e.g. `id,title,completed`.
+
+        The response carries an `ETag` and `Last-Modified` derived from the IDs and
+        `updated_at` of the tasks on the page.
 
         Responses:
-        - 200: List of tasks serialized in JSON format.
+        - 200: Page of tasks serialized in JSON format.
+        - 304: Nothing changed since the `If-None-Match`/`If-Modified-Since` validators.
         """
-        tasks = Task.objects.all().filter(owner=request.user).order_by('updated_at')
-        ser_data = TaskSerializer(tasks, many=True)
-        return Response(ser_data.data)
+        tasks = Task.objects.all().filter(owner_id=request.user.pk)
+        completed = request.query_params.get('completed')
+        if completed is not None:
+            tasks = tasks.filter(completed=completed.lower() in ('true', '1'))
+        if wants_stream(request):
+            serializer = TaskSerializer(context={'request': request})
+            tasks = sparse_queryset(tasks.select_related('owner'), serializer)
+            return stream_list_response(tasks.order_by(*TaskPagination.ordering), serializer)
+
+        paginator = TaskPagination()
+        page = paginator.paginate_queryset(task_reader.values(tasks, request, paginator.ordering), request, view=self)
+        validators = page_validators(
+            Task, page, request, request.user.pk, request.get_full_path(), paginator.has_next, paginator.has_previous,
+        )
+        if has_preconditions(request):
+            response = evaluate_preconditions(request, validators)
+            if response is not None:
+                return response
+        return set_validators(paginator.get_paginated_response(task_reader.render(page, request)), validators)
 
     def post(self, request, format=None):
         """
@@ -46,7 +88,7 @@ class TaskListView(APIView):
         """
         ser_data = TaskSerializer(data=request.data)
         if ser_data.is_valid():
-            ser_data.save(owner=request.user)
+            ser_data.save(owner_id=request.user.pk)
             return Response(ser_data.data, status=status.HTTP_201_CREATED)
         return Response(ser_data.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -64,28 +106,40 @@ class TaskDetailView(APIView):
     """
     permission_classes = (IsAuthenticated,)
 
-    def get_object(self, pk, user):
+    def get_object(self, pk, user, request=None):
         """
         Helper method to retrieve a task by its primary key and owner.
 
+        With a GET `request` only the columns its `?fields=` asks for are loaded.
+
         Raises:
         - Http404: If the task does not exist or does not belong to the user.
         """
-        return Task.objects.get(pk=pk, owner=user)
+        tasks = Task.objects.select_related('owner')
+        if request is not None:
+            tasks = sparse_queryset(tasks, TaskSerializer(context={'request': request}), extra=('updated_at',))
+        return tasks.get(pk=pk, owner_id=user.pk)
 
     def get(self, request, pk, format=None):
         """
         Retrieve details of a specific task by its primary key (pk).
 
-        Returns the task if it belongs to the authenticated user.
+        Returns the task if it belongs to the authenticated user, with an `ETag` and
+        `Last-Modified` derived from its `updated_at`.
 
         Responses:
         - 200: Task details serialized in JSON format.
+        - 304: The task did not change since the `If-None-Match`/`If-Modified-Since` validators.
         - 404: Task not found.
         """
-        task = self.get_object(pk, request.user)
-        ser_data = TaskSerializer(task)
-        return Response(ser_data.data)
+        task = self.get_object(pk, request.user, request)
+        validators = object_validators(task, request)
+        if has_preconditions(request):
+            response = evaluate_preconditions(request, validators)
+            if response is not None:
+                return response
+        ser_data = TaskSerializer(task, context={'request': request})
+        return set_validators(Response(ser_data.data), validators)
 
     def put(self, request, pk, format=None):
         """
@@ -96,17 +150,30 @@ class TaskDetailView(APIView):
         Request body:
         - Partial or full task data in JSON format.
 
+        Send the task's `ETag` in `If-Match` to only update it if nobody changed it since.
+
         Responses:
         - 200: Task updated successfully.
         - 400: Invalid data, task update failed.
         - 404: Task not found.
+        - 412: The task changed since the `If-Match`/`If-Unmodified-Since` validators.
         """
         task = self.get_object(pk, request.user)
+        conditional = has_preconditions(request)
+        if conditional:
+            response = evaluate_preconditions(request, object_validators(task, request))
+            if response is not None:
+                return response
         ser_data = TaskSerializer(task, data=request.data, partial=True)
-        if ser_data.is_valid():
+        if not ser_data.is_valid():
+            return Response(ser_data.errors, status=status.HTTP_400_BAD_REQUEST)
+        with transaction.atomic():
+            # Compare and write in one transaction, so a concurrent update made
+            # since the preconditions were evaluated is not overwritten.
+            if conditional and not claim(task):
+                return precondition_failed()
             ser_data.save()
-            return Response(ser_data.data, status=status.HTTP_200_OK)
-        return Response(ser_data.errors, status=status.HTTP_400_BAD_REQUEST)
+        return set_validators(Response(ser_data.data, status=status.HTTP_200_OK), object_validators(task, request))
 
     def delete(self, request, pk, format=None):
         """
@@ -117,7 +184,140 @@ class TaskDetailView(APIView):
         Responses:
         - 204: Task deleted successfully.
         - 404: Task not found.
+
+        A tombstone is kept so that `TaskSyncView` reports the deletion.
         """
         task = self.get_object(pk, request.user)
-        task.delete()
+        with transaction.atomic():
+            task.delete()
+            TaskTombstone.objects.create(owner_id=request.user.pk, task_id=pk)
         return Response({"detail": f"{task.title} has been deleted"}, status=status.HTTP_204_NO_CONTENT)
+
+
+class TaskBulkView(APIView):
+    """
+    View to create, update or delete many tasks of the authenticated user at once.
+
+    - POST: Creates a JSON array of tasks in one insert. Returns one result per item,
+      in order: `{"index": 0, "id": 1}` or `{"index": 0, "errors": {...}}`.
+    - PATCH: Applies `changes` to the tasks listed in `ids`, e.g.
+      `{"ids": [1, 2], "changes": {"completed": true}}`, in one update.
+    - DELETE: Deletes the tasks listed in `ids`, e.g. `{"ids": [1, 2]}`, in one delete.
+
+    PATCH and DELETE return `{"id": 1, "status": "updated"}` (or `"deleted"`) for each
+    ID, or `"not_found"` when the task does not exist or belongs to another user.
+    At most `max_batch` tasks are handled per request.
+
+    Permissions:
+    - Requires the user to be authenticated (IsAuthenticated).
+    """
+    permission_classes = (IsAuthenticated,)
+    max_batch = 500
+
+    def post(self, request, format=None):
+        items = request.data
+        if not isinstance(items, list):
+            raise ParseError("Expected a list of tasks.")
+        if len(items) > self.max_batch:
+            raise ValidationError(f"Expected at most {self.max_batch} tasks.")
+
+        results, tasks = [], []
+        for index, item in enumerate(items):
+            ser_data = TaskSerializer(data=item)
+            if ser_data.is_valid():
+                tasks.append((index, Task(owner_id=request.user.pk, **ser_data.validated_data)))
+            else:
+                results.append({"index": index, "errors": ser_data.errors})
+
+        Task.objects.bulk_create(task for _, task in tasks)
+        results.extend({"index": index, "id": task.pk} for index, task in tasks)
+        results.sort(key=lambda result: result["index"])
+        return Response(results, status=status.HTTP_201_CREATED if tasks else status.HTTP_400_BAD_REQUEST)
+
+    def patch(self, request, format=None):
+        ser_data = TaskBulkUpdateSerializer(data=request.data)
+        ser_data.is_valid(raise_exception=True)
+        ids = ser_data.validated_data["ids"]
+
+        with transaction.atomic():
+            tasks = self.get_tasks(request, ids)
+            found = set(tasks.select_for_update().values_list("pk", flat=True))
+            tasks.update(updated_at=timezone.now(), **ser_data.validated_data["changes"])
+        return Response(self.results(ids, found, "updated"))
+
+    def delete(self, request, format=None):
+        ser_data = TaskBulkIdsSerializer(data=request.data)
+        ser_data.is_valid(raise_exception=True)
+        ids = ser_data.validated_data["ids"]
+
+        with transaction.atomic():
+            tasks = self.get_tasks(request, ids)
+            found = set(tasks.select_for_update().values_list("pk", flat=True))
+            tasks.delete()
+            TaskTombstone.objects.bulk_create(TaskTombstone(owner_id=request.user.pk, task_id=pk) for pk in found)
+        return Response(self.results(ids, found, "deleted"))
+
+    def get_tasks(self, request, ids):
+        return Task.objects.filter(owner_id=request.user.pk, pk__in=ids)
+
+    def results(self, ids, found, done):
+        return [{"id": pk, "status": done if pk in found else "not_found"} for pk in dict.fromkeys(ids)]
+
+
+class TaskSyncView(APIView):
+    """
+    View to fetch the changes to the authenticated user's tasks since a previous sync.
+
+    - GET: Returns the tasks created or updated and the IDs of the tasks deleted since
+      the `since` watermark, plus the `watermark` to send on the next sync:
+      `{"tasks": [...], "deleted": [1, 2], "watermark": "2024-01-01T00:00:00Z", "full": false}`.
+      Without `since` every task is returned, for the first sync. The same happens
+      when `since` is older than `TASK_TOMBSTONE_RETENTION`, as the deletions since
+      then may have been pruned. `full` is true in both cases, and clients then
+      replace their tasks with the returned ones.
+
+    The watermark lags the current time by `overlap`, so writes that were still being
+    committed during a sync are returned again on the next one. Clients apply tasks
+    by ID, so seeing a task twice is harmless.
+
+    Permissions:
+    - Requires the user to be authenticated (IsAuthenticated).
+    """
+    permission_classes = (IsAuthenticated,)
+    overlap = timedelta(seconds=5)
+
+    def get(self, request, format=None):
+        """
+        Responses:
+        - 200: Changes since the watermark.
+        - 400: `since` is not an ISO 8601 date and time.
+        """
+        since = request.query_params.get('since')
+        watermark = timezone.now() - self.overlap
+        tasks = Task.objects.filter(owner_id=request.user.pk)
+        deleted = []
+        if since is not None:
+            since = self.parse_since(since)
+            if since < TaskTombstone.horizon():
+                since = None
+        if since is not None:
+            tasks = tasks.filter(updated_at__gte=since)
+            deleted = list(dict.fromkeys(
+                TaskTombstone.objects.filter(owner_id=request.user.pk, deleted_at__gte=since)
+                .order_by('deleted_at').values_list('task_id', flat=True)
+            ))
+
+        tasks = task_reader.values(tasks.order_by(*TaskPagination.ordering), request)
+        tasks = task_reader.render(tasks, request)
+        return Response({"tasks": tasks, "deleted": deleted, "watermark": watermark, "full": since is None})
+
+    def parse_since(self, value):
+        try:
+            since = parse_datetime(value)
+        except ValueError:
+            since = None
+        if since is None:
+            raise ValidationError({"since": "Expected an ISO 8601 date and time."})
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        return since
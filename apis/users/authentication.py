@@ -0,0 +1,78 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+
+
+def active_cache_key(user_id):
+    return f"user-active:{user_id}"
+
+
+def is_user_active(user_id):
+    """
+    Return whether the user exists and is active, cached for `USER_ACTIVE_CACHE_TTL` seconds.
+
+    Saving a user drops its entry (see `apis.users.signals`), so deactivations are
+    seen at once by this process and by every worker sharing the cache, and by
+    other workers within the TTL.
+    """
+    cache = caches[settings.USER_ACTIVE_CACHE_ALIAS]
+    key = active_cache_key(user_id)
+    is_active = cache.get(key)
+    if is_active is None:
+        is_active = User.objects.filter(pk=user_id, is_active=True).exists()
+        cache.set(key, is_active, settings.USER_ACTIVE_CACHE_TTL)
+    return is_active
+
+
+async def ais_user_active(user_id):
+    """
+    Async variant of `is_user_active`.
+    """
+    cache = caches[settings.USER_ACTIVE_CACHE_ALIAS]
+    key = active_cache_key(user_id)
+    is_active = await cache.aget(key)
+    if is_active is None:
+        is_active = await User.objects.filter(pk=user_id, is_active=True).aexists()
+        await cache.aset(key, is_active, settings.USER_ACTIVE_CACHE_TTL)
+    return is_active
+
+
+def forget_user_active(user_id):
+    caches[settings.USER_ACTIVE_CACHE_ALIAS].delete(active_cache_key(user_id))
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    JWT authentication that builds the user from the token claims instead of loading the `User` row.
+
+    `request.user` is a `TokenUser` carrying the `user_id` and `username` claims.
+    Whether the user is still active is checked against a small TTL cache, so most
+    requests authenticate without a database query. Views that change the user
+    itself need the model instance and keep `JWTAuthentication`.
+    """
+
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        if not is_user_active(user.pk):
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
+
+    async def aauthenticate(self, request):
+        """
+        Async variant of `authenticate` for async views.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        user = super().get_user(validated_token)
+        if not await ais_user_active(user.pk):
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user, validated_token
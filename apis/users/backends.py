@@ -0,0 +1,29 @@
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import User
+
+from . import hashers
+
+
+class PooledModelBackend(ModelBackend):
+    """
+    `ModelBackend` that checks passwords in the hashing pool of `apis.users.hashers`.
+
+    Logins wait for a pool process instead of hashing on the request thread, so a
+    burst of logins keeps at most `PASSWORD_HASH_WORKERS` CPUs busy per server
+    worker process.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = User._default_manager.get_by_natural_key(username)
+        except User.DoesNotExist:
+            # Hash once anyway, so unknown usernames take as long as known ones.
+            hashers.make_password(password)
+            return None
+        if hashers.check_password(user, password) and self.user_can_authenticate(user):
+            return user
+        return None
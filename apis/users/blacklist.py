@@ -0,0 +1,133 @@
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import RevokedToken
+
+
+class BloomFilter:
+    """
+    Set membership with false positives but no false negatives.
+
+    `capacity` items fit with a false positive rate of about `error_rate`.
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        for position in self.positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.positions(item))
+
+
+class TokenBlacklist:
+    """
+    Revoked refresh tokens in `RevokedToken`, fronted by a per-process Bloom filter.
+
+    Checking a token that was never revoked, which is nearly every check, answers
+    from the filter without a query. Tokens the filter may contain are looked up
+    in the table. The filter is rebuilt from the day buckets that have not expired
+    every `REBUILD_INTERVAL` seconds, to drop expired tokens and pick up the tokens
+    other workers revoked. Until then such a token is still rejected when it is
+    rotated, since revoking it again violates the unique `jti`.
+
+    Only the first build blocks. A stale filter is rebuilt by the one request that
+    finds it stale, while the others keep using the old one. Tokens this process
+    revokes are added to the filter right away, including during a rebuild.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.rebuild_lock = threading.Lock()
+        self.filter = None
+        self.built_at = 0.0
+        # The tokens revoked while a rebuild runs, to add to the new filter.
+        self.revoked_during_rebuild = None
+
+    @property
+    def options(self):
+        return {"BLOOM_CAPACITY": 100_000, "BLOOM_ERROR_RATE": 0.001, "REBUILD_INTERVAL": 600,
+                **getattr(settings, "TOKEN_BLACKLIST", {})}
+
+    def get_filter(self):
+        bloom = self.filter
+        if bloom is not None and time.monotonic() - self.built_at <= self.options["REBUILD_INTERVAL"]:
+            return bloom
+        if self.rebuild_lock.acquire(blocking=bloom is None):
+            try:
+                if self.filter is bloom:
+                    self.rebuild()
+            finally:
+                self.rebuild_lock.release()
+        return self.filter
+
+    def rebuild(self):
+        with self.lock:
+            self.revoked_during_rebuild = []
+        try:
+            bloom = self.build()
+        except BaseException:
+            with self.lock:
+                self.revoked_during_rebuild = None
+            raise
+        with self.lock:
+            for jti in self.revoked_during_rebuild:
+                bloom.add(jti)
+            self.filter, self.built_at, self.revoked_during_rebuild = bloom, time.monotonic(), None
+
+    def build(self):
+        jtis = RevokedToken.objects.filter(expires_on__gte=timezone.now().date()).values_list("jti", flat=True)
+        count = jtis.count()
+        bloom = BloomFilter(max(self.options["BLOOM_CAPACITY"], 2 * count), self.options["BLOOM_ERROR_RATE"])
+        for jti in jtis.iterator(chunk_size=10_000):
+            bloom.add(jti)
+        return bloom
+
+    def is_revoked(self, jti):
+        if jti not in self.get_filter():
+            return False
+        return RevokedToken.objects.filter(jti=jti).exists()
+
+    def revoke(self, jti, expires_at):
+        """
+        Revoke the token `jti`. Return False when it was already revoked.
+        """
+        try:
+            with transaction.atomic():
+                RevokedToken.objects.create(jti=jti, expires_at=expires_at, expires_on=expires_at.date())
+        except IntegrityError:
+            return False
+        with self.lock:
+            if self.filter is not None:
+                self.filter.add(jti)
+            if self.revoked_during_rebuild is not None:
+                self.revoked_during_rebuild.append(jti)
+        return True
+
+    def compact(self, now=None):
+        """
+        Delete the tokens of every day bucket that has fully expired and return how many.
+        """
+        today = (now or timezone.now()).date()
+        deleted, _ = RevokedToken.objects.filter(expires_on__lt=today).delete()
+        with self.lock:
+            self.built_at = 0.0
+        return deleted
+
+
+token_blacklist = TokenBlacklist()
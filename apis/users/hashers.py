@@ -0,0 +1,155 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import django
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.contrib.auth.hashers import ScryptPasswordHasher
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    """
+    `ScryptPasswordHasher` with the cost parameters of `PASSWORD_SCRYPT_PARAMS`.
+
+    Hashes keep the `scrypt$` format, so hashes made with other parameters are
+    still checked and are rehashed with the configured ones on the next login.
+    Run `bench_hashers` to pick parameters for the target hashing time.
+    """
+
+    def __init__(self):
+        params = getattr(settings, "PASSWORD_SCRYPT_PARAMS", {})
+        self.work_factor = params.get("work_factor", self.work_factor)
+        self.block_size = params.get("block_size", self.block_size)
+        self.parallelism = params.get("parallelism", self.parallelism)
+        # scrypt needs 128 * block_size * work_factor bytes, more than OpenSSL's
+        # default limit of 32 MiB from a work factor of 2**15.
+        self.maxmem = params.get("maxmem", 2 * 128 * self.block_size * self.work_factor)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    Return the process pool hashing passwords, or None when `PASSWORD_HASH_WORKERS` is 0.
+
+    The pool is started on first use with `PASSWORD_HASH_WORKERS` processes, so at
+    most that many hashes of this process run at once however many requests wait
+    for one. Every server worker process starts its own pool: a host runs up to
+    server workers × `PASSWORD_HASH_WORKERS` hashes at once.
+    """
+    global _pool
+    if not settings.PASSWORD_HASH_WORKERS:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=django.setup,
+            )
+        return _pool
+
+
+def _make_password(password):
+    return hashers.make_password(password)
+
+
+def _check_password(password, encoded):
+    return hashers.check_password(password, encoded)
+
+
+def must_update(encoded):
+    """
+    Return whether `encoded` should be rehashed with the preferred hasher, like
+    `django.contrib.auth.hashers.check_password` decides before calling its setter.
+    """
+    preferred = hashers.get_hasher("default")
+    try:
+        hasher = hashers.identify_hasher(encoded)
+    except ValueError:
+        return False
+    return hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
+
+
+def discard_pool(pool):
+    """
+    Drop `pool` after one of its processes died, e.g. killed for running out of
+    memory, so that `get_pool` starts a new one.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run(func, *args):
+    pool = get_pool()
+    if pool is None:
+        return func(*args)
+    try:
+        return pool.submit(func, *args).result()
+    except BrokenProcessPool:
+        discard_pool(pool)
+        return get_pool().submit(func, *args).result()
+
+
+async def arun(func, *args):
+    pool = get_pool()
+    if pool is None:
+        return func(*args)
+    try:
+        return await asyncio.wrap_future(pool.submit(func, *args))
+    except BrokenProcessPool:
+        discard_pool(pool)
+        return await asyncio.wrap_future(get_pool().submit(func, *args))
+
+
+def make_password(password):
+    """
+    Hash `password` with the preferred hasher in the hashing pool.
+    """
+    return run(_make_password, password)
+
+
+async def amake_password(password):
+    return await arun(_make_password, password)
+
+
+def set_password(user, password):
+    """
+    Hash `password` in the hashing pool and set it on `user` without saving, like
+    `User.set_password`: saving the user then notifies the password validators.
+    """
+    user.password = make_password(password)
+    user._password = password
+
+
+def check_password(user, password, rehash=True):
+    """
+    Check `password` against the hash of `user` in the hashing pool.
+
+    Like `User.check_password`, a correct password stored with an outdated hasher
+    or outdated parameters is rehashed with the preferred hasher and saved, unless
+    `rehash` is false.
+    """
+    if not run(_check_password, password, user.password):
+        return False
+    if rehash and must_update(user.password):
+        user.password = make_password(password)
+        user.save(update_fields=["password"])
+    return True
+
+
+async def acheck_password(user, password, rehash=True):
+    if not await arun(_check_password, password, user.password):
+        return False
+    if rehash and must_update(user.password):
+        user.password = await amake_password(password)
+        await user.asave(update_fields=["password"])
+    return True
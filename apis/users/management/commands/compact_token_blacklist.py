@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apis.users.blacklist import token_blacklist
+
+
+class Command(BaseCommand):
+    help = "Delete revoked refresh tokens whose expiry day has passed. Run it daily, e.g. from cron."
+
+    def handle(self, *args, **options):
+        deleted = token_blacklist.compact()
+        self.stdout.write(f"Deleted {deleted} expired revoked tokens.")
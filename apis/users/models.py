@@ -1 +1,17 @@
 from django.db import models
+
+
+class RevokedToken(models.Model):
+    """
+    A refresh token that may no longer be used, identified by its `jti` claim.
+
+    Rows are bucketed by the day their token expires. Once a day has passed every
+    token of its bucket has expired on its own, so `compact_token_blacklist`
+    deletes the whole bucket with one range delete on `expires_on`.
+    """
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField()
+    expires_on = models.DateField(db_index=True)
+
+    def __str__(self):
+        return f"Token {self.jti} revoked until {self.expires_at}"
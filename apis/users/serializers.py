@@ -1,6 +1,10 @@
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
 from django.contrib.auth.models import User
 
+from . import hashers
+from .tokens import BlacklistRefreshToken
+
 
 class UserSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
@@ -10,10 +14,9 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ["id", "username", "password"]
 
     def create(self, validated_data):
-        user = User.objects.create_user(
-            username=validated_data['username'],
-            password=validated_data['password'],
-        )
+        user = User(username=User.normalize_username(validated_data['username']))
+        hashers.set_password(user, validated_data['password'])
+        user.save()
         return user
 
     def update(self, instance, validated_data):
@@ -39,7 +42,8 @@ class PasswordChangeSerializer(serializers.Serializer):
 
     def validate_old_password(self, value):
         user = self.context["request"].user
-        if not user.check_password(value):
+        # The password is about to be replaced, so don't rehash it.
+        if not hashers.check_password(user, value, rehash=False):
             raise serializers.ValidationError("Old password is incorrect")
         return value
     def validate(self, data):
@@ -49,8 +53,26 @@ class PasswordChangeSerializer(serializers.Serializer):
 
     def save(self):
         user = self.context["request"].user
-        user.set_password(self.validated_data['new_password'])
+        hashers.set_password(user, self.validated_data['new_password'])
         user.save()
         return user
 
 
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Adds the `username` claim read by `StatelessJWTAuthentication` to issued tokens.
+    """
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token["username"] = user.username
+        return token
+
+
+class BlacklistTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refreshes with `BlacklistRefreshToken`, so rotated refresh tokens are revoked
+    in `apis.users.blacklist` and cannot be used again.
+    """
+    token_class = BlacklistRefreshToken
@@ -0,0 +1,10 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import forget_user_active
+
+
+@receiver([post_save, post_delete], sender=User)
+def forget_cached_user_state(sender, instance, **kwargs):
+    forget_user_active(instance.pk)
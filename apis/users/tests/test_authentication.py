@@ -0,0 +1,45 @@
+from django.core.cache import caches
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apis.blog.models import Post
+from .test_views import JWTTestCase
+
+
+class StatelessJWTAuthenticationTest(JWTTestCase):
+    def setUp(self):
+        caches[settings.USER_ACTIVE_CACHE_ALIAS].clear()
+        super().setUp()
+
+    def test_token_carries_username_claim(self):
+        self.assertEqual(AccessToken(self.token)["username"], "testuser")
+
+    def test_authenticated_request_does_not_load_user(self):
+        self.authenticate()
+        url = reverse('task-list')
+        self.client.get(url)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse([query for query in context.captured_queries if 'FROM "auth_user"' in query["sql"]])
+
+    def test_token_user_can_create_posts(self):
+        self.authenticate()
+        response = self.client.post(reverse('post-list-create'), {"title": "Title", "content": "Content"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["author"], "testuser")
+        self.assertEqual(Post.objects.get().author, self.user)
+
+    def test_deactivated_user_is_rejected(self):
+        self.authenticate()
+        self.assertEqual(self.client.get(reverse('task-list')).status_code, status.HTTP_200_OK)
+
+        self.client.post(reverse('users:deactivate'))
+
+        response = self.client.get(reverse('task-list'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
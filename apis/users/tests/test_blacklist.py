@@ -0,0 +1,95 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apis.users.blacklist import BloomFilter, token_blacklist
+from apis.users.models import RevokedToken
+
+
+class BloomFilterTest(SimpleTestCase):
+    def test_has_no_false_negatives_and_few_false_positives(self):
+        bloom = BloomFilter(1000, 0.01)
+        for i in range(1000):
+            bloom.add(f"token-{i}")
+        self.assertTrue(all(f"token-{i}" in bloom for i in range(1000)))
+        false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+class TokenRefreshTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        self.url = reverse('users:token_refresh')
+
+    def test_rotated_refresh_token_cannot_be_reused(self):
+        refresh = str(RefreshToken.for_user(self.user))
+        token_blacklist.rebuild()
+        # Revoking the token is the only query: the Bloom filter answers the check.
+        with self.assertNumQueries(3):
+            response = self.client.post(self.url, {"refresh": refresh}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(RevokedToken.objects.count(), 1)
+
+        reused = self.client.post(self.url, {"refresh": refresh}, format='json')
+        self.assertEqual(reused.status_code, status.HTTP_401_UNAUTHORIZED)
+        rotated = self.client.post(self.url, {"refresh": response.data["refresh"]}, format='json')
+        self.assertEqual(rotated.status_code, status.HTTP_200_OK)
+
+    def test_token_revoked_by_another_worker_is_rejected(self):
+        refresh = RefreshToken.for_user(self.user)
+        token_blacklist.rebuild()
+        expires_at = timezone.now() + timedelta(days=1)
+        RevokedToken.objects.create(jti=refresh["jti"], expires_at=expires_at, expires_on=expires_at.date())
+
+        response = self.client.post(self.url, {"refresh": str(refresh)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class TokenBlacklistRebuildTest(TestCase):
+    def revoke(self, jti):
+        expires_at = timezone.now() + timedelta(days=1)
+        return token_blacklist.revoke(jti, expires_at)
+
+    def test_stale_filter_is_served_while_another_thread_rebuilds(self):
+        token_blacklist.rebuild()
+        stale = token_blacklist.filter
+        token_blacklist.built_at = 0.0
+        with token_blacklist.rebuild_lock, self.assertNumQueries(0):
+            self.assertIs(token_blacklist.get_filter(), stale)
+        with self.assertNumQueries(2):
+            self.assertIsNot(token_blacklist.get_filter(), stale)
+
+    def test_tokens_revoked_during_a_rebuild_are_kept(self):
+        build = token_blacklist.build
+
+        def build_then_revoke():
+            bloom = build()
+            self.revoke("revoked-during-rebuild")
+            return bloom
+
+        with mock.patch.object(token_blacklist, "build", build_then_revoke):
+            token_blacklist.rebuild()
+        self.assertIn("revoked-during-rebuild", token_blacklist.filter)
+        self.assertTrue(token_blacklist.is_revoked("revoked-during-rebuild"))
+
+
+class CompactTokenBlacklistTest(TestCase):
+    def test_deletes_expired_day_buckets(self):
+        now = timezone.now()
+        for days in (-3, -1, 0, 1):
+            expires_at = now + timedelta(days=days)
+            RevokedToken.objects.create(jti=f"jti{days}", expires_at=expires_at, expires_on=expires_at.date())
+
+        stdout = StringIO()
+        call_command("compact_token_blacklist", stdout=stdout)
+        self.assertIn("Deleted 2 ", stdout.getvalue())
+        self.assertEqual(sorted(RevokedToken.objects.values_list("jti", flat=True)), ["jti0", "jti1"])
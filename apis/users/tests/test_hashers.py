@@ -0,0 +1,92 @@
+from unittest import mock
+
+from django.contrib.auth import password_validation
+from django.contrib.auth.hashers import get_hashers, make_password
+from django.contrib.auth.models import User
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apis.users import hashers
+
+
+class PasswordHashingTest(APITestCase):
+    def login(self, password):
+        return self.client.post(
+            reverse('users:token_obtain_pair'), {'username': 'testuser', 'password': password}, format='json',
+        )
+
+    def test_signup_hashes_with_tuned_scrypt(self):
+        response = self.client.post(
+            reverse('users:signup'), {"username": "testuser", "password": "testpassword123"}, format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        user = User.objects.get()
+        self.assertTrue(user.password.startswith("scrypt$16384$"))
+        self.assertTrue(user.check_password("testpassword123"))
+
+    def test_login_rehashes_outdated_password(self):
+        User.objects.create(username='testuser', password=make_password("testpassword123", hasher="pbkdf2_sha256"))
+
+        self.assertEqual(self.login("wrongpassword").status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertTrue(User.objects.get().password.startswith("pbkdf2_sha256$"))
+        self.assertEqual(self.login("testpassword123").status_code, status.HTTP_200_OK)
+        self.assertTrue(User.objects.get().password.startswith("scrypt$16384$"))
+
+        # Pool processes keep the settings they started with, so hash inline.
+        self.addCleanup(get_hashers.cache_clear)
+        with override_settings(PASSWORD_SCRYPT_PARAMS={"work_factor": 2 ** 12}, PASSWORD_HASH_WORKERS=0):
+            get_hashers.cache_clear()
+            self.assertEqual(self.login("testpassword123").status_code, status.HTTP_200_OK)
+        self.assertTrue(User.objects.get().password.startswith("scrypt$4096$"))
+
+    def test_change_password_notifies_validators(self):
+        user = User.objects.create(username='testuser', password=make_password("testpassword123", hasher="pbkdf2_sha256"))
+        body = {"old_password": "wrongpassword", "new_password": "newpassword456", "new_password_again": "newpassword456"}
+        headers = {"Authorization": f"Bearer {AccessToken.for_user(user)}"}
+
+        with mock.patch.object(password_validation, "password_changed") as password_changed:
+            response = self.client.post(reverse('users:change_password'), body, format='json', headers=headers)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            password_changed.assert_not_called()
+
+            response = self.client.post(reverse('users:change_password'), {**body, "old_password": "testpassword123"},
+                                        format='json', headers=headers)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        password_changed.assert_called_once_with("newpassword456", mock.ANY)
+        self.assertTrue(User.objects.get().check_password("newpassword456"))
+
+    def test_old_password_check_does_not_rehash(self):
+        user = User.objects.create(username='testuser', password=make_password("testpassword123", hasher="pbkdf2_sha256"))
+        self.assertTrue(hashers.check_password(user, "testpassword123", rehash=False))
+        self.assertTrue(User.objects.get().password.startswith("pbkdf2_sha256$"))
+
+    def test_unknown_user(self):
+        self.assertEqual(self.login("testpassword123").status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_async_check_password(self):
+        user = User(password=await hashers.amake_password("testpassword123"))
+        self.assertTrue(await hashers.acheck_password(user, "testpassword123"))
+        self.assertFalse(await hashers.acheck_password(user, "wrongpassword"))
+
+    def kill_pool_process(self):
+        pool = hashers.get_pool()
+        if pool is None:
+            self.skipTest("PASSWORD_HASH_WORKERS is 0")
+        hashers.make_password("testpassword123")
+        process = next(iter(pool._processes.values()))
+        process.kill()
+        process.join()
+        return pool
+
+    def test_pool_is_replaced_after_a_process_dies(self):
+        pool = self.kill_pool_process()
+        self.assertTrue(hashers.make_password("testpassword123").startswith("scrypt$"))
+        self.assertIsNot(hashers.get_pool(), pool)
+
+    async def test_async_pool_is_replaced_after_a_process_dies(self):
+        pool = self.kill_pool_process()
+        self.assertTrue((await hashers.amake_password("testpassword123")).startswith("scrypt$"))
+        self.assertIsNot(hashers.get_pool(), pool)
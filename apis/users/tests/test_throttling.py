@@ -0,0 +1,106 @@
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apis.core.throttling import CacheBucketStore, LocalBucketStore, TokenBucketThrottle, local_bucket_store
+
+RATES = {"signup": "2/min", "login": "2/min", "write": "3/min"}
+
+
+@mock.patch.object(TokenBucketThrottle, "THROTTLE_RATES", RATES)
+class ThrottleViewsTest(APITestCase):
+    def test_signup_is_limited_per_ip_address(self):
+        url = reverse('users:signup')
+        for i in range(2):
+            response = self.client.post(url, {"username": f"user{i}", "password": "testpassword123"}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self.client.post(url, {"username": "user2", "password": "testpassword123"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn(int(response["Retry-After"]), range(1, 31))
+        self.assertEqual(User.objects.count(), 2)
+
+        response = self.client.post(
+            url, {"username": "user2", "password": "testpassword123"}, format='json', REMOTE_ADDR="10.0.0.2",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_spoofed_forwarded_for_does_not_reset_the_bucket(self):
+        url = reverse('users:signup')
+        codes = [
+            self.client.post(
+                url, {"username": f"user{i}", "password": "testpassword123"}, format='json',
+                HTTP_X_FORWARDED_FOR=f"10.0.1.{i}",
+            ).status_code
+            for i in range(3)
+        ]
+        self.assertEqual(codes, [status.HTTP_201_CREATED] * 2 + [status.HTTP_429_TOO_MANY_REQUESTS])
+
+    @override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, "NUM_PROXIES": 1})
+    def test_forwarded_for_is_used_behind_a_proxy(self):
+        url = reverse('users:signup')
+        codes = [
+            self.client.post(
+                url, {"username": f"user{i}", "password": "testpassword123"}, format='json',
+                HTTP_X_FORWARDED_FOR=f"10.0.1.{i}",
+            ).status_code
+            for i in range(3)
+        ]
+        self.assertEqual(codes, [status.HTTP_201_CREATED] * 3)
+
+    def test_login_is_limited_per_ip_address(self):
+        User.objects.create_user(username='testuser', password='testpassword123')
+        url = reverse('users:token_obtain_pair')
+        credentials = {'username': 'testuser', 'password': 'testpassword123'}
+        codes = [self.client.post(url, credentials, format='json').status_code for _ in range(3)]
+        self.assertEqual(codes, [status.HTTP_200_OK, status.HTTP_200_OK, status.HTTP_429_TOO_MANY_REQUESTS])
+
+    def test_writes_are_limited_per_user(self):
+        users = [User.objects.create_user(username=f'user{i}', password='testpassword123') for i in range(2)]
+        url = reverse('task-list')
+        self.client.force_authenticate(users[0])
+        codes = [self.client.post(url, {"title": "Task", "description": "d"}, format='json').status_code
+                 for _ in range(4)]
+        self.assertEqual(codes[-1], status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+        self.client.force_authenticate(users[1])
+        response = self.client.post(url, {"title": "Task", "description": "d"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    async def test_async_writes_are_limited_per_user(self):
+        user = await User.objects.acreate(username='owner')
+        headers = {"Authorization": f"Bearer {AccessToken.for_user(user)}"}
+        codes = [
+            (await self.async_client.post(
+                reverse('async-task-list'), {"title": "Task", "description": "d"},
+                content_type="application/json", headers=headers,
+            )).status_code
+            for _ in range(4)
+        ]
+        self.assertEqual(codes[-1], status.HTTP_429_TOO_MANY_REQUESTS)
+
+
+@override_settings(CACHES={"throttle": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class TokenBucketTest(SimpleTestCase):
+    def test_bucket_refills_at_the_rate(self):
+        for store in (local_bucket_store, CacheBucketStore("throttle")):
+            with self.subTest(store=type(store).__name__):
+                local_bucket_store.clear()
+                self.assertEqual([store.take("key", 2, 0.5, 100.0) for _ in range(3)], [None, None, 2.0])
+                self.assertEqual(store.take("key", 2, 0.5, 101.0), 1.0)
+                self.assertIsNone(store.take("key", 2, 0.5, 102.0))
+
+    def test_local_store_drops_least_recently_used_bucket(self):
+        store = LocalBucketStore(max_entries=2)
+        store.take("a", 1, 1.0, 100.0)
+        store.take("b", 1, 1.0, 100.0)
+        store.take("a", 1, 1.0, 100.5)
+        store.take("c", 1, 1.0, 100.5)
+        self.assertEqual(list(store.buckets), ["a", "c"])
@@ -0,0 +1,32 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .blacklist import token_blacklist
+
+
+class BlacklistRefreshToken(RefreshToken):
+    """
+    Refresh token checked against and revoked in `token_blacklist`.
+
+    Stands in for simplejwt's `token_blacklist` app, which records every issued
+    token and checks a join of two growing tables on each refresh.
+    """
+
+    def verify(self, *args, **kwargs):
+        self.check_blacklist()
+        super().verify(*args, **kwargs)
+
+    def check_blacklist(self):
+        if token_blacklist.is_revoked(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        """
+        Revoke this token. Raises `TokenError` if it was already revoked, e.g. by
+        a concurrent refresh with the same token.
+        """
+        if not token_blacklist.revoke(self.payload[api_settings.JTI_CLAIM], datetime_from_epoch(self.payload["exp"])):
+            raise TokenError(_("Token is blacklisted"))
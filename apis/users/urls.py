@@ -1,6 +1,7 @@
 from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView, TokenObtainPairView
 
+from apis.core.throttling import LoginRateThrottle
 
 from .views import CreateUserView, ChangePasswordView, UserUpdateView, DeactivateUserView
 
@@ -10,6 +11,6 @@ urlpatterns = [
     path("change-password/", ChangePasswordView.as_view(), name="change_password"),
     path("deactivate/", DeactivateUserView.as_view(), name="deactivate"),
     path("user-update/", UserUpdateView.as_view(), name="user_update"),
-    path('login/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('login/', TokenObtainPairView.as_view(throttle_classes=[LoginRateThrottle]), name='token_obtain_pair'),
     path('refresh/', TokenRefreshView.as_view(), name='token_refresh'),
 ]
@@ -3,6 +3,8 @@ from rest_framework.generics import CreateAPIView
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from apis.core.throttling import SignupRateThrottle
 from .serializers import UserSerializer, UserUpdateSerializer, PasswordChangeSerializer
 from django.contrib.auth.models import User
 
@@ -16,14 +18,19 @@ class CreateUserView(CreateAPIView):
     Permissions:
     - AllowAny: No authentication required to create a new user.
 
+    Throttling:
+    - SignupRateThrottle: Limits signups per client IP address.
+
     Request body:
     - User data in JSON format, should include fields required by `UserSerializer`.
 
     Responses:
     - 201: User created successfully.
     - 400: Invalid data provided.
+    - 429: Too many signups from this IP address; retry after `Retry-After` seconds.
     """
     permission_classes = (AllowAny,)
+    throttle_classes = (SignupRateThrottle,)
 
     queryset = User.objects.all()
     serializer_class = UserSerializer
@@ -42,6 +49,7 @@ class DeactivateUserView(APIView):
     - 200: Account successfully deactivated.
     """
     permission_classes = (IsAuthenticated,)
+    authentication_classes = (JWTAuthentication,)
 
     def post(self, request):
         """
@@ -77,6 +85,7 @@ class ChangePasswordView(APIView):
     - 400: Invalid data or password change failed.
     """
     permission_classes = [IsAuthenticated]
+    authentication_classes = [JWTAuthentication]
 
     def post(self, request, *args, **kwargs):
         """
@@ -112,6 +121,7 @@ class UserUpdateView(APIView):
     - 400: Invalid data or update failed.
     """
     permission_classes = [IsAuthenticated]
+    authentication_classes = [JWTAuthentication]
 
     def patch(self, request, *args, **kwargs):
         """